@@ -0,0 +1,288 @@
+# -*- coding: UTF-8 -*-
+#
+#   Copyright WeeTech Developer
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+pure-Python overhead of db.mysql and db.sql against a fake DB-API driver
+
+Every case times a wrapper call on a FakeConnection, which does no I/O, so
+the numbers are what the wrapper itself costs per call. ``driver.*`` cases
+time the bare cursor calls for comparison.
+
+    python benchmarks/db_overhead.py --output before.json
+    python benchmarks/db_overhead.py --compare before.json --tolerance 0.2
+
+With ``--compare`` the run fails when a case got slower than the baseline
+by more than ``--tolerance`` (a fraction).
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from unittest import mock
+
+# run from a checkout without installing the package
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(1, os.path.join(HERE, "..", "src"))
+
+import mysql.connector  # noqa: E402
+
+from common_util_py.db import sql  # noqa: E402
+from common_util_py.db.mysql import Mysql  # noqa: E402
+
+from fake_dbapi import FakeConnection  # noqa: E402
+
+ROW_COUNTS = (1, 100, 10_000)
+COLUMN_WIDTHS = (4, 32)
+CONDITION_COUNTS = (1, 5, 20)
+QUICK_ROW_COUNTS = (1, 100)
+QUICK_COLUMN_WIDTHS = (4,)
+
+
+def make_rows(n_rows: int, n_columns: int) -> tuple[list[str], list[tuple]]:
+    """Column names and rows mixing ints and short strings."""
+    columns = [f"c{i}" for i in range(n_columns)]
+    rows = [
+        tuple(r if i % 2 == 0 else f"value-{r}-{i}" for i in range(n_columns))
+        for r in range(n_rows)
+    ]
+    return columns, rows
+
+
+def time_call(func: Callable[[], object], min_time: float, repeat: int) -> dict:
+    """Per-call seconds over ``repeat`` runs of at least ``min_time`` each."""
+    # calibrate like timeit.Timer.autorange
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time / 5 or number >= 1_000_000:
+            break
+        number *= 10
+    number = max(1, int(min_time * number / max(elapsed, 1e-9)))
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - started) / number)
+    return {
+        "calls": number * repeat,
+        "min_us": min(samples) * 1e6,
+        "median_us": statistics.median(samples) * 1e6,
+        "stdev_us": (statistics.stdev(samples) if len(samples) > 1 else 0.0) * 1e6,
+    }
+
+
+class Suite:
+    """Collects the cases to run."""
+
+    def __init__(self, rows: tuple[int, ...], widths: tuple[int, ...]):
+        self.row_counts = rows
+        self.widths = widths
+        self.cases: list[tuple[str, dict, Callable[[], Callable[[], object]]]] = []
+
+    def add(self, name: str, params: dict, setup: Callable[[], Callable[[], object]]):
+        """Register a case; ``setup`` returns the function to time."""
+        self.cases.append((name, params, setup))
+
+
+def mysql_db(conn: FakeConnection) -> Mysql:
+    """A Mysql instance whose connections are ``conn``."""
+    with mock.patch.object(mysql.connector, "connect", return_value=conn):
+        db = Mysql(host="fake", username="bench", password="bench")
+        db.connect()
+    return db
+
+
+def register_mysql(suite: Suite) -> None:
+    for n_rows in suite.row_counts:
+        for width in suite.widths:
+            params = {"rows": n_rows, "columns": width}
+
+            def read_setup(n_rows=n_rows, width=width):
+                columns, rows = make_rows(n_rows, width)
+                db = mysql_db(FakeConnection(columns, rows))
+                return lambda: db.read("SELECT * FROM bench WHERE c0 > %s", (0,))
+
+            def driver_read_setup(n_rows=n_rows, width=width):
+                columns, rows = make_rows(n_rows, width)
+                conn = FakeConnection(columns, rows)
+
+                def run():
+                    cursor = conn.cursor()
+                    cursor.execute("SELECT * FROM bench WHERE c0 > %s", (0,))
+                    cursor.fetchall()
+                    cursor.close()
+
+                return run
+
+            def batch_insert_setup(n_rows=n_rows, width=width, pack=False):
+                columns, rows = make_rows(n_rows, width)
+                db = mysql_db(FakeConnection(columns))
+                return lambda: db.batch_insert("bench", columns, rows, pack=pack)
+
+            def batch_update_setup(n_rows=n_rows, width=width, strategy=None):
+                columns, rows = make_rows(n_rows, width)
+                db = mysql_db(FakeConnection(columns))
+                return lambda: db.batch_update(
+                    "bench",
+                    columns[1:],
+                    columns[:1],
+                    rows,
+                    strategy=strategy or "executemany",
+                )
+
+            suite.add("mysql.read", params, read_setup)
+            suite.add("driver.execute_fetchall", params, driver_read_setup)
+            suite.add("mysql.batch_insert", params, batch_insert_setup)
+            suite.add(
+                "mysql.batch_insert[pack]",
+                params,
+                lambda n_rows=n_rows, width=width: batch_insert_setup(
+                    n_rows, width, pack=True
+                ),
+            )
+            suite.add("mysql.batch_update", params, batch_update_setup)
+            suite.add(
+                "mysql.batch_update[case]",
+                params,
+                lambda n_rows=n_rows, width=width: batch_update_setup(
+                    n_rows, width, strategy="case"
+                ),
+            )
+
+    def update_setup():
+        db = mysql_db(FakeConnection())
+        return lambda: db.update("UPDATE bench SET c1 = %s WHERE c0 = %s", ("a", 1))
+
+    suite.add("mysql.update", {}, update_setup)
+
+
+def register_sql(suite: Suite) -> None:
+    for n_rows in suite.row_counts:
+        for width in suite.widths:
+            params = {"rows": n_rows, "columns": width}
+
+            def insert_rows_setup(n_rows=n_rows, width=width):
+                columns, rows = make_rows(n_rows, width)
+                conn = FakeConnection(columns)
+                dict_rows = [dict(zip(columns, row)) for row in rows]
+                return lambda: sql.insert_rows(conn, "bench", dict_rows)
+
+            def select_setup(n_rows=n_rows, width=width):
+                columns, rows = make_rows(n_rows, width)
+                conn = FakeConnection(columns, rows)
+                condition = [sql.Condition("AND", "c0", ">", 0)]
+                return lambda: sql.select(conn, "bench", condition)
+
+            suite.add("sql.insert_rows", params, insert_rows_setup)
+            suite.add("sql.select", params, select_setup)
+
+    for n_conditions in CONDITION_COUNTS:
+
+        def where_setup(n_conditions=n_conditions):
+            conditions = [
+                sql.Condition("AND", f"c{i}", "=", i) for i in range(n_conditions)
+            ]
+            return lambda: sql.build_where_clause(conditions)
+
+        suite.add("sql.build_where_clause", {"conditions": n_conditions}, where_setup)
+
+
+def case_key(result: dict) -> str:
+    params = ",".join(f"{k}={v}" for k, v in sorted(result["params"].items()))
+    return f"{result['name']}[{params}]"
+
+
+def compare(results: list[dict], baseline_path: str, tolerance: float) -> int:
+    """Print per-case ratios to the baseline; return how many regressed."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {case_key(r): r for r in json.load(f)["results"]}
+    regressions = 0
+    for result in results:
+        before = baseline.get(case_key(result))
+        if before is None:
+            continue
+        ratio = result["min_us"] / before["min_us"]
+        flag = ""
+        if ratio > 1 + tolerance:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{case_key(result):60} {ratio:6.2f}x{flag}", file=sys.stderr)
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    parser.add_argument("--filter", default="", help="only cases containing this")
+    parser.add_argument("--quick", action="store_true", help="small sizes only")
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--compare", help="baseline JSON from an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        suite = Suite(QUICK_ROW_COUNTS, QUICK_COLUMN_WIDTHS)
+    else:
+        suite = Suite(ROW_COUNTS, COLUMN_WIDTHS)
+    register_mysql(suite)
+    register_sql(suite)
+
+    results = []
+    for name, params, setup in suite.cases:
+        if args.filter not in name:
+            continue
+        timing = time_call(setup(), args.min_time, args.repeat)
+        result = {"name": name, "params": params, **timing}
+        if params.get("rows"):
+            result["per_row_ns"] = timing["min_us"] * 1000 / params["rows"]
+        results.append(result)
+        print(f"{case_key(result):60} {timing['min_us']:12.2f} us", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "created": datetime.now(timezone.utc).isoformat(),
+            "min_time": args.min_time,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        return 1 if compare(results, args.compare, args.tolerance) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+# -*- coding: UTF-8 -*-
+#
+#   Copyright WeeTech Developer
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+in-process DB-API connection that does no I/O, for overhead benchmarks
+
+It answers every SELECT with a fixed result set and every write with a
+row count, so timing a wrapper call against it measures the wrapper alone.
+It speaks enough of both mysql.connector (``cursor(dictionary=True)``,
+``start_transaction``) and PyMySQL (``cursor(DictCursor)``) for the db
+module.
+"""
+
+from typing import Any
+
+MAX_ALLOWED_PACKET = 64 * 1024 * 1024
+
+
+class FakeCursor:
+    """DB-API cursor over the connection's canned result."""
+
+    def __init__(self, connection: "FakeConnection", dictionary: bool):
+        self.connection = connection
+        self.dictionary = dictionary
+        self.description: list[tuple] | None = None
+        self.rowcount = -1
+        self.lastrowid = None
+        self.warning_count = 0
+        self._rows: list = []
+        self._pos = 0
+
+    def __enter__(self) -> "FakeCursor":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def execute(self, statement: str, params: Any = None) -> None:
+        """Pretend to run a statement."""
+        self._pos = 0
+        if statement.startswith("SELECT @@max_allowed_packet"):
+            self.description = [("@@max_allowed_packet", 8) + (None,) * 5]
+            self._rows = [(MAX_ALLOWED_PACKET,)]
+        elif statement.lstrip()[:6].upper() == "SELECT":
+            self.description = self.connection.description
+            if self.dictionary:
+                self._rows = self.connection.dict_rows
+            else:
+                self._rows = self.connection.rows
+        else:
+            self.description = None
+            self._rows = []
+            self.rowcount = 1
+            return
+        self.rowcount = len(self._rows)
+
+    def executemany(self, statement: str, seq_params: list) -> None:
+        """Pretend to run a statement once per parameter set."""
+        self.description = None
+        self._rows = []
+        self.rowcount = len(seq_params)
+
+    def fetchone(self) -> Any:
+        if self._pos >= len(self._rows):
+            return None
+        self._pos += 1
+        return self._rows[self._pos - 1]
+
+    def fetchmany(self, size: int = 1) -> list:
+        rows = self._rows[self._pos : self._pos + size]
+        self._pos += len(rows)
+        return rows
+
+    def fetchall(self) -> list:
+        rows = self._rows[self._pos :]
+        self._pos = len(self._rows)
+        return rows
+
+    def close(self) -> None:
+        pass
+
+
+class FakeConnection:
+    """DB-API connection whose SELECTs return ``rows`` of ``columns``."""
+
+    def __init__(self, columns: list[str] | None = None, rows: list | None = None):
+        self.columns = columns or ["id"]
+        self.rows = [tuple(row) for row in rows or []]
+        self.dict_rows = [dict(zip(self.columns, row)) for row in self.rows]
+        # FIELD_TYPE.VAR_STRING; the type is only read by read_columns
+        self.description = [(name, 253) + (None,) * 5 for name in self.columns]
+        self.autocommit = False
+        self.in_transaction = False
+        self.commits = 0
+
+    def cursor(self, cursor_class: Any = None, **kwargs) -> FakeCursor:
+        """Open a cursor; dict rows for ``dictionary=True`` or a DictCursor."""
+        dictionary = kwargs.get("dictionary", False) or (
+            cursor_class is not None and "Dict" in getattr(cursor_class, "__name__", "")
+        )
+        return FakeCursor(self, bool(dictionary))
+
+    def start_transaction(self) -> None:
+        self.in_transaction = True
+
+    def commit(self) -> None:
+        self.commits += 1
+        self.in_transaction = False
+
+    def rollback(self) -> None:
+        self.in_transaction = False
+
+    def is_connected(self) -> bool:
+        return True
+
+    def ping(self, *args, **kwargs) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
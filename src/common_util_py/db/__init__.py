@@ -15,8 +15,26 @@
 # limitations under the License.
 """db module"""
 
-from .database import TransactionError, sanitize_identifier
+from .database import (
+    TransactionError,
+    PoolTimeoutError,
+    BatchInsertError,
+    FailedBatch,
+    GroupCommitError,
+    sanitize_identifier,
+)
 from .mysql import Mysql as mysql
+from .async_mysql import AsyncMysql
+from .batching import AdaptiveBatchSizer, AdaptiveBatchStats
+from .batch_loader import BatchLoader, BatchLoaderScope, BatchLoaderStats
+from .buffered_writer import BufferedWriter, BufferedWriterStats
+from .pool import ConnectionPool, PoolStats
+from .statement_cache import StatementCacheStats
+from .result_cache import ResultCache, ResultCacheStats
+from .template_cache import TemplateCacheStats
+from .replica import ReplicaRouter, ReplicaStats
+from .instrument import Instrumentation, StatementEvent, StatementStats
+from .slow_query import SlowQuery, SlowQueryLog
 from .sql import (
     create_table,
     drop_table,
@@ -24,24 +42,61 @@ from .sql import (
     insert_statement,
     insert_rows,
     select_statement,
+    select_iter,
+    select_statement_iter,
+    scan_table,
     delete,
     update,
     update_table,
     generic,
+    set_instrumentation,
+    template_cache_stats,
+    set_template_cache_size,
 )
 
 __all__ = [
     "TransactionError",
+    "PoolTimeoutError",
+    "BatchInsertError",
+    "FailedBatch",
+    "GroupCommitError",
     "sanitize_identifier",
     "mysql",
+    "AsyncMysql",
+    "AdaptiveBatchSizer",
+    "AdaptiveBatchStats",
+    "BatchLoader",
+    "BatchLoaderScope",
+    "BatchLoaderStats",
+    "BufferedWriter",
+    "BufferedWriterStats",
+    "ConnectionPool",
+    "PoolStats",
+    "StatementCacheStats",
+    "ResultCache",
+    "ResultCacheStats",
+    "TemplateCacheStats",
+    "ReplicaRouter",
+    "ReplicaStats",
+    "Instrumentation",
+    "StatementEvent",
+    "StatementStats",
+    "SlowQuery",
+    "SlowQueryLog",
     "create_table",
     "drop_table",
     "insert",
     "insert_statement",
     "insert_rows",
     "select_statement",
+    "select_iter",
+    "select_statement_iter",
+    "scan_table",
     "delete",
     "update",
     "update_table",
     "generic",
+    "set_instrumentation",
+    "template_cache_stats",
+    "set_template_cache_size",
 ]
@@ -0,0 +1,234 @@
+# -*- coding: UTF-8 -*-
+#
+#   Copyright WeeTech Developer
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+asyncio facade over the mysql database class
+"""
+
+import asyncio
+import functools
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any
+
+from .database import TransactionError
+from .mysql import Mysql
+from .pool import PoolStats
+
+
+class AsyncMysql:
+    """Coroutine versions of the Mysql CRUD methods.
+
+    Calls run on a dedicated thread pool backed by a pool of
+    ``max_concurrency`` connections. A semaphore makes extra callers queue on
+    the event loop instead of piling up threads. A cancelled call keeps its
+    slot until the worker thread has finished and returned its connection.
+
+    Example:
+    async with AsyncMysql(host='localhost', username='user', password='pass',
+                          database='mydb', max_concurrency=8) as db:
+        rows = await db.read("SELECT * FROM test WHERE id = %s", (1,))
+        async with db.transaction() as tx:
+            await tx.update("UPDATE test SET name = %s WHERE id = %s", ("a", 1))
+    """
+
+    def __init__(
+        self,
+        host: str,
+        username: str,
+        password: str,
+        max_concurrency: int = 10,
+        pool_timeout: float | None = None,
+        **kwargs,
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.db = Mysql(
+            host,
+            username,
+            password,
+            max_connections=max_concurrency,
+            pool_timeout=pool_timeout,
+            **kwargs,
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="AsyncMysql"
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def __aenter__(self) -> "AsyncMysql":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Wait for running calls, then close every pooled connection."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._executor.shutdown)
+        self.db.close()
+
+    def pool_stats(self) -> PoolStats | None:
+        """Return connection pool statistics."""
+        return self.db.pool_stats()
+
+    async def create(self, statement: str, vals: tuple = ()) -> int:
+        """create database or table"""
+        return await self._run(self.db.create, statement, vals)
+
+    async def read(self, statement: str, vals: tuple = ()) -> list:
+        """read rows from table"""
+        return await self._run(self.db.read, statement, vals)
+
+    async def update(self, statement: str, vals: tuple = ()) -> int:
+        """update rows in table"""
+        return await self._run(self.db.update, statement, vals)
+
+    async def delete(self, statement: str, vals: tuple = ()) -> int:
+        """Delete rows from table"""
+        return await self._run(self.db.delete, statement, vals)
+
+    async def batch_insert(
+        self, table: str, columns: list[str], data: list[tuple], **kwargs
+    ) -> int:
+        """Perform a batch insert operation, see Mysql.batch_insert."""
+        return await self._run(self.db.batch_insert, table, columns, data, **kwargs)
+
+    async def batch_update(
+        self,
+        table: str,
+        update_columns: list[str],
+        where_columns: list[str],
+        data: list[tuple],
+        **kwargs,
+    ) -> int:
+        """Perform a batch update operation, see Mysql.batch_update."""
+        return await self._run(
+            self.db.batch_update, table, update_columns, where_columns, data, **kwargs
+        )
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator["AsyncTransaction"]:
+        """Run the calls made on the yielded object in one transaction.
+
+        The transaction owns a single worker thread, and with it a single
+        connection, until it commits or rolls back. Cancellation rolls back.
+        """
+        await self._semaphore.acquire()
+        executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="AsyncMysql-tx"
+        )
+        tx = AsyncTransaction(self.db, executor)
+        last: asyncio.Future | None = None
+        try:
+            last = tx.submit(tx.begin)
+            await asyncio.shield(last)
+            try:
+                yield tx
+            except BaseException as exc:
+                last = tx.submit(tx.end, exc)
+                await asyncio.shield(last)
+                raise
+            last = tx.submit(tx.end, None)
+            await asyncio.shield(last)
+        finally:
+            executor.shutdown(wait=False)
+            self._release_when_done(last)
+
+    async def _run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking call on the executor within the concurrency limit."""
+        await self._semaphore.acquire()
+        future = None
+        try:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(
+                self._executor, functools.partial(func, *args, **kwargs)
+            )
+            return await asyncio.shield(future)
+        finally:
+            self._release_when_done(future)
+
+    def _release_when_done(self, future: asyncio.Future | None) -> None:
+        """Release the semaphore now, or once a still running call finishes."""
+        if future is None or future.done():
+            self._semaphore.release()
+            return
+
+        def _done(fut: asyncio.Future) -> None:
+            if not fut.cancelled():
+                # nobody awaits it any more, don't warn about its exception
+                fut.exception()
+            self._semaphore.release()
+
+        future.add_done_callback(_done)
+
+
+class AsyncTransaction:
+    """Coroutine CRUD methods bound to one transaction, see AsyncMysql."""
+
+    def __init__(self, db: Mysql, executor: ThreadPoolExecutor):
+        self._db = db
+        self._executor = executor
+        self._cm = db.transaction()
+
+    def submit(self, func: Callable[..., Any], *args, **kwargs) -> asyncio.Future:
+        """Schedule a call on the transaction's worker thread."""
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs)
+        )
+
+    def begin(self) -> None:
+        """Start the transaction on the worker thread."""
+        self._cm.__enter__()
+
+    def end(self, exc: BaseException | None) -> None:
+        """Commit, or roll back when the block raised ``exc``."""
+        if exc is None:
+            self._cm.__exit__(None, None, None)
+            return
+        if not isinstance(exc, Exception):
+            # Mysql.transaction() only rolls back on Exception subclasses
+            exc = TransactionError(
+                f"Transaction interrupted by {type(exc).__name__}"
+            )
+        self._cm.__exit__(type(exc), exc, exc.__traceback__)
+
+    async def _call(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        return await asyncio.shield(self.submit(func, *args, **kwargs))
+
+    async def create(self, statement: str, vals: tuple = ()) -> int:
+        """create database or table"""
+        return await self._call(self._db.create, statement, vals)
+
+    async def read(self, statement: str, vals: tuple = ()) -> list:
+        """read rows from table"""
+        return await self._call(self._db.read, statement, vals)
+
+    async def update(self, statement: str, vals: tuple = ()) -> int:
+        """update rows in table"""
+        return await self._call(self._db.update, statement, vals)
+
+    async def delete(self, statement: str, vals: tuple = ()) -> int:
+        """Delete rows from table"""
+        return await self._call(self._db.delete, statement, vals)
+
+    async def batch_insert(
+        self, table: str, columns: list[str], data: list[tuple], **kwargs
+    ) -> int:
+        """Perform a batch insert operation, see Mysql.batch_insert."""
+        return await self._call(self._db.batch_insert, table, columns, data, **kwargs)
+
@@ -0,0 +1,301 @@
+# -*- coding: UTF-8 -*-
+#
+#   Copyright WeeTech Developer
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+batched key lookups coalescing concurrent callers
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections.abc import Callable, Hashable, Iterable
+from concurrent.futures import Future, InvalidStateError
+from dataclasses import dataclass
+
+import pymysql as MySQLdb
+
+from . import sql
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchLoaderStats:
+    """Counters of a BatchLoader."""
+
+    requests: int
+    deduplicated: int
+    batches: int
+    keys_fetched: int
+    errors: int
+
+
+class BatchLoader:
+    """Load rows by key, one ``IN`` query for the keys requested together.
+
+    ``load(key)`` from any thread (or ``await aload(key)`` from a coroutine)
+    queues the key. A background thread waits ``window`` seconds after the
+    first queued key, or until ``max_batch_size`` keys are queued, then
+    selects them all with one ``key_column IN (...)`` query on its own
+    connection from ``connect`` and hands every caller its row, or None
+    when there is no row. A key already queued or being fetched is not
+    requested twice. Keys must compare equal to the column values the
+    driver returns, e.g. ints for an INT column. Every batch ends its
+    transaction, so later batches see rows committed in the meantime.
+
+    ``scope()`` returns a view with its own memo, so a request that loads
+    the same key again gets the first result without another round trip.
+
+    Example:
+    users = BatchLoader(connect, "users", "id")
+    row = users.load(42)
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], MySQLdb.Connection],
+        table_name: str,
+        key_column: str,
+        field_names: list[str] | None = None,
+        window: float = 0.002,
+        max_batch_size: int = sql.IN_CHUNK_SIZE,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        if field_names is not None and "*" not in field_names:
+            if key_column not in field_names:
+                # rows are matched back to their keys
+                field_names = [*field_names, key_column]
+        self.connect = connect
+        self.table_name = table_name
+        self.key_column = key_column
+        self.field_names = field_names
+        self.window = window
+        self.max_batch_size = max_batch_size
+
+        self._cond = threading.Condition()
+        # unresolved futures by key, and the keys not dispatched yet
+        self._futures: dict[Hashable, Future] = {}
+        self._queue: list[Hashable] = []
+        self._first: float | None = None
+        self._closed = False
+
+        self._requests = 0
+        self._deduplicated = 0
+        self._batches = 0
+        self._keys_fetched = 0
+        self._errors = 0
+
+        self._thread = threading.Thread(
+            target=self._run, name=f"BatchLoader-{table_name}", daemon=True
+        )
+        self._thread.start()
+
+    def __enter__(self) -> "BatchLoader":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def submit(self, key: Hashable) -> Future:
+        """Queue a key; the future resolves to its row or None."""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("BatchLoader is closed")
+            self._requests += 1
+            future = self._futures.get(key)
+            if future is not None:
+                self._deduplicated += 1
+                return future
+            future = Future()
+            self._futures[key] = future
+            self._queue.append(key)
+            if len(self._queue) == 1:
+                self._first = time.monotonic()
+                self._cond.notify_all()
+            elif len(self._queue) >= self.max_batch_size:
+                self._cond.notify_all()
+            return future
+
+    def load(self, key: Hashable, timeout: float | None = None) -> dict | None:
+        """Return the row for ``key``, None when there is none."""
+        return self.submit(key).result(timeout)
+
+    def load_many(
+        self, keys: Iterable[Hashable], timeout: float | None = None
+    ) -> list[dict | None]:
+        """Return the rows for ``keys`` in the same order."""
+        futures = [self.submit(key) for key in keys]
+        return [future.result(timeout) for future in futures]
+
+    async def aload(self, key: Hashable) -> dict | None:
+        """Awaitable load for coroutines; the event loop is not blocked."""
+        return await asyncio.wrap_future(self.submit(key))
+
+    def scope(self) -> "BatchLoaderScope":
+        """A view that memoizes loaded keys, e.g. for one API request."""
+        return BatchLoaderScope(self)
+
+    def close(self) -> None:
+        """Load the queued keys and stop the background thread."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def stats(self) -> BatchLoaderStats:
+        """Return request, deduplication and batch counters."""
+        with self._cond:
+            return BatchLoaderStats(
+                requests=self._requests,
+                deduplicated=self._deduplicated,
+                batches=self._batches,
+                keys_fetched=self._keys_fetched,
+                errors=self._errors,
+            )
+
+    def _take_batch(self) -> list[Hashable] | None:
+        """Wait until a batch is due and take its keys; None when closed."""
+        with self._cond:
+            while True:
+                if self._queue:
+                    remaining = self._first + self.window - time.monotonic()
+                    full = len(self._queue) >= self.max_batch_size
+                    if self._closed or full or remaining <= 0:
+                        keys = self._queue[: self.max_batch_size]
+                        del self._queue[: self.max_batch_size]
+                        self._first = time.monotonic() if self._queue else None
+                        return keys
+                    self._cond.wait(remaining)
+                elif self._closed:
+                    return None
+                else:
+                    self._cond.wait()
+
+    def _run(self) -> None:
+        con = None
+        try:
+            while True:
+                keys = self._take_batch()
+                if keys is None:
+                    return
+                error = None
+                try:
+                    if con is None:
+                        con = self.connect()
+                    rows = sql.select(
+                        con,
+                        self.table_name,
+                        [sql.Condition("AND", self.key_column, "IN", keys)],
+                        self.field_names,
+                        in_chunk_size=None,
+                    )
+                    # end the read transaction so the next batch gets a
+                    # fresh snapshot instead of the first one's
+                    con.rollback()
+                    found = {self._key_of(row): row for row in rows}
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    error, found = e, {}
+                    if con is not None:
+                        self._close_connection(con)
+                        con = None
+                self._resolve(keys, found, error)
+        finally:
+            if con is not None:
+                self._close_connection(con)
+
+    def _key_of(self, row: dict) -> Hashable:
+        try:
+            return row[self.key_column]
+        except KeyError:
+            raise ValueError(
+                f"BatchLoader rows of {self.table_name} have no "
+                f"{self.key_column!r} column, got {list(row)}"
+            ) from None
+
+    def _resolve(
+        self,
+        keys: list[Hashable],
+        rows: dict[Hashable, dict],
+        error: Exception | None = None,
+    ) -> None:
+        with self._cond:
+            futures = [self._futures.pop(key) for key in keys]
+            self._batches += 1
+            if error is None:
+                self._keys_fetched += len(keys)
+            else:
+                self._errors += 1
+        for key, future in zip(keys, futures):
+            try:
+                if error is None:
+                    future.set_result(rows.get(key))
+                else:
+                    future.set_exception(error)
+            except InvalidStateError:
+                # the caller cancelled it
+                pass
+
+    @staticmethod
+    def _close_connection(con: MySQLdb.Connection) -> None:
+        try:
+            con.close()
+        except Exception:  # pylint: disable=broad-exception-caught
+            logger.debug("BatchLoader failed to close its connection", exc_info=True)
+
+
+class BatchLoaderScope:
+    """Memoizing view of a BatchLoader, see BatchLoader.scope().
+
+    Not thread-safe; meant to live for one request. Failed loads are not
+    remembered.
+    """
+
+    def __init__(self, loader: BatchLoader):
+        self.loader = loader
+        self._memo: dict[Hashable, Future] = {}
+
+    def submit(self, key: Hashable) -> Future:
+        """Queue a key unless it was loaded through this scope before."""
+        future = self._memo.get(key)
+        if future is None or (future.done() and future.exception() is not None):
+            future = self.loader.submit(key)
+            self._memo[key] = future
+        return future
+
+    def load(self, key: Hashable, timeout: float | None = None) -> dict | None:
+        """Return the row for ``key``, None when there is none."""
+        return self.submit(key).result(timeout)
+
+    def load_many(
+        self, keys: Iterable[Hashable], timeout: float | None = None
+    ) -> list[dict | None]:
+        """Return the rows for ``keys`` in the same order."""
+        futures = [self.submit(key) for key in keys]
+        return [future.result(timeout) for future in futures]
+
+    async def aload(self, key: Hashable) -> dict | None:
+        """Awaitable load for coroutines."""
+        return await asyncio.wrap_future(self.submit(key))
+
+    def clear(self, key: Hashable | None = None) -> None:
+        """Forget one key, or every key, so the next load refetches it."""
+        if key is None:
+            self._memo.clear()
+        else:
+            self._memo.pop(key, None)
@@ -0,0 +1,161 @@
+# -*- coding: UTF-8 -*-
+#
+#   Copyright WeeTech Developer
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+adaptive batch sizing
+"""
+
+import threading
+from collections import deque
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+from .database import estimate_row_bytes
+
+# server errors after which the statement alone was rolled back and a
+# smaller batch may succeed: ER_LOCK_WAIT_TIMEOUT, ER_NET_PACKET_TOO_LARGE
+# and the client side CR_NET_PACKET_TOO_LARGE
+BACKOFF_ERRNOS = frozenset({1205, 1153, 2020})
+
+# rows whose size is estimated to extrapolate a batch's payload bytes
+_SAMPLE_ROWS = 16
+
+
+def sample_bytes(rows: Sequence[Sequence[Any]]) -> int:
+    """Estimate the payload bytes of ``rows`` from evenly spaced samples."""
+    if not rows:
+        return 0
+    step = max(1, len(rows) // _SAMPLE_ROWS)
+    sample = rows[::step]
+    return sum(estimate_row_bytes(row) for row in sample) * len(rows) // len(sample)
+
+
+@dataclass
+class AdaptiveBatchStats:
+    """Sizes chosen by an AdaptiveBatchSizer and what they achieved."""
+
+    current_size: int
+    batches: int
+    rows: int
+    backoffs: int
+    total_time: float
+    seconds_per_row: float | None
+    bytes_per_row: float | None
+    recent_sizes: list[int] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        """Average throughput over every recorded batch."""
+        return self.rows / self.total_time if self.total_time else 0.0
+
+
+class AdaptiveBatchSizer:
+    """Pick batch sizes that take about ``target_latency`` seconds each.
+
+    After every batch the per-row latency and payload bytes are folded into
+    moving averages and the next size moves toward ``target_latency``,
+    at most doubling or halving per batch and kept within
+    ``min_size``..``max_size``. ``next_size(max_bytes)`` additionally caps
+    the size so the estimated payload fits a packet. ``back_off`` halves the
+    size after a lock wait timeout or oversized packet. Thread-safe, so one
+    sizer can keep tuning across calls.
+
+    Example:
+    sizer = AdaptiveBatchSizer(target_latency=0.2)
+    db.batch_insert("events", columns, rows, batch_size=sizer)
+    print(sizer.stats().recent_sizes)
+    """
+
+    # weight of the newest batch in the moving averages
+    _ALPHA = 0.3
+
+    def __init__(
+        self,
+        target_latency: float = 0.2,
+        initial_size: int = 1000,
+        min_size: int = 1,
+        max_size: int = 100_000,
+        history: int = 100,
+    ):
+        if target_latency <= 0:
+            raise ValueError("target_latency must be positive")
+        if not 1 <= min_size <= initial_size <= max_size:
+            raise ValueError("need 1 <= min_size <= initial_size <= max_size")
+        self.target_latency = target_latency
+        self.min_size = min_size
+        self.max_size = max_size
+
+        self._lock = threading.Lock()
+        self._size = initial_size
+        self._seconds_per_row: float | None = None
+        self._bytes_per_row: float | None = None
+        self._batches = 0
+        self._rows = 0
+        self._backoffs = 0
+        self._total_time = 0.0
+        self._recent: deque[int] = deque(maxlen=history)
+
+    def next_size(self, max_bytes: int | None = None) -> int:
+        """Return the number of rows to put in the next batch."""
+        with self._lock:
+            size = self._size
+            if max_bytes is not None and self._bytes_per_row:
+                size = min(size, int(max_bytes // self._bytes_per_row))
+            return max(1, size)
+
+    def record(self, rows: int, seconds: float, nbytes: int = 0) -> None:
+        """Feed back how long a batch of ``rows`` rows took."""
+        if rows < 1:
+            return
+        with self._lock:
+            self._batches += 1
+            self._rows += rows
+            self._total_time += seconds
+            self._seconds_per_row = self._average(self._seconds_per_row, seconds / rows)
+            if nbytes:
+                self._bytes_per_row = self._average(self._bytes_per_row, nbytes / rows)
+            if self._seconds_per_row > 0:
+                ideal = self.target_latency / self._seconds_per_row
+            else:
+                ideal = float(self.max_size)
+            ideal = min(max(ideal, rows / 2), rows * 2)
+            self._size = int(min(max(ideal, self.min_size), self.max_size))
+            self._recent.append(rows)
+
+    def back_off(self, rows: int) -> None:
+        """Halve the size after a batch of ``rows`` rows was rejected."""
+        with self._lock:
+            self._backoffs += 1
+            self._size = max(1, min(self._size, rows // 2))
+
+    def stats(self) -> AdaptiveBatchStats:
+        """Return the current size, counters and recently used sizes."""
+        with self._lock:
+            return AdaptiveBatchStats(
+                current_size=self._size,
+                batches=self._batches,
+                rows=self._rows,
+                backoffs=self._backoffs,
+                total_time=self._total_time,
+                seconds_per_row=self._seconds_per_row,
+                bytes_per_row=self._bytes_per_row,
+                recent_sizes=list(self._recent),
+            )
+
+    def _average(self, current: float | None, sample: float) -> float:
+        if current is None:
+            return sample
+        return current + self._ALPHA * (sample - current)
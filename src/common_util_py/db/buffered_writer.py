@@ -0,0 +1,264 @@
+# -*- coding: UTF-8 -*-
+#
+#   Copyright WeeTech Developer
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+write-behind buffered inserts
+"""
+
+import atexit
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from .database import estimate_row_bytes
+from .mysql import Mysql
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BufferedWriterStats:
+    """Counters of a BufferedWriter."""
+
+    buffered: int
+    in_flight: int
+    written: int
+    failed: int
+    batches: int
+    blocked_writes: int
+
+
+class BufferedWriter:
+    """Collect rows from many threads and insert them in batches.
+
+    A background thread hands the buffered rows to ``db.batch_insert`` once
+    ``max_rows`` rows or an estimated ``max_bytes`` are buffered, or
+    ``flush_interval`` seconds after the oldest buffered row arrived. Extra
+    keyword arguments go to ``batch_insert``. At most ``max_buffer_rows``
+    rows are held (buffered or being inserted); ``write`` blocks while the
+    buffer is full, raising TimeoutError after ``write_timeout`` seconds
+    when one is set.
+
+    A failed batch is passed to ``on_error(rows, error)``, or logged, and its
+    rows are dropped. Remaining rows are flushed on ``close()`` and at
+    interpreter exit.
+
+    Example:
+    with BufferedWriter(db, "events", ["ts", "kind", "payload"]) as writer:
+        writer.write((time.time(), "click", "{}"))
+    """
+
+    def __init__(
+        self,
+        db: Mysql,
+        table: str,
+        columns: list[str],
+        max_rows: int = 1000,
+        max_bytes: int = 1024 * 1024,
+        flush_interval: float = 1.0,
+        max_buffer_rows: int = 10_000,
+        write_timeout: float | None = None,
+        on_error: Callable[[list[tuple], Exception], None] | None = None,
+        **batch_insert_kwargs,
+    ):
+        if not columns:
+            raise ValueError("columns cannot be empty")
+        if not 1 <= max_rows <= max_buffer_rows:
+            raise ValueError("need 1 <= max_rows <= max_buffer_rows")
+        self.db = db
+        self.table = table
+        self.columns = list(columns)
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self.max_buffer_rows = max_buffer_rows
+        self.write_timeout = write_timeout
+        self.on_error = on_error
+        self.batch_insert_kwargs = batch_insert_kwargs
+
+        self._cond = threading.Condition()
+        self._rows: list[tuple] = []
+        self._bytes = 0
+        self._oldest: float | None = None
+        self._in_flight = 0
+        self._closed = False
+        self._flush_requested = False
+        # rows accepted / rows handled (written or failed), for flush()
+        self._accepted = 0
+        self._handled = 0
+
+        self._written = 0
+        self._failed = 0
+        self._batches = 0
+        self._blocked_writes = 0
+
+        self._thread = threading.Thread(
+            target=self._run, name=f"BufferedWriter-{table}", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    def __enter__(self) -> "BufferedWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def write(self, row: Sequence[Any]) -> None:
+        """Buffer one row, blocking while the buffer is full."""
+        self.write_many([row])
+
+    def write_many(self, rows: Iterable[Sequence[Any]]) -> None:
+        """Buffer rows, blocking while the buffer is full."""
+        for row in rows:
+            if len(row) != len(self.columns):
+                raise ValueError(
+                    f"Expected {len(self.columns)} values per row, got {len(row)}"
+                )
+            size = estimate_row_bytes(row)
+            with self._cond:
+                self._wait_for_space()
+                # wake the flusher to start the flush_interval clock, or
+                # because a threshold is reached
+                wake = not self._rows
+                if wake:
+                    self._oldest = time.monotonic()
+                self._rows.append(tuple(row))
+                self._bytes += size
+                self._accepted += 1
+                if (
+                    wake
+                    or len(self._rows) >= self.max_rows
+                    or self._bytes >= self.max_bytes
+                ):
+                    self._cond.notify_all()
+
+    def flush(self) -> None:
+        """Insert everything written so far and wait until it is done."""
+        with self._cond:
+            target = self._accepted
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._handled < target and self._thread.is_alive():
+                self._cond.wait()
+
+    def close(self) -> None:
+        """Flush remaining rows and stop the background thread."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        atexit.unregister(self.close)
+
+    def stats(self) -> BufferedWriterStats:
+        """Return buffer occupancy and write counters."""
+        with self._cond:
+            return BufferedWriterStats(
+                buffered=len(self._rows),
+                in_flight=self._in_flight,
+                written=self._written,
+                failed=self._failed,
+                batches=self._batches,
+                blocked_writes=self._blocked_writes,
+            )
+
+    def _wait_for_space(self) -> None:
+        """Block until a row fits. Caller holds the lock."""
+        if self._closed:
+            raise RuntimeError("BufferedWriter is closed")
+        if len(self._rows) + self._in_flight < self.max_buffer_rows:
+            return
+        self._blocked_writes += 1
+        deadline = None
+        if self.write_timeout is not None:
+            deadline = time.monotonic() + self.write_timeout
+        while len(self._rows) + self._in_flight >= self.max_buffer_rows:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise TimeoutError(
+                    f"BufferedWriter buffer full ({self.max_buffer_rows} rows)"
+                )
+            self._cond.wait(remaining)
+            if self._closed:
+                raise RuntimeError("BufferedWriter is closed")
+
+    def _take_batch(self) -> list[tuple] | None:
+        """Wait until a flush is due and take the rows; None when closed."""
+        with self._cond:
+            while True:
+                due = (
+                    self._closed
+                    or self._flush_requested
+                    or len(self._rows) >= self.max_rows
+                    or self._bytes >= self.max_bytes
+                )
+                timeout = None
+                if not due and self._oldest is not None:
+                    timeout = self._oldest + self.flush_interval - time.monotonic()
+                    due = timeout <= 0
+                if due and self._rows:
+                    rows, self._rows = self._rows, []
+                    self._bytes = 0
+                    self._oldest = None
+                    self._flush_requested = False
+                    self._in_flight = len(rows)
+                    return rows
+                self._flush_requested = False
+                if self._closed:
+                    return None
+                self._cond.wait(timeout)
+
+    def _run(self) -> None:
+        while True:
+            rows = self._take_batch()
+            if rows is None:
+                return
+            error = None
+            try:
+                self.db.batch_insert(
+                    self.table, self.columns, rows, **self.batch_insert_kwargs
+                )
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                error = e
+            with self._cond:
+                self._in_flight = 0
+                self._handled += len(rows)
+                self._batches += 1
+                if error is None:
+                    self._written += len(rows)
+                else:
+                    self._failed += len(rows)
+                self._cond.notify_all()
+            if error is not None:
+                self._report(rows, error)
+
+    def _report(self, rows: list[tuple], error: Exception) -> None:
+        if self.on_error is None:
+            logger.error(
+                "BufferedWriter dropped %d rows for %s: %s",
+                len(rows),
+                self.table,
+                error,
+            )
+            return
+        try:
+            self.on_error(rows, error)
+        except Exception:  # pylint: disable=broad-exception-caught
+            logger.exception("BufferedWriter on_error callback failed")
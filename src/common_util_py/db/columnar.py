@@ -0,0 +1,121 @@
+# -*- coding: UTF-8 -*-
+#
+#   Copyright WeeTech Developer
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+column-oriented result sets
+"""
+
+import math
+from array import array
+from collections.abc import Sequence
+from typing import Any
+
+from mysql.connector.constants import FieldFlag, FieldType
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# array typecodes per MySQL column type, (signed, unsigned)
+_TYPECODES = {
+    FieldType.TINY: ("b", "B"),
+    FieldType.SHORT: ("h", "H"),
+    FieldType.INT24: ("i", "I"),
+    FieldType.LONG: ("l", "L"),
+    FieldType.LONGLONG: ("q", "Q"),
+    FieldType.YEAR: ("h", "h"),
+    FieldType.FLOAT: ("d", "d"),
+    FieldType.DOUBLE: ("d", "d"),
+}
+
+_NAN = math.nan
+
+
+def column_typecode(column: Sequence[Any]) -> str | None:
+    """Return the array typecode for a cursor description entry, if any.
+
+    DECIMAL, string, temporal and other columns have none.
+    """
+    typecodes = _TYPECODES.get(column[1])
+    if typecodes is None:
+        return None
+    flags = column[7] if len(column) > 7 and column[7] else 0
+    return typecodes[1] if flags & FieldFlag.UNSIGNED else typecodes[0]
+
+
+class ColumnBuilder:
+    """Accumulate chunks of row tuples into one container per column.
+
+    Numeric columns go into ``array.array`` typed from the cursor
+    description, anything else into a list. An integer column holding NULL
+    becomes a float64 column with NaN for the NULLs; a value that still
+    doesn't fit turns the column into a list.
+    """
+
+    def __init__(self, description: Sequence[Sequence[Any]]):
+        self.names = [column[0] for column in description]
+        if len(set(self.names)) != len(self.names):
+            raise ValueError(
+                f"Duplicate column names in result, use aliases: {self.names}"
+            )
+        self.columns: list[array | list] = []
+        for column in description:
+            typecode = column_typecode(column)
+            self.columns.append(array(typecode) if typecode else [])
+
+    def add(self, rows: Sequence[Sequence[Any]]) -> None:
+        """Append a chunk of rows."""
+        if not rows:
+            return
+        for i, values in enumerate(zip(*rows)):
+            column = self.columns[i]
+            before = len(column)
+            try:
+                column.extend(values)
+            except (TypeError, OverflowError):
+                # extend may have appended the values before the bad one
+                del column[before:]
+                self.columns[i] = _widen(column, values)
+
+    def result(self, as_numpy: bool = False) -> dict[str, Any]:
+        """Return ``{column name: array}``, NumPy arrays when ``as_numpy``."""
+        if not as_numpy:
+            return dict(zip(self.names, self.columns))
+        result = {}
+        for name, column in zip(self.names, self.columns):
+            if isinstance(column, array):
+                # shares the array's buffer, no copy
+                result[name] = np.frombuffer(column, dtype=column.typecode)
+            else:
+                values = np.empty(len(column), dtype=object)
+                values[:] = column
+                result[name] = values
+        return result
+
+
+def _widen(column: array | list, values: tuple) -> array | list:
+    """Return ``column`` plus ``values`` in a container that can hold them."""
+    if isinstance(column, array) and all(
+        value is None or isinstance(value, (int, float)) for value in values
+    ):
+        if column.typecode != "d":
+            column = array("d", column)
+        column.extend(_NAN if value is None else value for value in values)
+        return column
+    if isinstance(column, array):
+        column = column.tolist()
+    column.extend(values)
+    return column
@@ -14,11 +14,110 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+
+# share of max_allowed_packet a packed statement may use, the rest is slack
+# for the size estimate being off
+PACKET_FILL_RATIO = 0.9
+
 
 class TransactionError(Exception):
     """Custom exception for transaction-related errors."""
 
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection became available in time."""
+
+
+@dataclass
+class FailedBatch:
+    """A batch that could not be written, kept so it can be retried."""
+
+    index: int
+    rows: list
+    error: BaseException
+
+
+class BatchInsertError(Exception):
+    """Raised when some batches of a parallel batch insert failed.
+
+    Every other batch was committed; ``inserted`` counts their rows and
+    ``failed_batches`` holds the rows to retry.
+    """
+
+    def __init__(
+        self, message: str, inserted: int, failed_batches: list[FailedBatch]
+    ):
+        super().__init__(message)
+        self.inserted = inserted
+        self.failed_batches = failed_batches
+
+
+class GroupCommitError(Exception):
+    """Raised when a group_commit() group could not be committed.
+
+    Earlier groups stay committed; the ``statements`` writes of the failed
+    group were rolled back.
+    """
+
+    def __init__(self, message: str, group: int, statements: int):
+        super().__init__(message)
+        self.group = group
+        self.statements = statements
+
+
 # Sanitize table and column names
 def sanitize_identifier(identifier: str) -> str:
     # Remove any characters that aren't alphanumeric or underscores
-    return ''.join(c if c.isalnum() or c == '_' else '' for c in identifier)
\ No newline at end of file
+    return ''.join(c if c.isalnum() or c == '_' else '' for c in identifier)
+
+
+def estimate_value_bytes(value: Any) -> int:
+    """Rough size of a value once escaped into SQL text."""
+    if value is None:
+        return 4
+    if isinstance(value, (bytes, bytearray)):
+        # worst case every byte is escaped
+        return 2 * len(value) + 3
+    if isinstance(value, str):
+        # quotes plus a little room for escaped characters
+        size = len(value) if value.isascii() else len(value.encode("utf-8"))
+        return size + size // 16 + 3
+    return len(str(value)) + 2
+
+
+def estimate_row_bytes(row: Sequence[Any]) -> int:
+    """Rough size of ``(v1, v2, ...), `` for a row in a VALUES list."""
+    return sum(estimate_value_bytes(value) + 2 for value in row) + 4
+
+
+def pack_rows(rows: Iterable[Sequence[Any]], max_bytes: int) -> Iterator[list]:
+    """Group rows into lists whose estimated SQL size stays under max_bytes.
+
+    A row that on its own exceeds max_bytes is yielded alone so the server
+    reports the oversized packet instead of the row being silently dropped.
+    """
+    batch: list = []
+    size = 0
+    for row in rows:
+        row_bytes = estimate_row_bytes(row)
+        if batch and size + row_bytes > max_bytes:
+            yield batch
+            batch = []
+            size = 0
+        batch.append(row)
+        size += row_bytes
+    if batch:
+        yield batch
+
+
+def key_ranges(low: int, high: int, n_ranges: int) -> list[tuple[int, int]]:
+    """Split ``low..high`` (inclusive) into up to n_ranges ``[lower, upper)``."""
+    n_ranges = max(1, min(n_ranges, high - low + 1))
+    step = -(-(high - low + 1) // n_ranges)
+    return [
+        (start, min(start + step, high + 1)) for start in range(low, high + 1, step)
+    ]
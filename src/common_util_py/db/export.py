@@ -0,0 +1,364 @@
+# -*- coding: UTF-8 -*-
+#
+#   Copyright WeeTech Developer
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+parallel table export to JSON Lines or CSV shards
+
+    python -m common_util_py.db.export --host db1 --user reader \\
+        --database shop orders id --output-dir /backup/orders --gzip
+
+The password is read from the MYSQL_PWD environment variable.
+"""
+
+import argparse
+import csv
+import gzip
+import json
+import logging
+import os
+import sys
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import IO, Literal
+
+import pymysql as MySQLdb
+from pymysql.cursors import Cursor, SSCursor
+
+from .database import key_ranges
+from .sql import Condition, DatabaseError, build_where_clause
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+MANIFEST_VERSION = 1
+
+ExportFormat = Literal["jsonl", "csv"]
+
+
+@dataclass
+class ExportResult:
+    """What export_table wrote."""
+
+    manifest: str
+    files: list[str] = field(default_factory=list)
+    rows: int = 0
+    shards_written: int = 0
+    shards_skipped: int = 0
+
+
+def export_table(
+    connect: Callable[[], MySQLdb.Connection],
+    table_name: str,
+    key_column: str,
+    output_dir: str,
+    fmt: ExportFormat = "jsonl",
+    compress: bool = False,
+    workers: int = 4,
+    shards: int | None = None,
+    field_names: list[str] | None = None,
+    conditions: list[Condition] | None = None,
+    fetch_size: int = 10_000,
+    resume: bool = True,
+) -> ExportResult:
+    """Export a table into one file per primary key range.
+
+    The integer ``key_column`` range between MIN and MAX is split into
+    ``shards`` ranges (default ``workers * 4``). Each range is streamed
+    in key order through an unbuffered cursor on its own connection from
+    ``connect`` and written, ``fetch_size`` rows at a time, to a compact
+    JSONL or CSV file, gzip-compressed with ``compress``. Up to ``workers``
+    ranges run at once, so memory stays at about ``workers * fetch_size``
+    rows.
+
+    ``output_dir/manifest.json`` lists the ranges and which are done. A
+    shard is written to a ``.part`` file and renamed when complete, so when
+    an export is interrupted running it again with the same arguments only
+    redoes the unfinished shards. ``resume=False`` starts over.
+
+    Example:
+    export_table(connect, "orders", "id", "/backup/orders", compress=True)
+    """
+    if fmt not in ("jsonl", "csv"):
+        raise ValueError(f"Unknown export format {fmt!r}")
+    if workers < 1 or fetch_size < 1:
+        raise ValueError("workers and fetch_size must be at least 1")
+    fields = ", ".join(field_names) if field_names else "*"
+    where_clause, params = build_where_clause(conditions or [])
+    filters = where_clause.removeprefix(" WHERE ")
+
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST)
+    settings = {
+        "table": table_name,
+        "key_column": key_column,
+        "format": fmt,
+        "compress": compress,
+        "fields": fields,
+        "filters": filters,
+        "params": json.loads(json.dumps(params, default=str)),
+    }
+
+    manifest = _load_manifest(manifest_path) if resume else None
+    if manifest is not None and manifest["settings"] != settings:
+        raise ValueError(
+            f"{manifest_path} is from an export with other settings; "
+            "use resume=False to start over"
+        )
+    if manifest is None:
+        ranges = _plan(
+            connect, table_name, key_column, filters, params, shards or workers * 4
+        )
+        extension = f".{fmt}.gz" if compress else f".{fmt}"
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "settings": settings,
+            "shards": [
+                {
+                    "file": f"{table_name}-{i:05d}{extension}",
+                    "lower": lower,
+                    "upper": upper,
+                    "rows": None,
+                    "done": False,
+                }
+                for i, (lower, upper) in enumerate(ranges)
+            ],
+        }
+        _save_manifest(manifest_path, manifest)
+
+    result = ExportResult(manifest=manifest_path)
+    lock = threading.Lock()
+    pending = [shard for shard in manifest["shards"] if not shard["done"]]
+    result.shards_skipped = len(manifest["shards"]) - len(pending)
+
+    def run(shard: dict) -> None:
+        path = os.path.join(output_dir, shard["file"])
+        rows = _export_range(
+            connect,
+            path,
+            fmt,
+            compress,
+            table_name,
+            key_column,
+            fields,
+            filters,
+            params,
+            shard["lower"],
+            shard["upper"],
+            fetch_size,
+        )
+        with lock:
+            shard["rows"] = rows
+            shard["done"] = True
+            result.shards_written += 1
+            _save_manifest(manifest_path, manifest)
+        logger.info("exported %s rows of %s to %s", rows, table_name, path)
+
+    errors: list[BaseException] = []
+    with ThreadPoolExecutor(workers, thread_name_prefix="export") as pool:
+        futures = [pool.submit(run, shard) for shard in pending]
+        for future in futures:
+            error = future.exception()
+            if error is not None:
+                errors.append(error)
+    if errors:
+        raise DatabaseError(
+            f"Failed to export {len(errors)} of {len(manifest['shards'])} shards "
+            f"of {table_name}, run again to resume: {errors[0]}"
+        ) from errors[0]
+
+    for shard in manifest["shards"]:
+        result.files.append(os.path.join(output_dir, shard["file"]))
+        result.rows += shard["rows"]
+    return result
+
+
+def _plan(
+    connect: Callable[[], MySQLdb.Connection],
+    table_name: str,
+    key_column: str,
+    filters: str,
+    params: list,
+    n_ranges: int,
+) -> list[tuple[int, int]]:
+    """Split the key range of the matching rows."""
+    where_clause = f" WHERE {filters}" if filters else ""
+    con = connect()
+    try:
+        # a tuple cursor whatever the connection's cursorclass
+        with con.cursor(Cursor) as cursor:
+            cursor.execute(
+                f"SELECT MIN({key_column}), MAX({key_column}) "
+                f"FROM {table_name}{where_clause}",
+                params,
+            )
+            low, high = cursor.fetchone()
+    finally:
+        con.close()
+    if low is None:
+        return []
+    if not isinstance(low, int) or not isinstance(high, int):
+        raise ValueError(f"export needs an integer key_column, got {low!r}")
+    return key_ranges(low, high, n_ranges)
+
+
+def _export_range(
+    connect: Callable[[], MySQLdb.Connection],
+    path: str,
+    fmt: ExportFormat,
+    compress: bool,
+    table_name: str,
+    key_column: str,
+    fields: str,
+    filters: str,
+    params: list,
+    lower: int,
+    upper: int,
+    fetch_size: int,
+) -> int:
+    """Write lower <= key < upper to path; return the row count."""
+    predicates = [f"({filters})"] if filters else []
+    predicates += [f"{key_column} >= %s", f"{key_column} < %s"]
+    query = (
+        f"SELECT {fields} FROM {table_name} WHERE {' AND '.join(predicates)} "
+        f"ORDER BY {key_column}"
+    )
+    part = path + ".part"
+    count = 0
+    con = connect()
+    try:
+        with _open(part, compress) as out, con.cursor(SSCursor) as cursor:
+            cursor.execute(query, [*params, lower, upper])
+            names = [column[0] for column in cursor.description]
+            write = _writer(out, fmt, names)
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    break
+                write(rows)
+                count += len(rows)
+    except BaseException:
+        if os.path.exists(part):
+            os.remove(part)
+        raise
+    finally:
+        con.close()
+    os.replace(part, path)
+    return count
+
+
+def _open(path: str, compress: bool) -> IO[str]:
+    if compress:
+        return gzip.open(path, "wt", encoding="utf-8", newline="")
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+def _writer(
+    out: IO[str], fmt: ExportFormat, names: list[str]
+) -> Callable[[list], None]:
+    """Return a function writing a list of row tuples."""
+    if fmt == "csv":
+        writer = csv.writer(out)
+        writer.writerow(names)
+        return writer.writerows
+
+    encode = json.JSONEncoder(
+        default=str, ensure_ascii=False, separators=(",", ":")
+    ).encode
+
+    def write_jsonl(rows: list) -> None:
+        out.write("".join(encode(dict(zip(names, row))) + "\n" for row in rows))
+
+    return write_jsonl
+
+
+def _load_manifest(path: str) -> dict | None:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"Unsupported export manifest version in {path}")
+    return manifest
+
+
+def _save_manifest(path: str, manifest: dict) -> None:
+    """Replace the manifest atomically so a crash never leaves half of it."""
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("table")
+    parser.add_argument("key_column", help="integer primary key column")
+    parser.add_argument("--output-dir", required=True)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=3306)
+    parser.add_argument("--user", required=True)
+    parser.add_argument("--database", required=True)
+    parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    parser.add_argument("--gzip", action="store_true", help="compress the shards")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--shards", type=int, help="default: 4 per worker")
+    parser.add_argument("--fields", help="comma separated columns, default all")
+    parser.add_argument("--fetch-size", type=int, default=10_000)
+    parser.add_argument(
+        "--no-resume",
+        action="store_true",
+        help="ignore an existing manifest and start over",
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s"
+    )
+
+    def connect() -> MySQLdb.Connection:
+        return MySQLdb.connect(
+            host=args.host,
+            port=args.port,
+            user=args.user,
+            password=os.getenv("MYSQL_PWD", ""),
+            database=args.database,
+            charset="utf8mb4",
+        )
+
+    result = export_table(
+        connect,
+        args.table,
+        args.key_column,
+        args.output_dir,
+        fmt=args.format,
+        compress=args.gzip,
+        workers=args.workers,
+        shards=args.shards,
+        field_names=args.fields.split(",") if args.fields else None,
+        fetch_size=args.fetch_size,
+        resume=not args.no_resume,
+    )
+    logger.info(
+        "exported %d rows into %d files (%d shards already done)",
+        result.rows,
+        len(result.files),
+        result.shards_skipped,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
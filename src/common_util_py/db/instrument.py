@@ -0,0 +1,277 @@
+# -*- coding: UTF-8 -*-
+#
+#   Copyright WeeTech Developer
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+statement instrumentation for the db layer
+"""
+
+import functools
+import logging
+import math
+import re
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from typing import Any, Literal
+
+logger = logging.getLogger(__name__)
+
+EventKind = Literal["connect", "execute", "fetch", "commit"]
+
+_STRING_RE = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\"")
+_NUMBER_RE = re.compile(r"(?<![\w`$])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b")
+_PLACEHOLDER_RE = re.compile(r"%s|%\(\w+\)s")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ROWS_RE = re.compile(r"(\(\?\+?\))(?:\s*,\s*\(\?\+?\))+")
+_SPACE_RE = re.compile(r"\s+")
+
+# longer statements, e.g. packed multi-row INSERTs, are normalized uncached
+# so the cache can't pin hundreds of MB of one-off statement text
+_NORMALIZE_CACHE_MAX_LENGTH = 4096
+
+
+def normalize_statement(statement: str) -> str:
+    """Reduce a statement to its shape: literals and placeholders become ``?``.
+
+    Lists of placeholders collapse to ``(?+)`` and repeated VALUES rows to
+    ``(?+), ...`` so statements differing only in arity share a shape.
+    """
+    if len(statement) > _NORMALIZE_CACHE_MAX_LENGTH:
+        return _normalize(statement)
+    return _normalize_cached(statement)
+
+
+@functools.lru_cache(maxsize=4096)
+def _normalize_cached(statement: str) -> str:
+    return _normalize(statement)
+
+
+def _normalize(statement: str) -> str:
+    shape = _STRING_RE.sub("?", statement)
+    shape = _PLACEHOLDER_RE.sub("?", shape)
+    shape = _NUMBER_RE.sub("?", shape)
+    shape = _IN_LIST_RE.sub("(?+)", shape)
+    shape = _ROWS_RE.sub(r"\1, ...", shape)
+    return _SPACE_RE.sub(" ", shape).strip()
+
+
+@dataclass
+class StatementEvent:
+    """One measured connect, execute, fetch or commit."""
+
+    kind: EventKind
+    source: str
+    statement: str | None = None
+    params: Any = None
+    rows: int | None = None
+    duration: float = 0.0
+    error: BaseException | None = None
+    # params is a sequence of parameter sets run through executemany
+    executemany: bool = False
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram, percentiles within about 10%."""
+
+    # 8 buckets per doubling starting at one microsecond
+    _BASE = 1e-6
+    _STEPS_PER_DOUBLING = 8
+
+    def __init__(self):
+        self._buckets: dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Add one latency sample."""
+        if seconds <= self._BASE:
+            index = 0
+        else:
+            steps = math.log2(seconds / self._BASE) * self._STEPS_PER_DOUBLING
+            index = int(steps) + 1
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, pct: float) -> float:
+        """Return the upper bound of the bucket holding the pct-th sample."""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * pct / 100))
+        seen = 0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen >= rank:
+                upper = self._BASE * 2 ** (index / self._STEPS_PER_DOUBLING)
+                return min(upper, self.max)
+        return self.max
+
+
+@dataclass
+class StatementStats:
+    """Aggregated measurements for one statement shape."""
+
+    kind: EventKind
+    shape: str
+    count: int
+    errors: int
+    rows: int
+    total_time: float
+    p50: float
+    p95: float
+    p99: float
+    max: float
+
+
+class _ShapeStats:
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.errors = 0
+        self.rows = 0
+
+
+class _Discard:
+    """Event stand-in when instrumentation is off; attribute writes are dropped."""
+
+    __slots__ = ()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        pass
+
+
+NO_MEASURE = nullcontext(_Discard())
+
+BeforeHook = Callable[[EventKind, str | None, Any], None]
+AfterHook = Callable[[StatementEvent], None]
+
+
+class Instrumentation:
+    """Collect per-shape latency, row and error statistics and run hooks.
+
+    Before hooks get ``(kind, statement, params)`` ahead of the call, after
+    hooks the finished StatementEvent. A failing hook is logged and never
+    breaks the database call.
+
+    Example:
+    instrumentation = Instrumentation()
+    instrumentation.add_hook(after=lambda event: print(event.duration))
+    db = Mysql(host='localhost', username='user', password='pass',
+               instrumentation=instrumentation)
+    sql.set_instrumentation(instrumentation)
+    ...
+    for stats in instrumentation.stats()[:10]:
+        print(stats.shape, stats.count, stats.p99)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._shapes: dict[tuple[str, str], _ShapeStats] = {}
+        self._before: list[BeforeHook] = []
+        self._after: list[AfterHook] = []
+
+    def add_hook(
+        self, before: BeforeHook | None = None, after: AfterHook | None = None
+    ) -> None:
+        """Register hooks called around every measured call."""
+        with self._lock:
+            if before is not None:
+                self._before = [*self._before, before]
+            if after is not None:
+                self._after = [*self._after, after]
+
+    def remove_hook(
+        self, before: BeforeHook | None = None, after: AfterHook | None = None
+    ) -> None:
+        """Unregister hooks added with add_hook."""
+        with self._lock:
+            self._before = [hook for hook in self._before if hook is not before]
+            self._after = [hook for hook in self._after if hook is not after]
+
+    @contextmanager
+    def measure(
+        self,
+        kind: EventKind,
+        statement: str | None = None,
+        params: Any = None,
+        source: str = "mysql",
+    ) -> Iterator[StatementEvent]:
+        """Time the with block; the caller may set ``rows`` on the event."""
+        for hook in self._before:
+            self._call_hook(hook, kind, statement, params)
+        event = StatementEvent(
+            kind=kind, source=source, statement=statement, params=params
+        )
+        started = time.perf_counter()
+        try:
+            yield event
+        except BaseException as exc:
+            event.error = exc
+            raise
+        finally:
+            event.duration = time.perf_counter() - started
+            self._record(event)
+            for hook in self._after:
+                self._call_hook(hook, event)
+
+    def stats(self) -> list[StatementStats]:
+        """Return stats per (kind, shape), slowest total time first."""
+        with self._lock:
+            result = [
+                StatementStats(
+                    kind=kind,
+                    shape=shape,
+                    count=entry.histogram.count,
+                    errors=entry.errors,
+                    rows=entry.rows,
+                    total_time=entry.histogram.total,
+                    p50=entry.histogram.percentile(50),
+                    p95=entry.histogram.percentile(95),
+                    p99=entry.histogram.percentile(99),
+                    max=entry.histogram.max,
+                )
+                for (kind, shape), entry in self._shapes.items()
+            ]
+        result.sort(key=lambda stats: stats.total_time, reverse=True)
+        return result
+
+    def reset(self) -> None:
+        """Forget every collected statistic."""
+        with self._lock:
+            self._shapes.clear()
+
+    def _record(self, event: StatementEvent) -> None:
+        shape = event.kind
+        if event.statement:
+            shape = normalize_statement(event.statement)
+        with self._lock:
+            entry = self._shapes.get((event.kind, shape))
+            if entry is None:
+                entry = self._shapes[(event.kind, shape)] = _ShapeStats()
+            entry.histogram.record(event.duration)
+            if event.error is not None:
+                entry.errors += 1
+            if event.rows is not None and event.rows > 0:
+                entry.rows += event.rows
+
+    @staticmethod
+    def _call_hook(hook: Callable[..., None], *args) -> None:
+        try:
+            hook(*args)
+        except Exception:  # pylint: disable=broad-exception-caught
+            logger.exception("instrumentation hook %r failed", hook)
@@ -17,12 +17,205 @@
 mysql database class
 """
 
-from contextlib import contextmanager
-from collections.abc import Iterator
+import logging
+import os
+import tempfile
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing, contextmanager
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from typing import Any, Literal
 import mysql.connector
 from mysql.connector import Error, MySQLConnection
 from mysql.connector.cursor import MySQLCursor
-from .database import TransactionError, sanitize_identifier
+from . import columnar
+from .batching import (
+    BACKOFF_ERRNOS,
+    AdaptiveBatchSizer,
+    AdaptiveBatchStats,
+    sample_bytes,
+)
+from .columnar import ColumnBuilder
+from .database import (
+    PACKET_FILL_RATIO,
+    BatchInsertError,
+    FailedBatch,
+    GroupCommitError,
+    TransactionError,
+    pack_rows,
+    sanitize_identifier,
+)
+from .instrument import NO_MEASURE, EventKind, Instrumentation
+from .pool import ConnectionPool, PoolStats
+from .replica import ReplicaRouter, ReplicaStats
+from .result_cache import ResultCache
+from .rows import named_rows
+from .slow_query import SlowQueryLog
+from .statement_cache import StatementCache, StatementCacheStats
+
+logger = logging.getLogger(__name__)
+
+# connections per replica pool when Mysql itself is not pooled
+DEFAULT_REPLICA_POOL_SIZE = 5
+
+# batch_update(strategy="auto") uses CASE WHEN up to this many rows and a
+# staged temporary table with UPDATE ... JOIN above it
+CASE_UPDATE_MAX_ROWS = 500
+
+# escapes understood by LOAD DATA ... FIELDS ESCAPED BY '\\'
+_TSV_ESCAPES = str.maketrans(
+    {"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r", "\0": "\\0"}
+)
+
+
+def _tsv_field(value: Any) -> str:
+    """Render a value as an escaped LOAD DATA field."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, (bytes, bytearray)):
+        # written back out byte for byte through surrogateescape
+        value = bytes(value).decode("utf-8", "surrogateescape")
+    elif not isinstance(value, str):
+        value = str(value)
+    return value.translate(_TSV_ESCAPES)
+
+
+def _dedupe_by_key(rows: list[tuple], key_start: int) -> list[tuple]:
+    """Keep the last row per where-key, matching sequential UPDATE results."""
+    try:
+        return list({row[key_start:]: row for row in rows}.values())
+    except TypeError:
+        # unhashable key values, leave the batch as is
+        return rows
+
+
+def _case_update_statement(
+    table: str, update_columns: list[str], where_columns: list[str], rows: list[tuple]
+) -> tuple[str, list]:
+    """Build one ``UPDATE ... SET col = CASE WHEN ... END`` for all rows."""
+    n_update = len(update_columns)
+    match = " AND ".join(f"`{col}` = %s" for col in where_columns)
+    params: list = []
+
+    set_parts = []
+    for i, col in enumerate(update_columns):
+        whens = " ".join([f"WHEN {match} THEN %s"] * len(rows))
+        set_parts.append(f"`{col}` = CASE {whens} ELSE `{col}` END")
+        for row in rows:
+            params.extend(row[n_update:])
+            params.append(row[i])
+
+    if len(where_columns) == 1:
+        placeholders = ", ".join(["%s"] * len(rows))
+        where = f"`{where_columns[0]}` IN ({placeholders})"
+    else:
+        where = " OR ".join([f"({match})"] * len(rows))
+    for row in rows:
+        params.extend(row[n_update:])
+
+    query = f"UPDATE `{table}` SET {', '.join(set_parts)} WHERE {where}"
+    return query, params
+
+
+def _split_batches(
+    data: list[tuple], batch_size: int, budget: int | None
+) -> Iterator[list[tuple]]:
+    """Cut rows by count, or by estimated size when a byte budget is given."""
+    if budget is not None:
+        yield from pack_rows(data, budget)
+        return
+    for i in range(0, len(data), batch_size):
+        yield data[i : i + batch_size]
+
+
+def _is_adaptive(batch_size: Any) -> bool:
+    """Whether batch_size asks for adaptive sizing; refuse anything unknown."""
+    if isinstance(batch_size, AdaptiveBatchSizer) or batch_size == "auto":
+        return True
+    if isinstance(batch_size, int) and not isinstance(batch_size, bool):
+        return False
+    raise ValueError(
+        f"batch_size must be an int, 'auto' or an AdaptiveBatchSizer, "
+        f"got {batch_size!r}"
+    )
+
+
+@dataclass
+class BulkLoadResult:
+    """Outcome of Mysql.bulk_load."""
+
+    rows: int
+    warnings: int
+
+
+class GroupCommit:
+    """The commit group of a Mysql.group_commit() block."""
+
+    def __init__(
+        self, db: "Mysql", conn: MySQLConnection, every: int, interval: float | None
+    ):
+        self.conn = conn
+        self.every = every
+        self.interval = interval
+        # number of groups committed so far
+        self.groups = 0
+        # writes committed so far and writes waiting in the current group
+        self.committed = 0
+        self.pending = 0
+        # > 0 while a transaction() runs inside the block
+        self.paused = 0
+        # (statement, table) of the pending writes, to invalidate the
+        # result cache again once they are visible to other connections
+        self.written: set[tuple[str | None, str | None]] = set()
+        self._db = db
+        self._started = time.monotonic()
+
+    def add(self) -> None:
+        """Count a write and commit the group when it is due."""
+        self.pending += 1
+        if self.pending >= self.every or (
+            self.interval is not None
+            and time.monotonic() - self._started >= self.interval
+        ):
+            self.commit()
+
+    def commit(self) -> None:
+        """Commit the pending writes now."""
+        if self.pending:
+            try:
+                self._db._commit_now(self.conn)
+            except Error as e:
+                lost = self.rollback()
+                raise GroupCommitError(
+                    f"Group commit {self.groups} of {lost} writes failed: {e}",
+                    group=self.groups,
+                    statements=lost,
+                ) from e
+            self.groups += 1
+            self.committed += self.pending
+            self.pending = 0
+            # a read on another connection may have cached the old rows
+            # between the write and this commit
+            written, self.written = self.written, set()
+            for statement, table in written:
+                self._db._drop_cached(statement, table)
+        self._started = time.monotonic()
+
+    def rollback(self) -> int:
+        """Roll back the pending writes and return how many there were."""
+        lost, self.pending = self.pending, 0
+        self.written.clear()
+        try:
+            self.conn.rollback()
+        except Error:
+            pass
+        self._started = time.monotonic()
+        return lost
 
 
 class Mysql:
@@ -32,9 +225,53 @@ class Mysql:
     with Mysql(host='localhost', user='user', password='pass', database='mydb') as db:
         db.create("CREATE TABLE IF NOT EXISTS test"
                   "(id INT AUTO_INCREMENT PRIMARY KEY, name VARCHAR(255))")
+
+    Pass ``max_connections`` to share a thread-safe pool of connections
+    between threads instead of the single ``self.conn``:
+    db = Mysql(host='localhost', username='user', password='pass',
+               max_connections=8, pre_ping=True, pool_timeout=5)
+
+    ``statement_cache_size`` keeps that many server-side prepared statements
+    per connection for parameterized create/read/update/delete calls.
+
+    ``result_cache`` serves repeated ``read`` calls from a ResultCache; the
+    write methods invalidate the tables they touch.
+
+    ``instrumentation`` measures every connect, execute, fetch and commit,
+    see Instrumentation. ``slow_query_log`` is attached to it (one is created
+    when not given) and runs its EXPLAINs on a connection of its own:
+    db = Mysql(host='localhost', username='user', password='pass',
+               slow_query_log=SlowQueryLog(threshold=0.5, explain_sample_rate=0.1))
+
+    ``replicas`` lists connection parameters (merged over the primary's) of
+    read replicas. ``read``/``read_iter`` go to a replica picked by
+    ``replica_strategy``, everything else and anything inside
+    ``transaction()`` stays on the primary. With ``max_replica_lag`` replicas
+    further behind than that many seconds are skipped:
+    db = Mysql(host='primary', username='user', password='pass',
+               replicas=[{'host': 'replica1'}, {'host': 'replica2'}],
+               replica_strategy='least_outstanding', max_replica_lag=5)
     """
 
-    def __init__(self, host: str, username: str, password: str, **kwargs):
+    def __init__(
+        self,
+        host: str,
+        username: str,
+        password: str,
+        max_connections: int | None = None,
+        max_idle_time: float | None = None,
+        pre_ping: bool = False,
+        pool_timeout: float | None = None,
+        statement_cache_size: int = 0,
+        result_cache: ResultCache | None = None,
+        replicas: list[dict] | None = None,
+        replica_strategy: Literal["round_robin", "least_outstanding"] = "round_robin",
+        max_replica_lag: float | None = None,
+        replica_check_interval: float = 5.0,
+        instrumentation: Instrumentation | None = None,
+        slow_query_log: SlowQueryLog | None = None,
+        **kwargs,
+    ):
         """Initialize MySQL database connection"""
         self.connection_params = {
             "host": host,
@@ -43,18 +280,142 @@ class Mysql:
             **kwargs,
         }
         self.conn: MySQLConnection | None = None
+        if slow_query_log is not None and instrumentation is None:
+            instrumentation = Instrumentation()
+        self.instrumentation = instrumentation
+        self.slow_query_log = slow_query_log
+        if slow_query_log is not None:
+            slow_query_log.attach(instrumentation, connect=self._new_connection)
+        self._pool: ConnectionPool | None = None
+        if max_connections is not None:
+            self._pool = ConnectionPool(
+                self._new_connection,
+                max_size=max_connections,
+                max_idle=max_idle_time,
+                pre_ping=pre_ping,
+                timeout=pool_timeout,
+            )
+        # connection pinned to the current thread, e.g. inside transaction()
+        self._local = threading.local()
+        # connections closed mid-use that must not go back to the pool
+        self._dropped: weakref.WeakSet = weakref.WeakSet()
+        self._max_allowed_packet: int | None = None
+        self.statement_cache_size = statement_cache_size
+        self._statement_caches: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._statement_cache_stats = StatementCacheStats()
+        self._statement_cache_lock = threading.Lock()
+        self.result_cache = result_cache
+        # AdaptiveBatchSizer per (operation, table) for batch_size="auto"
+        self._batch_sizers: dict[tuple[str, str], AdaptiveBatchSizer] = {}
+        self._batch_sizers_lock = threading.Lock()
+        self._replicas: ReplicaRouter | None = None
+        if replicas:
+            pools = {}
+            for i, overrides in enumerate(replicas):
+                params = {**self.connection_params, **overrides}
+                name = f"{params.get('host')}:{params.get('port', 3306)}"
+                if name in pools:
+                    name = f"{name}#{i}"
+                pools[name] = ConnectionPool(
+                    self._connector(params),
+                    max_size=max_connections or DEFAULT_REPLICA_POOL_SIZE,
+                    max_idle=max_idle_time,
+                    pre_ping=pre_ping,
+                    timeout=pool_timeout,
+                )
+            self._replicas = ReplicaRouter(
+                pools,
+                strategy=replica_strategy,
+                max_lag=max_replica_lag,
+                check_interval=replica_check_interval,
+            )
+
+    def _new_connection(self) -> MySQLConnection:
+        """Open a new connection with the configured parameters."""
+        return self._connector(self.connection_params)()
+
+    def _connector(self, params: dict) -> Callable[[], MySQLConnection]:
+        """Return a function opening connections with ``params``."""
+
+        def connect() -> MySQLConnection:
+            try:
+                with self._measure("connect", params=params.get("host")):
+                    return mysql.connector.connect(**params)
+            except Error as e:
+                raise ConnectionError(f"Failed to connect to MySQL: {e}") from e
+
+        return connect
+
+    def _measure(
+        self, kind: EventKind, statement: str | None = None, params: Any = None
+    ):
+        """Measure a call with the instrumentation, if any."""
+        if self.instrumentation is None:
+            return NO_MEASURE
+        return self.instrumentation.measure(kind, statement, params, source="mysql")
+
+    def _execute(self, cursor: MySQLCursor, statement: str, params: Any = ()) -> None:
+        """Execute a statement on a cursor."""
+        with self._measure("execute", statement, params) as event:
+            if params:
+                cursor.execute(statement, params)
+            else:
+                cursor.execute(statement)
+            event.rows = cursor.rowcount
+
+    def _executemany(
+        self, cursor: MySQLCursor, statement: str, rows: Sequence[Sequence[Any]]
+    ) -> None:
+        """Execute a statement once per row."""
+        with self._measure("execute", statement, rows) as event:
+            event.executemany = True
+            cursor.executemany(statement, rows)
+            event.rows = cursor.rowcount
+
+    def _fetch(self, statement: str, fetch: Callable[[], list]) -> list:
+        """Fetch rows of a statement's result with ``fetch``."""
+        with self._measure("fetch", statement) as event:
+            rows = fetch()
+            event.rows = len(rows)
+            return rows
+
+    def _commit(self, conn: MySQLConnection) -> None:
+        """Commit after a write, or leave it to an active group_commit()."""
+        group = getattr(self._local, "group", None)
+        if group is not None and group.conn is conn and not group.paused:
+            group.add()
+            return
+        self._commit_now(conn)
+
+    def _commit_now(self, conn: MySQLConnection) -> None:
+        """Commit the connection's transaction."""
+        with self._measure("commit"):
+            conn.commit()
 
     def connect(self) -> None:
         """Establish database connection."""
-        try:
-            self.conn = mysql.connector.connect(**self.connection_params)
-        except Error as e:
-            raise ConnectionError(f"Failed to connect to MySQL: {e}") from e
+        self.conn = self._new_connection()
 
     def close(self) -> None:
         """Close the database connection."""
         if self.conn and self.conn.is_connected():
             self.conn.close()
+        if self._pool is not None:
+            self._pool.close()
+        if self._replicas is not None:
+            self._replicas.close()
+
+    def replica_stats(self) -> list[ReplicaStats]:
+        """Return routing state per replica, empty when none are configured."""
+        if self._replicas is None:
+            return []
+        return self._replicas.stats()
+
+    def pool_stats(self) -> PoolStats | None:
+        """Return connection pool statistics, or None when not pooled."""
+        if self._pool is None:
+            return None
+        return self._pool.stats()
 
     def __enter__(self) -> "Mysql":
         return self
@@ -62,34 +423,266 @@ class Mysql:
     def __exit__(self, exc_type, exc_val, exc_tb) -> None:
         self.close()
 
+    def statement_cache_stats(self) -> StatementCacheStats:
+        """Return prepared statement cache counters over all connections."""
+        with self._statement_cache_lock:
+            stats = StatementCacheStats(**vars(self._statement_cache_stats))
+            stats.size = sum(len(cache) for cache in self._statement_caches.values())
+        return stats
+
+    def batch_size_stats(self) -> dict[str, AdaptiveBatchStats]:
+        """Return the sizes batch_size="auto" chose, keyed ``operation:table``."""
+        with self._batch_sizers_lock:
+            sizers = dict(self._batch_sizers)
+        return {f"{op}:{table}": sizer.stats() for (op, table), sizer in sizers.items()}
+
+    def _batch_sizer(
+        self, batch_size: Literal["auto"] | AdaptiveBatchSizer, op: str, table: str
+    ) -> AdaptiveBatchSizer:
+        """The sizer passed in, or the one kept for ``op`` on ``table``."""
+        if isinstance(batch_size, AdaptiveBatchSizer):
+            return batch_size
+        with self._batch_sizers_lock:
+            sizer = self._batch_sizers.get((op, table))
+            if sizer is None:
+                sizer = self._batch_sizers[(op, table)] = AdaptiveBatchSizer()
+            return sizer
+
+    def _adaptive_batches(
+        self,
+        conn: MySQLConnection,
+        sizer: AdaptiveBatchSizer,
+        data: list[tuple],
+        max_bytes: int,
+        run_batch: Callable[[list[tuple]], int],
+        expansion: int = 1,
+    ) -> int:
+        """Run ``data`` through ``run_batch`` in batches sized by ``sizer``.
+
+        ``expansion`` is how many times a row's values appear in the batch
+        statement. A batch rejected with a lock wait timeout or an oversized
+        packet is retried smaller; only the failed statement was rolled back.
+        """
+        total = 0
+        start = 0
+        while start < len(data):
+            batch = data[start : start + sizer.next_size(max_bytes)]
+            nbytes = sample_bytes(batch) * expansion
+            started = time.perf_counter()
+            try:
+                total += run_batch(batch)
+            except Error as e:
+                if (
+                    e.errno not in BACKOFF_ERRNOS
+                    or len(batch) == 1
+                    or not conn.is_connected()
+                ):
+                    raise
+                sizer.back_off(len(batch))
+                continue
+            sizer.record(len(batch), time.perf_counter() - started, nbytes)
+            start += len(batch)
+        return total
+
     def _ensure_connection(self) -> None:
         """Ensure the database connection is active."""
         if self.conn is None:
             self.connect()
         elif not self.conn.is_connected():
+            # prepared statements die with the old session
+            self._forget_statements(self.conn)
             self.connect()
 
+    @contextmanager
+    def _connection(self) -> Iterator[MySQLConnection]:
+        """Borrow a connection: the pinned one, a pooled one or ``self.conn``."""
+        pinned = getattr(self._local, "conn", None)
+        if pinned is not None:
+            yield pinned
+        elif self._pool is None:
+            self._ensure_connection()
+            yield self.conn
+        else:
+            conn = self._pool.acquire()
+            try:
+                yield conn
+            finally:
+                discard = conn in self._dropped
+                self._dropped.discard(conn)
+                self._pool.release(conn, discard=discard)
+
+    @contextmanager
+    def _read_connection(self) -> Iterator[MySQLConnection]:
+        """Borrow a replica connection for a read, or fall back to the primary."""
+        replica = None
+        if self._replicas is not None and getattr(self._local, "conn", None) is None:
+            replica = self._replicas.acquire()
+        if replica is None:
+            with self._connection() as conn:
+                yield conn
+            return
+
+        index, conn = replica
+        try:
+            yield conn
+        finally:
+            discard = conn in self._dropped
+            self._dropped.discard(conn)
+            self._replicas.release(index, conn, discard=discard)
+
+    def _drop_connection(self, conn: MySQLConnection) -> None:
+        """Close a borrowed connection so it is replaced rather than reused."""
+        self._dropped.add(conn)
+        self._forget_statements(conn)
+        try:
+            conn.close()
+        except Error:
+            pass
+
+    def _statement_cursor(
+        self, conn: MySQLConnection, statement: str, vals: tuple
+    ) -> tuple[MySQLCursor, str]:
+        """Return a cursor for the statement, prepared and cached if enabled."""
+        if not vals or not self.statement_cache_size:
+            return conn.cursor(), statement
+        with self._statement_cache_lock:
+            cache = self._statement_caches.get(conn)
+            if cache is None:
+                cache = StatementCache(
+                    self.statement_cache_size,
+                    self._statement_cache_stats,
+                    self._statement_cache_lock,
+                )
+                self._statement_caches[conn] = cache
+        return cache.prepared(conn, statement)
+
+    def _forget_statements(self, conn: MySQLConnection) -> None:
+        """Drop the prepared statement cache of a connection."""
+        with self._statement_cache_lock:
+            cache = self._statement_caches.pop(conn, None)
+        if cache is not None:
+            cache.clear()
+
+    @contextmanager
+    def group_commit(
+        self, every: int = 100, interval: float | None = None
+    ) -> Iterator["GroupCommit"]:
+        """Coalesce the commits of this thread's writes into groups.
+
+        Inside the block create/update/delete and the batch methods skip their
+        own commit; a commit is issued after every ``every`` writes, on the
+        first write ``interval`` seconds or more after the group started, and
+        when the block ends. A failing group commit raises GroupCommitError.
+        If the block raises, the pending group is rolled back and the error is
+        raised as GroupCommitError; groups committed before stay committed.
+        ``transaction()`` inside the block first commits the pending group and
+        then behaves as usual.
+
+        Example:
+        with db.group_commit(every=500, interval=0.05):
+            for row_id, name in changes:
+                db.update("UPDATE test SET name = %s WHERE id = %s", (name, row_id))
+        """
+        if every < 1:
+            raise ValueError("every must be at least 1")
+        if getattr(self._local, "group", None) is not None:
+            raise TransactionError("group_commit() can't be nested")
+        with self._pinned_connection() as conn:
+            group = GroupCommit(self, conn, every, interval)
+            self._local.group = group
+            try:
+                yield group
+            except GroupCommitError:
+                group.rollback()
+                raise
+            except Exception as e:
+                lost = group.rollback()
+                raise GroupCommitError(
+                    f"Group {group.groups} rolled back after {lost} writes: {e}",
+                    group=group.groups,
+                    statements=lost,
+                ) from e
+            except BaseException:
+                group.rollback()
+                raise
+            else:
+                group.commit()
+            finally:
+                self._local.group = None
+
+    @contextmanager
+    def _pause_group(self) -> Iterator[None]:
+        """Commit a pending group and let writes commit themselves meanwhile."""
+        group = getattr(self._local, "group", None)
+        if group is None:
+            yield
+            return
+        group.commit()
+        group.paused += 1
+        try:
+            yield
+        finally:
+            group.paused -= 1
+
+    @contextmanager
+    def _pinned_connection(self) -> Iterator[MySQLConnection]:
+        """Borrow a connection and route this thread's calls to it."""
+        if getattr(self._local, "conn", None) is not None:
+            yield self._local.conn
+            return
+        with self._connection() as conn:
+            self._local.conn = conn
+            try:
+                yield conn
+            finally:
+                self._local.conn = None
+
     def create(self, statement: str, vals: tuple = ()) -> int:
         """create database or table"""
-        self._ensure_connection()
-        cursor = self.conn.cursor()
-        if vals:
-            cursor.execute(statement, vals)
-            self.conn.commit()
-        else:
-            cursor.execute(statement)
-        return cursor.rowcount
+        with self._connection() as conn:
+            cursor, statement = self._statement_cursor(conn, statement, vals)
+            self._execute(cursor, statement, vals)
+            if vals:
+                self._commit(conn)
+            self._invalidate(statement=statement)
+            return cursor.rowcount
 
     def batch_insert(
         self,
         table: str,
         columns: list[str],
         data: list[tuple],
-        batch_size: int = 1000,
+        batch_size: int | Literal["auto"] | AdaptiveBatchSizer = 1000,
         on_duplicate_key_update: bool = False,
         update_columns: list[str] | None = None,
+        pack: bool = False,
+        max_packet_bytes: int | None = None,
+        parallelism: int = 1,
     ) -> int:
-        """Perform a batch insert operation."""
+        """Perform a batch insert operation.
+
+        By default rows are sent ``batch_size`` at a time through executemany.
+        With ``pack=True`` rows are packed into multi-row
+        ``INSERT ... VALUES (...), (...)`` statements cut by estimated byte
+        size against ``max_packet_bytes`` (the server's max_allowed_packet
+        when not given) and ``batch_size`` is ignored.
+
+        ``batch_size="auto"`` sizes batches toward a target latency with an
+        AdaptiveBatchSizer kept per table (see ``batch_size_stats()``), capped
+        by max_allowed_packet; pass an AdaptiveBatchSizer to tune it.
+
+        With ``parallelism=N`` batches are inserted concurrently over N
+        connections (the pool's, or temporary ones when not pooled). Each
+        batch commits on its own. If any batch fails a BatchInsertError
+        reports the committed row count and the failed batches to retry.
+        """
+        if parallelism < 1:
+            raise ValueError("parallelism must be at least 1")
+        adaptive = _is_adaptive(batch_size)
+        if adaptive and (pack or parallelism > 1):
+            raise ValueError(
+                "adaptive batch_size can't be combined with pack or parallelism"
+            )
         if not data:
             return 0
 
@@ -109,7 +702,9 @@ class Mysql:
         placeholders = ", ".join(["%s"] * len(safe_columns))
 
         # Build the basic INSERT query with backticks
-        query = f"INSERT INTO `{safe_table}` ({columns_str}) VALUES ({placeholders})"
+        head = f"INSERT INTO `{safe_table}` ({columns_str}) VALUES "
+        row_placeholder = f"({placeholders})"
+        suffix = ""
 
         # Add ON DUPLICATE KEY UPDATE if needed
         if on_duplicate_key_update:
@@ -124,63 +719,467 @@ class Mysql:
             update_clause = ", ".join(
                 f"`{col}` = VALUES(`{col}`)" for col in update_columns
             )
-            query += f" ON DUPLICATE KEY UPDATE {update_clause}"
+            suffix = f" ON DUPLICATE KEY UPDATE {update_clause}"
+
+        statement = (head, row_placeholder, suffix)
+        if parallelism > 1:
+            try:
+                return self._parallel_insert(
+                    statement, data, batch_size, pack, max_packet_bytes, parallelism
+                )
+            finally:
+                self._invalidate(table=safe_table)
 
         # Process in batches to avoid very large queries
         total_affected = 0
-        self._ensure_connection()
-        cursor = self.conn.cursor()
+        with self._connection() as conn:
+            cursor = conn.cursor()
 
-        try:
-            for i in range(0, len(data), batch_size):
-                batch = data[i : i + batch_size]
-                cursor.executemany(query, batch)
-                total_affected += cursor.rowcount
+            try:
+                if adaptive:
+                    total_affected = self._adaptive_batches(
+                        conn,
+                        self._batch_sizer(batch_size, "insert", safe_table),
+                        data,
+                        self._packet_budget(conn, max_packet_bytes, statement),
+                        lambda batch: self._insert_batch(
+                            cursor, statement, batch, False
+                        ),
+                    )
+                else:
+                    budget = None
+                    if pack:
+                        budget = self._packet_budget(conn, max_packet_bytes, statement)
+                    for batch in _split_batches(data, batch_size, budget):
+                        total_affected += self._insert_batch(
+                            cursor, statement, batch, pack
+                        )
 
-            self.conn.commit()
-            return total_affected
+                self._commit(conn)
+                self._invalidate(table=safe_table)
+                return total_affected
 
-        except Error as e:
-            self.conn.rollback()
-            raise Exception(f"Batch insert failed: {e}") from e
+            except Error as e:
+                conn.rollback()
+                raise Exception(f"Batch insert failed: {e}") from e
+            finally:
+                cursor.close()
+
+    def bulk_load(
+        self,
+        table: str,
+        columns: list[str],
+        rows: Iterable[Sequence[Any]],
+        spool_rows: int = 100_000,
+        replace: bool = False,
+    ) -> BulkLoadResult:
+        """Load rows with ``LOAD DATA LOCAL INFILE``.
+
+        Rows are written as escaped TSV into a temporary spool file that is
+        loaded and truncated every ``spool_rows`` rows, so memory and disk use
+        stay bounded however long ``rows`` is. Each spool is committed once
+        loaded. The connection must allow it, e.g.
+        ``Mysql(..., allow_local_infile=True)``.
+        """
+        if not columns:
+            raise ValueError("columns cannot be empty")
+        if spool_rows < 1:
+            raise ValueError("spool_rows must be at least 1")
+
+        # Sanitize all identifiers
+        safe_table = sanitize_identifier(table)
+        safe_columns = [sanitize_identifier(col) for col in columns]
+        if not safe_table or not all(safe_columns):
+            raise ValueError("Invalid table or column names provided")
+
+        columns_str = ", ".join(f"`{col}`" for col in safe_columns)
+        duplicate = " REPLACE" if replace else ""
+        query = (
+            f"LOAD DATA LOCAL INFILE %s{duplicate} INTO TABLE `{safe_table}` "
+            "CHARACTER SET utf8mb4 "
+            "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' "
+            f"LINES TERMINATED BY '\\n' ({columns_str})"
+        )
+
+        result = BulkLoadResult(rows=0, warnings=0)
+        fd, path = tempfile.mkstemp(prefix="bulk_load_", suffix=".tsv")
+        try:
+            with open(
+                fd, "w", encoding="utf-8", errors="surrogateescape", newline=""
+            ) as spool, self._connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    pending = 0
+                    for row in rows:
+                        if len(row) != len(safe_columns):
+                            raise ValueError(
+                                f"Expected {len(safe_columns)} values per row, "
+                                f"got {len(row)}"
+                            )
+                        spool.write("\t".join(map(_tsv_field, row)))
+                        spool.write("\n")
+                        pending += 1
+                        if pending >= spool_rows:
+                            self._load_spool(
+                                conn, cursor, spool, query, path, safe_table, result
+                            )
+                            pending = 0
+                    if pending:
+                        self._load_spool(
+                            conn, cursor, spool, query, path, safe_table, result
+                        )
+                    return result
+                except Error as e:
+                    conn.rollback()
+                    raise Exception(
+                        f"Bulk load failed after {result.rows} rows: {e}"
+                    ) from e
+                finally:
+                    cursor.close()
         finally:
-            cursor.close()
+            os.unlink(path)
+
+    def _load_spool(
+        self,
+        conn: MySQLConnection,
+        cursor: MySQLCursor,
+        spool: Any,
+        query: str,
+        path: str,
+        table: str,
+        result: BulkLoadResult,
+    ) -> None:
+        """Load the spool file, commit and empty it for the next rows."""
+        spool.flush()
+        self._execute(cursor, query, (path,))
+        result.rows += cursor.rowcount
+        result.warnings += cursor.warning_count or 0
+        self._commit(conn)
+        self._invalidate(table=table)
+        spool.seek(0)
+        spool.truncate()
+
+    def _parallel_insert(
+        self,
+        statement: tuple[str, str, str],
+        data: list[tuple],
+        batch_size: int,
+        pack: bool,
+        max_packet_bytes: int | None,
+        parallelism: int,
+    ) -> int:
+        """Insert batches concurrently, committing each one separately."""
+        if getattr(self._local, "conn", None) is not None:
+            raise ValueError("parallel batch_insert can't run inside transaction()")
+
+        pool = self._pool
+        if pool is None:
+            pool = ConnectionPool(self._new_connection, max_size=parallelism)
+
+        def insert(batch: list[tuple]) -> int:
+            with pool.connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    affected = self._insert_batch(cursor, statement, batch, pack)
+                    self._commit(conn)
+                    return affected
+                except Error:
+                    conn.rollback()
+                    raise
+                finally:
+                    cursor.close()
 
-    def read(self, statement: str, vals: tuple = ()) -> list[dict]:
-        """read rows from table"""
-        self._ensure_connection()
-        cursor = self.conn.cursor()
         try:
-            if vals:
-                cursor.execute(statement, vals)
-            else:
-                cursor.execute(statement)
-            results = cursor.fetchall()
-            return results
-        except Error as e:
-            # maybe here can raise a custom error, example DatabaseError
-            raise Exception(f"Failed to read from MySQL: {e}") from e
+            budget = None
+            if pack:
+                with pool.connection() as conn:
+                    budget = self._packet_budget(conn, max_packet_bytes, statement)
+            batches = list(_split_batches(data, batch_size, budget))
 
-    def update(self, statement: str, vals: tuple = ()) -> int:
-        """update rows in table"""
-        self._ensure_connection()
-        cursor = self.conn.cursor()
-        if vals:
-            cursor.execute(statement, vals)
+            with ThreadPoolExecutor(
+                max_workers=parallelism, thread_name_prefix="batch_insert"
+            ) as executor:
+                futures = [executor.submit(insert, batch) for batch in batches]
+
+            inserted = 0
+            failed: list[FailedBatch] = []
+            for index, (batch, future) in enumerate(zip(batches, futures)):
+                error = future.exception()
+                if error is None:
+                    inserted += future.result()
+                else:
+                    failed.append(FailedBatch(index=index, rows=batch, error=error))
+        finally:
+            if pool is not self._pool:
+                pool.close()
+
+        if failed:
+            raise BatchInsertError(
+                f"Batch insert failed for {len(failed)} of {len(batches)} batches: "
+                f"{failed[0].error}",
+                inserted=inserted,
+                failed_batches=failed,
+            )
+        return inserted
+
+    def _packet_budget(
+        self,
+        conn: MySQLConnection,
+        max_packet_bytes: int | None,
+        statement: tuple[str, str, str],
+    ) -> int:
+        """Bytes available for the VALUES rows of a packed statement."""
+        if max_packet_bytes is None:
+            max_packet_bytes = self._get_max_allowed_packet(conn)
+        head, _, suffix = statement
+        return int(max_packet_bytes * PACKET_FILL_RATIO) - len(head) - len(suffix)
+
+    def _usable_result_cache(self) -> ResultCache | None:
+        """The result cache, unless disabled or inside a transaction."""
+        if getattr(self._local, "conn", None) is not None:
+            return None
+        return self.result_cache
+
+    def _invalidate(
+        self, statement: str | None = None, table: str | None = None
+    ) -> None:
+        """Drop cached results for a written table or write statement."""
+        if self.result_cache is None:
+            return
+        group = getattr(self._local, "group", None)
+        if group is not None and not group.paused:
+            group.written.add((statement, table))
+        self._drop_cached(statement, table)
+
+    def _drop_cached(self, statement: str | None, table: str | None) -> None:
+        if table is not None:
+            self.result_cache.invalidate_tables([table])
         else:
-            cursor.execute(statement)
-        self.conn.commit()
+            self.result_cache.invalidate_statement(statement)
+
+    def _insert_batch(
+        self,
+        cursor: MySQLCursor,
+        statement: tuple[str, str, str],
+        batch: list[tuple],
+        pack: bool,
+    ) -> int:
+        """Send one batch as a multi-row INSERT or through executemany."""
+        head, row_placeholder, suffix = statement
+        if pack:
+            values = ", ".join([row_placeholder] * len(batch))
+            params = [value for row in batch for value in row]
+            self._execute(cursor, head + values + suffix, params)
+        else:
+            self._executemany(cursor, head + row_placeholder + suffix, batch)
         return cursor.rowcount
 
+    def _get_max_allowed_packet(self, conn: MySQLConnection) -> int:
+        """Return the server's max_allowed_packet, queried once."""
+        if self._max_allowed_packet is None:
+            cursor = conn.cursor()
+            try:
+                self._execute(cursor, "SELECT @@max_allowed_packet")
+                self._max_allowed_packet = int(cursor.fetchone()[0])
+            finally:
+                cursor.close()
+        return self._max_allowed_packet
+
+    def read(self, statement: str, vals: tuple = (), named: bool = False) -> list:
+        """read rows from table
+
+        With ``named`` rows are compact Row tuples that are also readable by
+        column name (``row.id``, ``row["id"]``), see ``rows.row_type``.
+        """
+        cache = self._usable_result_cache()
+        key = generation = None
+        if cache is not None:
+            key = cache.make_key(statement, vals)
+            if named and key is not None:
+                key = (key, "named")
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+            generation = cache.generation()
+
+        with self._read_connection() as conn:
+            cursor, statement = self._statement_cursor(conn, statement, vals)
+            try:
+                self._execute(cursor, statement, vals)
+                results = self._fetch(statement, cursor.fetchall)
+                if named:
+                    results = named_rows(cursor.description, results)
+                if cache is not None:
+                    cache.put(key, statement, results, generation)
+                return results
+            except Error as e:
+                # maybe here can raise a custom error, example DatabaseError
+                raise Exception(f"Failed to read from MySQL: {e}") from e
+
+    def read_chunks(
+        self,
+        statement: str,
+        vals: tuple = (),
+        chunk_size: int = 1000,
+        dictionary: bool = False,
+        named: bool = False,
+    ) -> Iterator[list]:
+        """Yield lists of up to ``chunk_size`` rows from an unbuffered cursor.
+
+        Rows are fetched from the wire as the consumer asks for them, so memory
+        stays flat however large the result is. If the consumer stops early the
+        connection is closed (or, inside ``transaction()``, drained) so it is
+        never reused with an unread result pending. ``named`` yields Row
+        tuples readable by column name instead of tuples or dicts.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+
+        with self._read_connection() as conn:
+            cursor = conn.cursor(buffered=False, dictionary=dictionary and not named)
+            exhausted = False
+            try:
+                try:
+                    self._execute(cursor, statement, vals)
+                    while True:
+                        rows = self._fetch(
+                            statement, lambda: cursor.fetchmany(chunk_size)
+                        )
+                        if not rows:
+                            break
+                        if named:
+                            rows = named_rows(cursor.description, rows)
+                        yield rows
+                    exhausted = True
+                except Error as e:
+                    raise Exception(f"Failed to read from MySQL: {e}") from e
+            finally:
+                if not exhausted:
+                    self._abandon_result(conn, cursor, chunk_size)
+                try:
+                    cursor.close()
+                except Error:
+                    pass
+
+    def read_iter(
+        self,
+        statement: str,
+        vals: tuple = (),
+        chunk_size: int = 1000,
+        dictionary: bool = False,
+        named: bool = False,
+    ) -> Iterator[tuple | dict]:
+        """Yield rows one at a time, see ``read_chunks``."""
+        with closing(
+            self.read_chunks(statement, vals, chunk_size, dictionary, named)
+        ) as chunks:
+            for rows in chunks:
+                yield from rows
+
+    def read_columns(
+        self,
+        statement: str,
+        vals: tuple = (),
+        chunk_size: int = 10_000,
+        as_numpy: bool | None = None,
+    ) -> dict[str, Any]:
+        """Read a result as ``{column name: array}`` instead of rows.
+
+        Rows are fetched ``chunk_size`` at a time and appended column by
+        column, so the full list of row tuples never exists. Numeric columns
+        become ``array.array`` typed from the cursor description, or NumPy
+        arrays when ``as_numpy`` (the default when NumPy is installed); other
+        columns are lists or object arrays. See ColumnBuilder for NULLs.
+
+        Example:
+        columns = db.read_columns("SELECT id, price FROM orders")
+        total = sum(columns["price"])
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        if as_numpy is None:
+            as_numpy = columnar.np is not None
+        elif as_numpy and columnar.np is None:
+            raise ImportError("as_numpy=True requires NumPy")
+
+        with self._read_connection() as conn:
+            cursor = conn.cursor(buffered=False)
+            exhausted = False
+            try:
+                try:
+                    self._execute(cursor, statement, vals)
+                    builder = ColumnBuilder(cursor.description or ())
+                    while True:
+                        rows = self._fetch(
+                            statement, lambda: cursor.fetchmany(chunk_size)
+                        )
+                        if not rows:
+                            break
+                        builder.add(rows)
+                    exhausted = True
+                except Error as e:
+                    raise Exception(f"Failed to read from MySQL: {e}") from e
+            finally:
+                if not exhausted:
+                    self._abandon_result(conn, cursor, chunk_size)
+                try:
+                    cursor.close()
+                except Error:
+                    pass
+        return builder.result(as_numpy)
+
+    def _abandon_result(
+        self, conn: MySQLConnection, cursor: MySQLCursor, chunk_size: int
+    ) -> None:
+        """Get rid of a partially read result set."""
+        if getattr(self._local, "conn", None) is conn:
+            # can't drop a connection holding an open transaction
+            try:
+                while cursor.fetchmany(chunk_size):
+                    pass
+            except Error:
+                self._drop_connection(conn)
+        else:
+            self._drop_connection(conn)
+
+    def update(self, statement: str, vals: tuple = ()) -> int:
+        """update rows in table"""
+        with self._connection() as conn:
+            cursor, statement = self._statement_cursor(conn, statement, vals)
+            self._execute(cursor, statement, vals)
+            self._commit(conn)
+            self._invalidate(statement=statement)
+            return cursor.rowcount
+
     def batch_update(
         self,
         table: str,
         update_columns: list[str],
         where_columns: list[str],
         data: list[tuple],
-        batch_size: int = 1000,
+        batch_size: int | Literal["auto"] | AdaptiveBatchSizer = 1000,
+        strategy: Literal["executemany", "case", "join", "auto"] = "executemany",
     ) -> int:
-        """Perform a batch update operation."""
+        """Perform a batch update operation.
+
+        Each row in ``data`` holds the update values followed by the where
+        values. ``strategy`` picks how they reach the server:
+
+        - ``executemany``: one ``UPDATE ... WHERE`` per row.
+        - ``case``: one ``UPDATE ... SET col = CASE WHEN ...`` per batch.
+        - ``join``: stage all rows in a temporary table with multi-row inserts
+          and apply them with a single ``UPDATE ... JOIN``.
+        - ``auto``: ``case`` up to CASE_UPDATE_MAX_ROWS rows, ``join`` above.
+
+        ``case`` and ``join`` apply the last row when a where-key repeats,
+        like ``executemany`` does.
+
+        ``batch_size="auto"`` (or an AdaptiveBatchSizer) sizes the
+        ``executemany`` and ``case`` batches adaptively, see batch_insert;
+        ``auto`` then always picks ``case``.
+        """
+        if strategy not in ("executemany", "case", "join", "auto"):
+            raise ValueError(f"Unknown batch update strategy: {strategy}")
         if not data:
             return 0
 
@@ -211,47 +1210,135 @@ class Mysql:
         query = f"UPDATE {safe_table} SET {set_clause} WHERE {where_clause}"
 
         # Process in batches to avoid very large queries
+        adaptive = _is_adaptive(batch_size)
+        if strategy == "auto":
+            if adaptive or len(data) <= CASE_UPDATE_MAX_ROWS:
+                strategy = "case"
+            else:
+                strategy = "join"
+
+        def update_batch(batch: list[tuple]) -> int:
+            if strategy == "case":
+                rows = _dedupe_by_key(batch, len(safe_update_columns))
+                self._execute(
+                    cursor,
+                    *_case_update_statement(
+                        safe_table,
+                        safe_update_columns,
+                        safe_where_columns,
+                        rows,
+                    ),
+                )
+            else:
+                # Convert each row's data into the correct parameter
+                # order (update_values first, then where_values)
+                params = list(batch)
+                self._executemany(cursor, query, params)
+            return cursor.rowcount
+
         total_affected = 0
-        self._ensure_connection()
-        cursor = self.conn.cursor()
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            try:
+                if strategy == "join":
+                    total_affected = self._join_update(
+                        conn,
+                        cursor,
+                        safe_table,
+                        safe_update_columns,
+                        safe_where_columns,
+                        data,
+                    )
+                elif adaptive:
+                    total_affected = self._adaptive_batches(
+                        conn,
+                        self._batch_sizer(batch_size, "update", safe_table),
+                        data,
+                        self._packet_budget(conn, None, (query, "", "")),
+                        update_batch,
+                        # CASE repeats the where values once per column
+                        len(safe_update_columns) + 1 if strategy == "case" else 1,
+                    )
+                else:
+                    for i in range(0, len(data), batch_size):
+                        total_affected += update_batch(data[i : i + batch_size])
+
+                self._commit(conn)
+                self._invalidate(table=safe_table)
+                return total_affected
+            except Error as e:
+                conn.rollback()
+                raise Exception(f"Batch update failed: {e}") from e
+            finally:
+                cursor.close()
+
+    def _join_update(
+        self,
+        conn: MySQLConnection,
+        cursor: MySQLCursor,
+        table: str,
+        update_columns: list[str],
+        where_columns: list[str],
+        data: list[tuple],
+    ) -> int:
+        """Stage rows in a temporary table and apply them with one UPDATE."""
+        staging = f"_batch_update_{table}"[:64]
+        columns_str = ", ".join(f"`{col}`" for col in update_columns + where_columns)
+        index_str = ", ".join(f"`{col}`" for col in where_columns)
+        head = f"INSERT INTO `{staging}` ({columns_str}) VALUES "
+        n_columns = len(update_columns) + len(where_columns)
+        row_placeholder = "(" + ", ".join(["%s"] * n_columns) + ")"
+
+        self._execute(cursor, f"DROP TEMPORARY TABLE IF EXISTS `{staging}`")
+        # LIMIT 0 copies the column types of the target table without rows
+        self._execute(
+            cursor,
+            f"CREATE TEMPORARY TABLE `{staging}` (INDEX ({index_str})) "
+            f"SELECT {columns_str} FROM `{table}` LIMIT 0"
+        )
         try:
-            for i in range(0, len(data), batch_size):
-                batch = data[i : i + batch_size]
-                # Convert each row's data into the correct parameter order
-                # (update_values first, then where_values)
-                params = list(batch)
-                cursor.executemany(query, params)
-                total_affected += cursor.rowcount
+            budget = int(self._get_max_allowed_packet(conn) * PACKET_FILL_RATIO)
+            rows = _dedupe_by_key(data, len(update_columns))
+            for batch in pack_rows(rows, budget - len(head)):
+                values = ", ".join([row_placeholder] * len(batch))
+                params = [v for row in batch for v in row]
+                self._execute(cursor, head + values, params)
 
-            self.conn.commit()
-            return total_affected
-        except Error as e:
-            self.conn.rollback()
-            raise Exception(f"Batch update failed: {e}") from e
+            on_clause = " AND ".join(
+                f"t.`{col}` = s.`{col}`" for col in where_columns
+            )
+            set_clause = ", ".join(f"t.`{col}` = s.`{col}`" for col in update_columns)
+            self._execute(
+                cursor,
+                f"UPDATE `{table}` AS t JOIN `{staging}` AS s ON {on_clause} "
+                f"SET {set_clause}"
+            )
+            return cursor.rowcount
         finally:
-            cursor.close()
+            try:
+                self._execute(cursor, f"DROP TEMPORARY TABLE IF EXISTS `{staging}`")
+            except Exception:  # pylint: disable=broad-exception-caught
+                # keep the UPDATE's error; the next call drops it first anyway
+                logger.warning("failed to drop %s", staging, exc_info=True)
 
     def delete(self, statement: str, vals: tuple = ()) -> int:
         """Delete rows from table"""
-        self._ensure_connection()
-        cursor = self.conn.cursor()
-        if vals:
-            cursor.execute(statement, vals)
-        else:
-            cursor.execute(statement)
-        self.conn.commit()
-        return cursor.rowcount
+        with self._connection() as conn:
+            cursor, statement = self._statement_cursor(conn, statement, vals)
+            self._execute(cursor, statement, vals)
+            self._commit(conn)
+            self._invalidate(statement=statement)
+            return cursor.rowcount
 
     @contextmanager
     def cursor(self, dictionary: bool = False) -> MySQLCursor:
         """Get a database cursor with context manager."""
-        self._ensure_connection()
-
-        cursor = self.conn.cursor(dictionary=dictionary)
-        try:
-            yield cursor
-        finally:
-            cursor.close()
+        with self._connection() as conn:
+            cursor = conn.cursor(dictionary=dictionary)
+            try:
+                yield cursor
+            finally:
+                cursor.close()
 
     @contextmanager
     def transaction(
@@ -262,37 +1349,38 @@ class Mysql:
             # Default: rollback on any exception
             rollback_on = (Exception,)
 
-        try:
-            # Start transaction
-            self._ensure_connection()
-            self.conn.start_transaction()
+        # Every call made by this thread inside the block uses this connection
+        with self._pinned_connection() as conn, self._pause_group():
+            try:
+                # Start transaction
+                conn.start_transaction()
 
-            # Execute the code inside the with block
-            yield
+                # Execute the code inside the with block
+                yield
 
-            # If we get here, commit the transaction
-            self.conn.commit()
+                # If we get here, commit the transaction
+                self._commit_now(conn)
 
-        except rollback_on:
-            # Rollback on specified exceptions
-            try:
-                self.conn.rollback()
-            except Error as rollback_err:
-                # If rollback fails, raise a TransactionError
-                raise TransactionError(
-                    "Failed to rollback transaction"
-                ) from rollback_err
-            # Re-raise the original exception
-            raise
-
-        except Exception:
-            # For any other exception, rollback if not in autocommit mode
-            if not self.conn.autocommit:
+            except rollback_on:
+                # Rollback on specified exceptions
                 try:
-                    self.conn.rollback()
+                    conn.rollback()
                 except Error as rollback_err:
+                    # If rollback fails, raise a TransactionError
                     raise TransactionError(
                         "Failed to rollback transaction"
                     ) from rollback_err
-            # Re-raise the original exception
-            raise
+                # Re-raise the original exception
+                raise
+
+            except Exception:
+                # For any other exception, rollback if not in autocommit mode
+                if not conn.autocommit:
+                    try:
+                        conn.rollback()
+                    except Error as rollback_err:
+                        raise TransactionError(
+                            "Failed to rollback transaction"
+                        ) from rollback_err
+                # Re-raise the original exception
+                raise
@@ -0,0 +1,241 @@
+# -*- coding: UTF-8 -*-
+#
+#   Copyright WeeTech Developer
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+thread-safe connection pool
+"""
+
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any
+
+from .database import PoolTimeoutError
+
+
+@dataclass
+class PoolStats:
+    """Point-in-time snapshot of a ConnectionPool."""
+
+    max_size: int
+    size: int
+    in_use: int
+    idle: int
+    created: int
+    discarded: int
+    checkouts: int
+    waits: int
+    total_wait_time: float
+    max_wait_time: float
+
+
+class ConnectionPool:
+    """A bounded pool of DB-API connections with checkout/return.
+
+    Connections are created lazily through ``connect`` up to ``max_size``.
+    Idle connections older than ``max_idle`` seconds are closed instead of
+    handed out, ``pre_ping`` checks liveness on checkout and ``timeout``
+    bounds how long ``acquire`` waits when every connection is in use.
+
+    Example:
+    pool = ConnectionPool(lambda: mysql.connector.connect(**params), max_size=8)
+    with pool.connection() as conn:
+        conn.cursor().execute("SELECT 1")
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        max_size: int = 5,
+        max_idle: float | None = None,
+        pre_ping: bool = False,
+        timeout: float | None = None,
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self._connect = connect
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.pre_ping = pre_ping
+        self.timeout = timeout
+
+        self._cond = threading.Condition()
+        # (connection, last returned at) pairs, most recently used on the right
+        self._idle: deque[tuple[Any, float]] = deque()
+        self._size = 0
+        self._closed = False
+
+        self._created = 0
+        self._discarded = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._total_wait_time = 0.0
+        self._max_wait_time = 0.0
+
+    def acquire(self) -> Any:
+        """Check a connection out of the pool, creating one if allowed."""
+        started = time.monotonic()
+        deadline = None if self.timeout is None else started + self.timeout
+        waited = False
+
+        while True:
+            conn = None
+            expired: list[Any] = []
+            create = False
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolTimeoutError("Connection pool is closed")
+                    expired.extend(self._pop_expired())
+                    if self._idle:
+                        conn, _ = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        # reserve the slot now, connect outside the lock
+                        self._size += 1
+                        create = True
+                        break
+                    remaining = None
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise PoolTimeoutError(
+                            f"No connection available within {self.timeout}s "
+                            f"(pool size {self.max_size})"
+                        )
+                    waited = True
+                    self._cond.wait(remaining)
+
+            for stale in expired:
+                self._close_quietly(stale)
+
+            if create:
+                try:
+                    conn = self._connect()
+                except BaseException:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._created += 1
+            elif self.pre_ping and not self._is_alive(conn):
+                self._discard(conn)
+                continue
+
+            self._record_checkout(time.monotonic() - started, waited)
+            return conn
+
+    def release(self, conn: Any, discard: bool = False) -> None:
+        """Return a connection to the pool, or close it when ``discard``."""
+        if not discard:
+            try:
+                # never hand out a connection with a half-open transaction
+                if getattr(conn, "in_transaction", False) is True:
+                    conn.rollback()
+            except Exception:  # pylint: disable=broad-exception-caught
+                discard = True
+
+        with self._cond:
+            if not discard and not self._closed:
+                self._idle.append((conn, time.monotonic()))
+                self._cond.notify()
+                return
+        self._discard(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """Borrow a connection for the duration of the with block."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self) -> None:
+        """Close idle connections; in-use ones are closed when returned."""
+        with self._cond:
+            self._closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._discarded += len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            self._close_quietly(conn)
+
+    def stats(self) -> PoolStats:
+        """Return current pool usage and wait statistics."""
+        with self._cond:
+            idle = len(self._idle)
+            return PoolStats(
+                max_size=self.max_size,
+                size=self._size,
+                in_use=self._size - idle,
+                idle=idle,
+                created=self._created,
+                discarded=self._discarded,
+                checkouts=self._checkouts,
+                waits=self._waits,
+                total_wait_time=self._total_wait_time,
+                max_wait_time=self._max_wait_time,
+            )
+
+    def _pop_expired(self) -> list[Any]:
+        """Remove idle connections past max_idle. Caller holds the lock."""
+        if self.max_idle is None:
+            return []
+        expired = []
+        cutoff = time.monotonic() - self.max_idle
+        while self._idle and self._idle[0][1] < cutoff:
+            conn, _ = self._idle.popleft()
+            expired.append(conn)
+            self._size -= 1
+            self._discarded += 1
+        if expired:
+            self._cond.notify(len(expired))
+        return expired
+
+    def _discard(self, conn: Any) -> None:
+        with self._cond:
+            self._size -= 1
+            self._discarded += 1
+            self._cond.notify()
+        self._close_quietly(conn)
+
+    def _record_checkout(self, wait_time: float, waited: bool) -> None:
+        with self._cond:
+            self._checkouts += 1
+            if waited:
+                self._waits += 1
+                self._total_wait_time += wait_time
+                self._max_wait_time = max(self._max_wait_time, wait_time)
+
+    @staticmethod
+    def _is_alive(conn: Any) -> bool:
+        try:
+            return bool(conn.is_connected())
+        except Exception:  # pylint: disable=broad-exception-caught
+            return False
+
+    @staticmethod
+    def _close_quietly(conn: Any) -> None:
+        try:
+            conn.close()
+        except Exception:  # pylint: disable=broad-exception-caught
+            pass
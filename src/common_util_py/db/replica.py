@@ -0,0 +1,188 @@
+# -*- coding: UTF-8 -*-
+#
+#   Copyright WeeTech Developer
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+read replica routing
+"""
+
+import itertools
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, Literal
+
+from .pool import ConnectionPool
+
+
+def replication_lag(conn: Any) -> float | None:
+    """Return seconds behind the source, or None when replication is down."""
+    cursor = conn.cursor(dictionary=True)
+    try:
+        try:
+            cursor.execute("SHOW REPLICA STATUS")
+        except Exception:  # pylint: disable=broad-exception-caught
+            # servers older than MySQL 8.0.22 / MariaDB 10.5.1
+            cursor.execute("SHOW SLAVE STATUS")
+        status = cursor.fetchone()
+    finally:
+        cursor.close()
+    if not status:
+        # not a replica at all
+        return None
+    lag = status.get("Seconds_Behind_Source", status.get("Seconds_Behind_Master"))
+    return None if lag is None else float(lag)
+
+
+@dataclass
+class ReplicaStats:
+    """Routing state of one replica."""
+
+    name: str
+    healthy: bool
+    lag: float | None
+    outstanding: int
+    reads: int
+
+
+class _Replica:
+    def __init__(self, name: str, pool: ConnectionPool):
+        self.name = name
+        self.pool = pool
+        self.healthy = True
+        self.lag: float | None = None
+        self.outstanding = 0
+        self.reads = 0
+
+
+class ReplicaRouter:
+    """Pick a replica connection for reads.
+
+    ``strategy`` is ``round_robin`` or ``least_outstanding``. When
+    ``max_lag`` is set, every ``check_interval`` seconds each replica's lag
+    is measured with ``lag_check`` and replicas behind by more than
+    ``max_lag`` seconds (or not replicating) are skipped until they catch up.
+    A replica that fails to hand out a connection is skipped until the next
+    check. ``acquire`` returns None when no replica is usable so the caller
+    can fall back to the primary.
+    """
+
+    def __init__(
+        self,
+        pools: dict[str, ConnectionPool],
+        strategy: Literal["round_robin", "least_outstanding"] = "round_robin",
+        max_lag: float | None = None,
+        check_interval: float = 5.0,
+        lag_check: Callable[[Any], float | None] = replication_lag,
+    ):
+        if strategy not in ("round_robin", "least_outstanding"):
+            raise ValueError(f"Unknown replica strategy: {strategy}")
+        if not pools:
+            raise ValueError("at least one replica is required")
+        self.strategy = strategy
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lag_check = lag_check
+        self._replicas = [_Replica(name, pool) for name, pool in pools.items()]
+        self._lock = threading.Lock()
+        self._round_robin = itertools.count()
+        self._next_check = 0.0
+        self._checking = False
+
+    def acquire(self) -> tuple[int, Any] | None:
+        """Return ``(replica index, connection)``, or None to use the primary."""
+        self._maybe_check()
+        while True:
+            with self._lock:
+                candidates = [
+                    i for i, replica in enumerate(self._replicas) if replica.healthy
+                ]
+                if not candidates:
+                    return None
+                if self.strategy == "least_outstanding":
+                    index = min(candidates, key=lambda i: self._replicas[i].outstanding)
+                else:
+                    index = candidates[next(self._round_robin) % len(candidates)]
+                replica = self._replicas[index]
+                replica.outstanding += 1
+            try:
+                conn = replica.pool.acquire()
+            except Exception:  # pylint: disable=broad-exception-caught
+                with self._lock:
+                    replica.outstanding -= 1
+                    replica.healthy = False
+                continue
+            with self._lock:
+                replica.reads += 1
+            return index, conn
+
+    def release(self, index: int, conn: Any, discard: bool = False) -> None:
+        """Give a connection back to its replica's pool."""
+        replica = self._replicas[index]
+        with self._lock:
+            replica.outstanding -= 1
+        replica.pool.release(conn, discard=discard)
+
+    def check(self) -> None:
+        """Measure every replica's lag now and update which are usable."""
+        for replica in self._replicas:
+            healthy = True
+            lag = None
+            try:
+                with replica.pool.connection() as conn:
+                    if self.max_lag is not None:
+                        lag = self.lag_check(conn)
+                        healthy = lag is not None and lag <= self.max_lag
+            except Exception:  # pylint: disable=broad-exception-caught
+                healthy = False
+            with self._lock:
+                replica.healthy = healthy
+                replica.lag = lag
+
+    def stats(self) -> list[ReplicaStats]:
+        """Return the routing state of every replica."""
+        with self._lock:
+            return [
+                ReplicaStats(
+                    name=replica.name,
+                    healthy=replica.healthy,
+                    lag=replica.lag,
+                    outstanding=replica.outstanding,
+                    reads=replica.reads,
+                )
+                for replica in self._replicas
+            ]
+
+    def close(self) -> None:
+        """Close every replica pool."""
+        for replica in self._replicas:
+            replica.pool.close()
+
+    def _maybe_check(self) -> None:
+        """Run a health check on the calling thread when one is due."""
+        now = time.monotonic()
+        with self._lock:
+            if self._checking or now < self._next_check:
+                return
+            if self.max_lag is None and all(r.healthy for r in self._replicas):
+                self._next_check = now + self.check_interval
+                return
+            self._checking = True
+        try:
+            self.check()
+        finally:
+            with self._lock:
+                self._checking = False
+                self._next_check = time.monotonic() + self.check_interval
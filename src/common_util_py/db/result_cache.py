@@ -0,0 +1,250 @@
+# -*- coding: UTF-8 -*-
+#
+#   Copyright WeeTech Developer
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+query result cache with TTL and table invalidation
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from .database import estimate_row_bytes
+
+# table names after the keywords that introduce them
+_NAME = r"(?:`[^`]+`|[\w$]+)"
+_TABLE_RE = re.compile(
+    rf"\b(?:FROM|JOIN|UPDATE|INTO|TABLE)\s+({_NAME}(?:\s*\.\s*{_NAME})?)",
+    re.IGNORECASE,
+)
+
+
+def statement_tables(statement: str) -> set[str]:
+    """Return the lower-cased table names a statement refers to.
+
+    This is a keyword scan, not a parser: ``db.table`` counts as ``table``
+    and comma joins only report their first table.
+    """
+    return {table_key(match.group(1)) for match in _TABLE_RE.finditer(statement)}
+
+
+def table_key(name: str) -> str:
+    """Normalize a table name as statement_tables does: no schema, no quotes."""
+    return name.rsplit(".", 1)[-1].strip().strip("`").lower()
+
+
+def _copy_rows(rows: list) -> list:
+    """Copy the list, and dict rows, so callers can't change cached rows."""
+    return [dict(row) if isinstance(row, dict) else row for row in rows]
+
+
+def _freeze(value: Any) -> Hashable:
+    """Turn statement parameters into a hashable cache key part."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(item) for item in value)
+    hash(value)
+    return value
+
+
+def _result_bytes(rows: list) -> int:
+    size = 64
+    for row in rows:
+        size += estimate_row_bytes(row.values() if isinstance(row, dict) else row)
+    return size
+
+
+@dataclass
+class ResultCacheStats:
+    """Counters and current size of a ResultCache."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        """Share of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ResultCache:
+    """Thread-safe cache of read results keyed by statement and parameters.
+
+    Entries expire after ``ttl`` seconds and the least recently used ones are
+    evicted beyond ``max_entries`` or an estimated ``max_bytes``. Writes drop
+    every entry that read one of the tables they touch. Dict rows are copied
+    on the way in and out, so changing a returned row doesn't change the
+    cache.
+
+    Example:
+    cache = ResultCache(ttl=30, max_entries=10_000)
+    db = Mysql(host='localhost', username='user', password='pass',
+               result_cache=cache)
+    db.read("SELECT * FROM country WHERE code = %s", ("CH",))  # miss
+    db.read("SELECT * FROM country WHERE code = %s", ("CH",))  # hit
+    db.update("UPDATE country SET name = %s WHERE code = %s", ("Suisse", "CH"))
+    """
+
+    def __init__(
+        self,
+        ttl: float = 60.0,
+        max_entries: int = 1024,
+        max_bytes: int | None = None,
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        # key -> (expires at, rows, size, tables)
+        self._entries: OrderedDict[Hashable, tuple[float, list, int, set[str]]] = (
+            OrderedDict()
+        )
+        self._by_table: dict[str, set[Hashable]] = {}
+        self._bytes = 0
+        self._stats = ResultCacheStats()
+        # bumped by every invalidation so a read that raced a write isn't stored
+        self._generation = 0
+
+    @staticmethod
+    def make_key(statement: str, params: Any = ()) -> Hashable | None:
+        """Return the cache key, or None when params can't be hashed."""
+        try:
+            return statement, _freeze(params or ())
+        except TypeError:
+            return None
+
+    def get(self, key: Hashable | None) -> list | None:
+        """Return a copy of the cached rows, or None on a miss."""
+        if key is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self._stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            rows = entry[1]
+        return _copy_rows(rows)
+
+    def generation(self) -> int:
+        """Return a token to take before reading and pass to ``put``."""
+        with self._lock:
+            return self._generation
+
+    def put(
+        self,
+        key: Hashable | None,
+        statement: str,
+        rows: list,
+        generation: int | None = None,
+    ) -> None:
+        """Store the rows read by ``statement``.
+
+        When ``generation`` is given the rows are only stored if nothing was
+        invalidated since it was taken.
+        """
+        if key is None:
+            return
+        rows = _copy_rows(rows)
+        size = _result_bytes(rows)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        tables = statement_tables(statement)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, rows, size, tables)
+            self._bytes += size
+            for table in tables:
+                self._by_table.setdefault(table, set()).add(key)
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                self._remove(next(iter(self._entries)))
+                self._stats.evictions += 1
+
+    def invalidate_tables(self, tables: Iterable[str]) -> None:
+        """Drop every entry that read one of the tables.
+
+        Names are matched like statement_tables reports them, so
+        ``shop.orders`` and a backquoted orders both mean ``orders``.
+        """
+        with self._lock:
+            self._generation += 1
+            for table in tables:
+                for key in self._by_table.pop(table_key(table), ()):
+                    if key in self._entries:
+                        self._remove(key)
+                        self._stats.invalidations += 1
+
+    def invalidate_statement(self, statement: str) -> None:
+        """Drop entries for the tables a write statement touches.
+
+        When no table can be found the whole cache is cleared.
+        """
+        tables = statement_tables(statement)
+        if tables:
+            self.invalidate_tables(tables)
+        else:
+            self.clear()
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._generation += 1
+            self._stats.invalidations += len(self._entries)
+            self._entries.clear()
+            self._by_table.clear()
+            self._bytes = 0
+
+    def stats(self) -> ResultCacheStats:
+        """Return hit/miss counters and the current size."""
+        with self._lock:
+            stats = ResultCacheStats(**vars(self._stats))
+            stats.entries = len(self._entries)
+            stats.bytes = self._bytes
+        return stats
+
+    def _remove(self, key: Hashable) -> None:
+        """Remove an entry. Caller holds the lock."""
+        _, _, size, tables = self._entries.pop(key)
+        self._bytes -= size
+        for table in tables:
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[table]
@@ -0,0 +1,81 @@
+# -*- coding: UTF-8 -*-
+#
+#   Copyright WeeTech Developer
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+compact tuple-backed rows with access by column name
+"""
+
+from collections import namedtuple
+from collections.abc import Iterable, Sequence
+from functools import lru_cache
+from typing import Any
+
+
+@lru_cache(maxsize=256)
+def row_type(names: tuple[str, ...]) -> type:
+    """Return the row class for a result with these column names.
+
+    Rows are namedtuples, so they cost what a tuple costs, with no per-row
+    dict. ``row.name``, ``row[0]`` and ``row["name"]`` all work; the last
+    also for names that aren't identifiers (``row["COUNT(*)"]``), which
+    namedtuple renames to ``_<index>`` for attribute access. ``keys()``,
+    ``get()`` (unless a column has that name) and ``_asdict()`` use the
+    column names. One class is made per distinct set of names.
+    """
+    index: dict[str, int] = {}
+    for i, name in enumerate(names):
+        index.setdefault(name, i)
+    base = namedtuple("Row", names, rename=True)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return tuple.__getitem__(self, index[key])
+        return tuple.__getitem__(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        i = index.get(key)
+        return default if i is None else tuple.__getitem__(self, i)
+
+    def keys(self) -> tuple[str, ...]:
+        return names
+
+    def _asdict(self) -> dict[str, Any]:
+        return dict(zip(names, self))
+
+    def __reduce__(self):
+        # the class is generated, so pickle the names and rebuild it
+        return _rebuild, (names, tuple(self))
+
+    namespace = {
+        "__slots__": (),
+        "__getitem__": __getitem__,
+        "_asdict": _asdict,
+        "__reduce__": __reduce__,
+    }
+    # a column called get or keys keeps its attribute
+    for method in (get, keys):
+        if method.__name__ not in names:
+            namespace[method.__name__] = method
+    return type("Row", (base,), namespace)
+
+
+def _rebuild(names: tuple[str, ...], values: tuple) -> tuple:
+    return row_type(names)._make(values)
+
+
+def named_rows(description: Sequence[Sequence[Any]], rows: Iterable[Sequence]) -> list:
+    """Turn rows of a DB-API cursor into Row objects, see ``row_type``."""
+    make = row_type(tuple(str(column[0]) for column in description))._make
+    return list(map(make, rows))
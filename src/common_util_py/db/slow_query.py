@@ -0,0 +1,248 @@
+# -*- coding: UTF-8 -*-
+#
+#   Copyright WeeTech Developer
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+slow query log with sampled EXPLAIN
+"""
+
+import json
+import logging
+import queue
+import random
+import reprlib
+import threading
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from .instrument import EventKind, Instrumentation, StatementEvent, normalize_statement
+
+logger = logging.getLogger(__name__)
+
+# statements MySQL can EXPLAIN without running them
+_EXPLAINABLE = ("SELECT", "WITH", "TABLE", "INSERT", "REPLACE", "UPDATE", "DELETE")
+
+_STOP = object()
+
+
+def redact(params: Any) -> Any:
+    """Replace every parameter value with ``?``, keeping the structure."""
+    if isinstance(params, dict):
+        return {key: "?" for key in params}
+    if isinstance(params, (list, tuple)):
+        return type(params)(redact(item) for item in params)
+    return None if params is None else "?"
+
+
+@dataclass
+class SlowQuery:
+    """One statement that took longer than the threshold."""
+
+    kind: EventKind
+    source: str
+    shape: str
+    statement: str
+    params: Any
+    duration: float
+    rows: int | None
+    error: str | None = None
+    explain: Any = None
+
+
+class SlowQueryLog:
+    """Log statements slower than ``threshold`` seconds.
+
+    Use it as an Instrumentation after hook. The hook only compares the
+    duration and queues slow statements; a background thread logs them with
+    their normalized shape, parameters (replaced by ``?`` when
+    ``redact_params``), duration and rows. A share ``explain_sample_rate`` of
+    the slow executes also gets ``EXPLAIN FORMAT=JSON`` run on its own
+    connection from ``connect`` and attached. A slow fetch of the results is
+    logged on its own, with kind ``fetch`` and no plan. When more than
+    ``max_pending`` statements wait the newest are dropped and counted in
+    ``dropped``.
+
+    Example:
+    slow_log = SlowQueryLog(threshold=0.5, explain_sample_rate=0.1)
+    db = Mysql(host='localhost', username='user', password='pass',
+               slow_query_log=slow_log)
+    ...
+    for slow in slow_log.recent():
+        print(slow.duration, slow.shape, slow.explain)
+    slow_log.close()
+    """
+
+    def __init__(
+        self,
+        threshold: float = 1.0,
+        explain_sample_rate: float = 0.0,
+        redact_params: bool = False,
+        connect: Callable[[], Any] | None = None,
+        max_pending: int = 1000,
+        history: int = 100,
+    ):
+        if not 0.0 <= explain_sample_rate <= 1.0:
+            raise ValueError("explain_sample_rate must be between 0 and 1")
+        self.threshold = threshold
+        self.explain_sample_rate = explain_sample_rate
+        self.redact_params = redact_params
+        self.connect = connect
+        self.dropped = 0
+
+        self._queue: queue.Queue = queue.Queue(max_pending)
+        self._recent: deque[SlowQuery] = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self._worker: threading.Thread | None = None
+        self._conn: Any = None
+
+    def attach(
+        self, instrumentation: Instrumentation, connect: Callable[[], Any] | None = None
+    ) -> None:
+        """Hook into ``instrumentation``; ``connect`` is used unless one is set."""
+        if self.connect is None:
+            self.connect = connect
+        instrumentation.add_hook(after=self)
+
+    def __call__(self, event: StatementEvent) -> None:
+        if (
+            event.duration < self.threshold
+            or event.kind not in ("execute", "fetch")
+            or not event.statement
+        ):
+            return
+        # fetch events carry no params, and their statement was explained
+        # with the execute if that was sampled
+        explain = (
+            event.kind == "execute"
+            and self.explain_sample_rate > 0.0
+            and random.random() < self.explain_sample_rate
+        )
+        self._start()
+        try:
+            self._queue.put_nowait((event, explain))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def recent(self) -> list[SlowQuery]:
+        """Return the last logged slow statements, oldest first."""
+        with self._lock:
+            return list(self._recent)
+
+    def flush(self) -> None:
+        """Wait until every queued statement has been logged."""
+        if self._worker is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        """Log what is queued, stop the worker and close its connection."""
+        with self._lock:
+            worker, self._worker = self._worker, None
+        if worker is not None:
+            self._queue.put(_STOP)
+            worker.join()
+
+    def _start(self) -> None:
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name="SlowQueryLog", daemon=True
+                )
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    self._close_connection()
+                    return
+                self._log(*item)
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.exception("slow query logging failed")
+            finally:
+                self._queue.task_done()
+
+    def _log(self, event: StatementEvent, explain: bool) -> None:
+        slow = SlowQuery(
+            kind=event.kind,
+            source=event.source,
+            shape=normalize_statement(event.statement),
+            statement=event.statement,
+            params=redact(event.params) if self.redact_params else event.params,
+            duration=event.duration,
+            rows=event.rows,
+            error=None if event.error is None else repr(event.error),
+        )
+        if explain:
+            slow.explain = self._explain(
+                event.statement, event.params, event.executemany
+            )
+        with self._lock:
+            self._recent.append(slow)
+        logger.warning(
+            "slow %s %.3fs rows=%s: %s params=%s%s",
+            slow.kind,
+            slow.duration,
+            slow.rows,
+            slow.shape,
+            reprlib.repr(slow.params),
+            "" if slow.explain is None else f" explain={json.dumps(slow.explain)}",
+        )
+
+    def _explain(self, statement: str, params: Any, executemany: bool = False) -> Any:
+        """Return the parsed EXPLAIN FORMAT=JSON plan, or None."""
+        if self.connect is None:
+            return None
+        if not statement.lstrip().lstrip("(").upper().startswith(_EXPLAINABLE):
+            return None
+        if executemany and params:
+            # explain with the first row
+            params = params[0]
+        try:
+            if self._conn is None:
+                self._conn = self.connect()
+            cursor = self._conn.cursor()
+            try:
+                if params:
+                    cursor.execute("EXPLAIN FORMAT=JSON " + statement, params)
+                else:
+                    cursor.execute("EXPLAIN FORMAT=JSON " + statement)
+                row = cursor.fetchone()
+            finally:
+                cursor.close()
+        except Exception:  # pylint: disable=broad-exception-caught
+            logger.debug("EXPLAIN failed for %s", statement, exc_info=True)
+            # the connection may be broken, open a new one next time
+            self._close_connection()
+            return None
+        if not row:
+            return None
+        plan = row[0] if isinstance(row, (list, tuple)) else next(iter(row.values()))
+        try:
+            return json.loads(plan)
+        except (TypeError, ValueError):
+            return plan
+
+    def _close_connection(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:  # pylint: disable=broad-exception-caught
+                pass
@@ -14,21 +14,81 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import pymysql as MySQLdb
-from pymysql.cursors import DictCursor
-
+from pymysql.cursors import DictCursor, SSCursor, SSDictCursor
+
+import queue
+import re
+import threading
+import weakref
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Literal, Any, Optional, Union
 from contextlib import contextmanager
 
+from .database import PACKET_FILL_RATIO, key_ranges, pack_rows
+from .instrument import NO_MEASURE, EventKind, Instrumentation
+from .result_cache import ResultCache
+from .rows import named_rows
+from .template_cache import TemplateCache, TemplateCacheStats
+
+_instrumentation: Instrumentation | None = None
+
+# generated SQL per query shape for build_where_clause, select and update
+_templates = TemplateCache()
+
+# rows read per fetchmany() when streaming row by row
+_STREAM_FETCH_SIZE = 1000
+
+# suggested in_chunk_size for select and update, which don't chunk by default
+IN_CHUNK_SIZE = 1000
+
+# a column name, optionally table qualified and backquoted, or *
+_PLAIN_FIELD = re.compile(r"[\w$`.*]+")
+
+_NULL_CMPS = ('IS NULL', 'IS NOT NULL')
+
+# max_allowed_packet per connection, for insert_rows
+_max_packet_sizes: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def set_instrumentation(instrumentation: Instrumentation | None) -> None:
+    """Measure every statement run by this module, None switches it off."""
+    global _instrumentation
+    _instrumentation = instrumentation
+
+def _measure(kind: EventKind, statement: str | None = None, params: Any = None):
+    if _instrumentation is None:
+        return NO_MEASURE
+    return _instrumentation.measure(kind, statement, params, source="sql")
+
+def _execute(cur, sql: str, params: Any = None) -> None:
+    with _measure("execute", sql, params) as event:
+        if params is None:
+            cur.execute(sql)
+        else:
+            cur.execute(sql, params)
+        event.rows = cur.rowcount
+
+def _fetchall(cur, sql: str) -> list:
+    with _measure("fetch", sql) as event:
+        rows = list(cur.fetchall())
+        event.rows = len(rows)
+        return rows
+
+def _commit(mysql_con: MySQLdb.Connection) -> None:
+    with _measure("commit"):
+        mysql_con.commit()
+
 
 # create table
 def create_table(mysql_con: MySQLdb.Connection, sql: str) -> None:
     cur = mysql_con.cursor()
-    cur.execute(sql)
+    _execute(cur, sql)
 
 def drop_table(mysql_con: MySQLdb.Connection, sql: str) -> None:
     cur = mysql_con.cursor()
-    cur.execute(sql)
+    _execute(cur, sql)
 
 # load data
 def insert(mysql_con: MySQLdb.Connection, table_name: str, data: dict[str, str]) -> int:
@@ -46,16 +106,83 @@ def insert(mysql_con: MySQLdb.Connection, table_name: str, data: dict[str, str])
     sql_values_placeholder = ', '.join(['%s']*len(values))
     sql_final = 'INSERT INTO {0} ({1}) VALUES ({2})'.format(table_name, ', '.join(keys), sql_values_placeholder)
     cur = mysql_con.cursor()
-    cur.execute(sql_final, list(values))
+    _execute(cur, sql_final, list(values))
     return cur.rowcount
 
 def insert_statement(mysql_con: MySQLdb.Connection, sql: str) -> None:
     cur = mysql_con.cursor()
-    cur.execute(sql)
+    _execute(cur, sql)
+
+def insert_rows(
+    mysql_con: MySQLdb.Connection,
+    table_name: str,
+    rows: list[dict[str, Any]],
+    max_packet_bytes: int | None = None,
+    transaction: bool = False
+) -> int:
+    """
+    Insert dicts with multi-row INSERT statements and return the row count.
+
+    Rows are grouped by their set of keys and each group is sent as
+    ``INSERT ... VALUES (...), (...)`` statements cut by estimated size to
+    fit max_packet_bytes (the server's max_allowed_packet when not given).
+    With transaction=True all statements run in one transaction that is
+    committed at the end or rolled back on error; otherwise committing is
+    left to the caller, as with insert.
+    """
+    if not rows:
+        return 0
 
-def insert_rows(mysql_con: MySQLdb.Connection, table_name: str, rows: list[dict[str, Any]]) -> None:
+    # column order of the first row of each key set
+    groups: dict[frozenset, tuple[list[str], list[tuple]]] = {}
     for row in rows:
-        insert(mysql_con, table_name, row)
+        key = frozenset(row)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = (list(row), [])
+        group[1].append(tuple(row[column] for column in group[0]))
+
+    total = 0
+    try:
+        if transaction:
+            mysql_con.begin()
+        # not get_cursor: an error must not roll back the caller's work
+        # unless this call owns the transaction
+        cursor = mysql_con.cursor()
+        try:
+            if max_packet_bytes is None:
+                max_packet_bytes = _max_allowed_packet(mysql_con)
+            for columns, values in groups.values():
+                head = 'INSERT INTO {0} ({1}) VALUES '.format(
+                    table_name, ', '.join(columns))
+                row_placeholder = '(' + ', '.join(['%s'] * len(columns)) + ')'
+                budget = int(max_packet_bytes * PACKET_FILL_RATIO) - len(head)
+                for batch in pack_rows(values, budget):
+                    query = head + ', '.join([row_placeholder] * len(batch))
+                    _execute(cursor, query, [value for row in batch for value in row])
+                    total += cursor.rowcount
+        finally:
+            cursor.close()
+        if transaction:
+            _commit(mysql_con)
+    except MySQLdb.Error as e:
+        if transaction:
+            mysql_con.rollback()
+        raise DatabaseError(f"Failed to insert rows: {e}") from e
+    return total
+
+def _max_allowed_packet(mysql_con: MySQLdb.Connection) -> int:
+    """The server's max_allowed_packet, queried once per connection."""
+    size = _max_packet_sizes.get(mysql_con)
+    if size is None:
+        # a tuple cursor whatever the connection's cursorclass
+        cursor = mysql_con.cursor(MySQLdb.cursors.Cursor)
+        try:
+            _execute(cursor, "SELECT @@max_allowed_packet")
+            size = _max_packet_sizes[mysql_con] = int(cursor.fetchone()[0])
+        finally:
+            cursor.close()
+    return size
 
 @dataclass
 class Condition:
@@ -80,67 +207,431 @@ def get_cursor(connection: MySQLdb.Connection, dict_cursor: bool = False):
     finally:
         cursor.close()
 
-def build_where_clause(conditions: list[Condition]) -> tuple[str, list[str]]:
-    if not conditions:
-        return "", []
+def _condition_shape(conditions: list[Condition]) -> tuple:
+    # values are bound as one placeholder each, an IN list included (the
+    # driver expands a sequence to (a, b, ...)), so they aren't part of it
+    return tuple((cond.op, cond.field, cond.cmp) for cond in conditions)
 
-    params: list[str] = []
+def _compile_where(shape: tuple) -> tuple[str, tuple[bool, ...]]:
+    """WHERE clause for a condition shape and which conditions bind a value."""
+    if not shape:
+        return "", ()
     conditions_sql: list[str] = []
-
-    for cond in conditions:
-        if cond.cmp.upper() in ('IS NULL', 'IS NOT NULL'):
-            conditions_sql.append(f"{cond.field} {cond.cmp}")
+    binds: list[bool] = []
+    for _, field, cmp in shape:
+        if cmp.upper() in _NULL_CMPS:
+            conditions_sql.append(f"{field} {cmp}")
+            binds.append(False)
         else:
-            conditions_sql.append(f"{cond.field} {cond.cmp} %s")
-            params.append(cond.value)
+            conditions_sql.append(f"{field} {cmp} %s")
+            binds.append(True)
 
     # The first condition's operator is ignored (usually starts with WHERE)
-    where_clause = " WHERE " + " ".join(
-        f"{cond.op} {conditions_sql[i]}"
-        for i, cond in enumerate(conditions[1:], 1)
+    where_clause = " WHERE " + conditions_sql[0] + "".join(
+        f" {shape[i][0]} {conditions_sql[i]}" for i in range(1, len(shape))
     )
-    where_clause = where_clause.replace("WHERE AND", "WHERE").replace("WHERE OR", "WHERE")
+    return where_clause, tuple(binds)
 
-    return where_clause, params
+def _bind(conditions: list[Condition], binds: tuple[bool, ...]) -> list[Any]:
+    return [cond.value for cond, bind in zip(conditions, binds) if bind]
+
+def _split_in_list(
+    conditions: list[Condition],
+    params: list[Any],
+    chunk_size: int | None,
+    offset: int = 0,
+    field_names: list[str] | None = None
+) -> list[list[Any]]:
+    """
+    Parameter sets that split the longest IN list into chunk_size values.
+
+    Only done when every condition is ANDed, so the chunks match disjoint
+    rows, and every field is a plain column: an aggregate or DISTINCT
+    would give one result per chunk instead of one. Then running the
+    statement once per set and adding up the results is the same as one
+    statement. offset is the number of params ahead of the WHERE clause's.
+    """
+    if not chunk_size or any(cond.op.upper() != 'AND' for cond in conditions[1:]):
+        return [params]
+    if field_names and not all(_PLAIN_FIELD.fullmatch(f) for f in field_names):
+        return [params]
+    index, values = None, ()
+    position = offset
+    for cond in conditions:
+        if cond.cmp.upper() in _NULL_CMPS:
+            continue
+        if (cond.cmp.upper() == 'IN'
+                and isinstance(cond.value, (list, tuple, set, frozenset))
+                and len(cond.value) > max(chunk_size, len(values))):
+            index, values = position, cond.value
+        position += 1
+    if index is None:
+        return [params]
+
+    values = list(dict.fromkeys(values))
+    param_sets = []
+    for start in range(0, len(values), chunk_size):
+        chunk_params = list(params)
+        chunk_params[index] = values[start:start + chunk_size]
+        param_sets.append(chunk_params)
+    return param_sets
+
+def template_cache_stats() -> TemplateCacheStats:
+    """Hit, miss and eviction counts of the compiled query templates."""
+    return _templates.stats()
+
+def set_template_cache_size(max_size: int) -> None:
+    """Change how many query templates are kept, 0 disables the cache."""
+    _templates.resize(max_size)
+
+def build_where_clause(conditions: list[Condition]) -> tuple[str, list[str]]:
+    if not conditions:
+        return "", []
+    shape = _condition_shape(conditions)
+    where_clause, binds = _templates.get(("where", shape),
+                                         lambda: _compile_where(shape))
+    return where_clause, _bind(conditions, binds)
 
 def select(
     mysql_con: MySQLdb.Connection,
     table_name: str,
     condition_groups: list[Condition] | None = None,
-    field_names: list[str] | None = None
+    field_names: list[str] | None = None,
+    cache: ResultCache | None = None,
+    in_chunk_size: int | None = None,
+    named: bool = False
 ) -> list[dict[str, Any]]:
     """
     select * from table_name where foo = 'bar' or blah = "baz";
+
+    With ``cache`` repeated selects are served from the ResultCache until
+    they expire or ``update`` writes to the table.
+
+    With in_chunk_size (e.g. IN_CHUNK_SIZE) an IN list longer than that is
+    sent in chunks of that many values, one statement each, and the rows
+    are concatenated. This needs every condition to be ANDed and every
+    field to be a plain column, otherwise the list is sent whole.
+
+    With named the rows are compact Row tuples instead of dicts, still
+    readable by column name (row.id, row['id']), see rows.row_type.
+    """
+    query, params = _select_query(table_name, condition_groups, field_names)
+
+    cache_key = generation = None
+    if cache is not None:
+        cache_key = cache.make_key(query, params)
+        if named and cache_key is not None:
+            cache_key = (cache_key, 'named')
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+        generation = cache.generation()
+
+    rows = []
+    cursor_class = MySQLdb.cursors.Cursor if named else MySQLdb.cursors.DictCursor
+    with mysql_con.cursor(cursor_class) as cursor:
+        for chunk_params in _split_in_list(condition_groups or [], params,
+                                           in_chunk_size, field_names=field_names):
+            _execute(cursor, query, chunk_params)
+            chunk = _fetchall(cursor, query)
+            rows.extend(named_rows(cursor.description, chunk) if named else chunk)
+    if cache is not None:
+        cache.put(cache_key, query, rows, generation)
+    return rows
+
+
+def select_iter(
+    mysql_con: MySQLdb.Connection,
+    table_name: str,
+    condition_groups: list[Condition] | None = None,
+    field_names: list[str] | None = None,
+    chunk_size: int | None = None,
+    dict_cursor: bool = True,
+    in_chunk_size: int | None = None,
+    named: bool = False
+) -> Iterator[Any]:
+    """
+    Like select, but stream the rows from the server instead of loading them.
+
+    Yields rows one at a time, or lists of up to chunk_size rows. See
+    select_statement_iter.
+    """
+    query, params = _select_query(table_name, condition_groups, field_names)
+    param_sets = _split_in_list(condition_groups or [], params, in_chunk_size,
+                                field_names=field_names)
+    return _stream(mysql_con, query, param_sets, chunk_size, dict_cursor, named)
+
+def select_statement_iter(
+    mysql_con: MySQLdb.Connection,
+    sql: str,
+    params: Any = None,
+    chunk_size: int | None = None,
+    dict_cursor: bool = True,
+    named: bool = False
+) -> Iterator[Any]:
     """
+    Stream the rows of a query through an unbuffered SSDictCursor (SSCursor
+    when dict_cursor is False), yielding rows one at a time or, with
+    chunk_size, lists of up to chunk_size rows. Memory stays bounded by the
+    chunk however large the result is. named yields Row tuples readable by
+    column name instead of dicts.
+
+    The connection can't run another statement until the iterator is
+    exhausted or closed. Closing it early (break, or contextlib.closing)
+    discards the unread rows so the connection is usable again.
+
+    with closing(select_statement_iter(con, "SELECT * FROM orders")) as rows:
+        for row in rows:
+            export(row)
+    """
+    return _stream(mysql_con, sql, [params], chunk_size, dict_cursor, named)
+
+def _select_query(
+    table_name: str,
+    condition_groups: list[Condition] | None,
+    field_names: list[str] | None
+) -> tuple[str, list[Any]]:
     if field_names is None:
         field_names = ['*']
     if condition_groups is None:
         condition_groups = []
 
-    fields = ', '.join(field_names)
+    key = ("select", table_name, tuple(field_names), _condition_shape(condition_groups))
+
+    def compile_select() -> tuple[str, tuple[bool, ...]]:
+        where_clause, binds = _compile_where(key[3])
+        return f"SELECT {', '.join(field_names)} FROM {table_name}{where_clause}", binds
+
+    query, binds = _templates.get(key, compile_select)
+    return query, _bind(condition_groups, binds)
+
+def _stream(
+    mysql_con: MySQLdb.Connection,
+    sql: str,
+    param_sets: list[Any],
+    chunk_size: int | None,
+    dict_cursor: bool,
+    named: bool
+) -> Iterator[Any]:
+    if chunk_size is not None and chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    return _stream_rows(mysql_con, sql, param_sets, chunk_size, dict_cursor, named)
+
+def _stream_rows(
+    mysql_con: MySQLdb.Connection,
+    sql: str,
+    param_sets: list[Any],
+    chunk_size: int | None,
+    dict_cursor: bool,
+    named: bool
+) -> Iterator[Any]:
+    cursor = mysql_con.cursor(SSDictCursor if dict_cursor and not named else SSCursor)
+    try:
+        for params in param_sets:
+            _execute(cursor, sql, params)
+            while True:
+                with _measure("fetch", sql) as event:
+                    rows = cursor.fetchmany(chunk_size or _STREAM_FETCH_SIZE)
+                    event.rows = len(rows)
+                if not rows:
+                    break
+                if named:
+                    rows = named_rows(cursor.description, rows)
+                if chunk_size:
+                    yield rows
+                else:
+                    yield from rows
+    finally:
+        # an unbuffered cursor reads and drops the rest of the result on
+        # close, otherwise the connection is stuck with an unread result
+        cursor.close()
+
+def scan_table(
+    mysql_con: MySQLdb.Connection,
+    table_name: str,
+    key_column: str,
+    chunk_size: int = 1000,
+    conditions: list[Condition] | None = None,
+    field_names: list[str] | None = None,
+    workers: int = 1,
+    connect: Callable[[], MySQLdb.Connection] | None = None
+) -> Iterator[list[dict[str, Any]]]:
+    """
+    Yield every matching row of a table in chunks of up to chunk_size rows.
 
-    where_clause, params = build_where_clause(condition_groups)
-    query = f"SELECT {fields} FROM {table_name}{where_clause}"
+    Pages are read with ``WHERE key_column > last key ORDER BY key_column
+    LIMIT chunk_size`` so each page costs an index range read, unlike
+    ``LIMIT/OFFSET`` which rereads every skipped row. key_column must be
+    unique and indexed, usually the primary key. conditions are extra
+    filters as for select.
 
-    with mysql_con.cursor(MySQLdb.cursors.DictCursor) as cursor:
-        cursor.execute(query, params)
-        return list(cursor.fetchall())
+    With workers > 1 the key range between MIN and MAX (an integer key is
+    required) is split into ranges scanned concurrently, each on its own
+    connection from connect; chunks then arrive in no particular order and
+    at most 2 * workers of them are buffered.
 
+    for rows in scan_table(con, 'orders', 'id', chunk_size=5000):
+        process(rows)
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    if field_names is None:
+        field_names = ['*']
+    elif '*' not in field_names and key_column not in field_names:
+        # the key of the last row is needed to read the next page
+        field_names = [*field_names, key_column]
+
+    where_clause, params = build_where_clause(conditions or [])
+    filters = where_clause.removeprefix(" WHERE ")
+    fields = ', '.join(field_names)
 
-def select_statement(mysql_con: MySQLdb.Connection, sql: str) -> list[dict[str, Any]]:
+    if workers <= 1:
+        yield from _scan_range(mysql_con, table_name, key_column, chunk_size,
+                               fields, filters, params)
+        return
+    if connect is None:
+        raise ValueError("workers > 1 needs connect to open a connection per worker")
+    yield from _scan_parallel(mysql_con, connect, table_name, key_column,
+                              chunk_size, fields, filters, params, workers)
+
+def _scan_range(
+    mysql_con: MySQLdb.Connection,
+    table_name: str,
+    key_column: str,
+    chunk_size: int,
+    fields: str,
+    filters: str,
+    params: list,
+    lower: Any = None,
+    upper: Any = None
+) -> Iterator[list[dict[str, Any]]]:
+    """Keyset-paginate over lower <= key < upper (unbounded when None)."""
+    last = None
+    while True:
+        predicates = [f"({filters})"] if filters else []
+        page_params = list(params)
+        if last is not None:
+            predicates.append(f"{key_column} > %s")
+            page_params.append(last)
+        elif lower is not None:
+            predicates.append(f"{key_column} >= %s")
+            page_params.append(lower)
+        if upper is not None:
+            predicates.append(f"{key_column} < %s")
+            page_params.append(upper)
+        page_params.append(chunk_size)
+        where_clause = " WHERE " + " AND ".join(predicates) if predicates else ""
+        query = (f"SELECT {fields} FROM {table_name}{where_clause} "
+                 f"ORDER BY {key_column} LIMIT %s")
+
+        with mysql_con.cursor(MySQLdb.cursors.DictCursor) as cursor:
+            _execute(cursor, query, page_params)
+            rows = _fetchall(cursor, query)
+        if rows:
+            yield rows
+        if len(rows) < chunk_size:
+            return
+        last = rows[-1][key_column]
+
+def _scan_parallel(
+    mysql_con: MySQLdb.Connection,
+    connect: Callable[[], MySQLdb.Connection],
+    table_name: str,
+    key_column: str,
+    chunk_size: int,
+    fields: str,
+    filters: str,
+    params: list,
+    workers: int
+) -> Iterator[list[dict[str, Any]]]:
+    """Scan key ranges on worker threads, see scan_table."""
+    where_clause = f" WHERE {filters}" if filters else ""
+    query = (f"SELECT MIN({key_column}), MAX({key_column}) "
+             f"FROM {table_name}{where_clause}")
+    with mysql_con.cursor(MySQLdb.cursors.Cursor) as cursor:
+        _execute(cursor, query, params)
+        low, high = cursor.fetchone()
+    if low is None:
+        return
+    if not isinstance(low, int) or not isinstance(high, int):
+        raise ValueError(f"workers > 1 needs an integer key_column, got {low!r}")
+
+    # more ranges than workers so a dense range doesn't leave the rest idle
+    ranges = key_ranges(low, high, workers * 4)
+
+    chunks: queue.Queue = queue.Queue(maxsize=2 * workers)
+    stop = threading.Event()
+
+    def put(item: tuple) -> None:
+        while not stop.is_set():
+            try:
+                chunks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def scan(lower: int, upper: int) -> None:
+        if stop.is_set():
+            return
+        try:
+            con = connect()
+            try:
+                for rows in _scan_range(con, table_name, key_column, chunk_size,
+                                        fields, filters, params, lower, upper):
+                    if stop.is_set():
+                        return
+                    put((rows, None))
+            finally:
+                con.close()
+        except BaseException as e:  # pylint: disable=broad-exception-caught
+            put((None, e))
+            return
+        put((None, None))
+
+    with ThreadPoolExecutor(workers, thread_name_prefix="scan_table") as pool:
+        for lower, upper in ranges:
+            pool.submit(scan, lower, upper)
+        try:
+            remaining = len(ranges)
+            while remaining:
+                rows, error = chunks.get()
+                if error is not None:
+                    raise DatabaseError(
+                        f"Failed to scan {table_name}: {error}") from error
+                if rows is None:
+                    remaining -= 1
+                else:
+                    yield rows
+        finally:
+            stop.set()
+            # don't start the ranges still queued when the consumer stopped
+            pool.shutdown(wait=True, cancel_futures=True)
+
+def select_statement(
+    mysql_con: MySQLdb.Connection,
+    sql: str,
+    named: bool = False
+) -> list[dict[str, Any]]:
+    if named:
+        # a tuple cursor whatever the connection's default cursorclass is
+        cur = mysql_con.cursor(MySQLdb.cursors.Cursor)
+        _execute(cur, sql)
+        return named_rows(cur.description, _fetchall(cur, sql))
     cur = mysql_con.cursor(MySQLdb.cursors.DictCursor)
-    cur.execute(sql)
-    return list(cur.fetchall())
+    _execute(cur, sql)
+    return _fetchall(cur, sql)
 
 def delete(mysql_con: MySQLdb.Connection, sql: str) -> None:
     cur = mysql_con.cursor()
-    cur.execute(sql)
+    _execute(cur, sql)
 
 def update(
     mysql_con: MySQLdb.Connection,
     table_name: str,
     data: dict[str, str],
-    conditions: Optional[Union[Condition, list[Condition]]] = None
+    conditions: Optional[Union[Condition, list[Condition]]] = None,
+    cache: ResultCache | None = None,
+    in_chunk_size: int | None = None
 ) -> int:
     """
     Update records in the specified table.
@@ -150,6 +641,11 @@ def update(
         table_name: Name of the table to update
         data: Dictionary of column names and new values
         conditions: Single condition or list of conditions for the WHERE clause
+        cache: ResultCache whose entries for this table are invalidated
+        in_chunk_size: Longest IN list sent in one UPDATE, e.g.
+            IN_CHUNK_SIZE; longer lists are split into one UPDATE per chunk,
+            committed together, when every condition is ANDed. None (the
+            default) sends the list whole.
 
     Returns:
         int: Number of affected rows
@@ -163,33 +659,35 @@ def update(
         raise ValueError("Invalid table name")
 
     # Convert single condition to list for uniform handling
-    if conditions and not isinstance(conditions, list):
+    if not conditions:
+        conditions = []
+    elif not isinstance(conditions, list):
         conditions = [conditions]
 
-    # Build SET clause
-    set_clause = ', '.join([f"{field} = %s" for field in data.keys()])
-    params = list(data.values())
+    key = ("update", table_name, tuple(data), _condition_shape(conditions))
 
-    # Build WHERE clause if conditions are provided
-    where_clause = ""
-    if conditions:
-        where_parts: list[str] = []
-        for i, cond in enumerate(conditions):
-            if i == 0:
-                where_parts.append(f"{cond.field} {cond.cmp} %s")
-            else:
-                where_parts.append(f"{cond.op} {cond.field} {cond.cmp} %s")
-            params.append(cond.value)
+    def compile_update() -> tuple[str, tuple[bool, ...]]:
+        # Build SET clause
+        set_clause = ', '.join([f"{field} = %s" for field in data.keys()])
+        # Build WHERE clause if conditions are provided
+        where_clause, binds = _compile_where(key[3])
+        table = MySQLdb.converters.escape_string(table_name)
+        return f"UPDATE {table} SET {set_clause}{where_clause}", binds
 
-        where_clause = " WHERE " + " ".join(where_parts)
-
-    query = f"UPDATE {MySQLdb.converters.escape_string(table_name)} SET {set_clause}{where_clause}"
+    query, binds = _templates.get(key, compile_update)
+    params = list(data.values()) + _bind(conditions, binds)
 
     try:
+        affected = 0
         with get_cursor(mysql_con) as cursor:
-            cursor.execute(query, params)
-            mysql_con.commit()
-            return cursor.rowcount
+            for chunk_params in _split_in_list(conditions, params, in_chunk_size,
+                                               offset=len(data)):
+                _execute(cursor, query, chunk_params)
+                affected += cursor.rowcount
+            _commit(mysql_con)
+            if cache is not None:
+                cache.invalidate_tables([table_name])
+            return affected
     except MySQLdb.Error as e:
         mysql_con.rollback()
         raise DatabaseError(f"Failed to update records: {e}") from e
@@ -211,8 +709,8 @@ def update_table(mysql_con: MySQLdb.Connection, sql: str, params: Optional[Union
     """
     try:
         with get_cursor(mysql_con) as cursor:
-            cursor.execute(sql, params or ())
-            mysql_con.commit()
+            _execute(cursor, sql, params or ())
+            _commit(mysql_con)
             return cursor.rowcount
     except MySQLdb.Error as e:
         mysql_con.rollback()
@@ -223,4 +721,4 @@ def generic(mysql_con: MySQLdb.Connection, sql: str) -> Any | None:
     Try not to use it or deprecate this
     """
     cur = mysql_con.cursor()
-    cur.execute(sql)
+    _execute(cur, sql)
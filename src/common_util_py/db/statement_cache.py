@@ -0,0 +1,100 @@
+# -*- coding: UTF-8 -*-
+#
+#   Copyright WeeTech Developer
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+per-connection cache of server-side prepared statements
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass
+class StatementCacheStats:
+    """Hit, miss and eviction counts summed over all connections."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    size: int = 0
+
+
+class StatementCache:
+    """LRU of prepared cursors for one connection, keyed by statement text.
+
+    mysql.connector only reuses a prepared statement when a prepared cursor
+    is executed again with the *same* string object, so the cache hands back
+    the statement it first saw together with its cursor. Evicted cursors are
+    closed, which deallocates the statement on the server.
+
+    The cache does not keep the connection alive; cursors only hold a weak
+    proxy to it. A cache must be used by one thread at a time, like the
+    connection it belongs to.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        stats: StatementCacheStats,
+        stats_lock: threading.Lock,
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[Any, str]] = OrderedDict()
+        self._stats = stats
+        self._stats_lock = stats_lock
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def prepared(self, conn: Any, statement: str) -> tuple[Any, str]:
+        """Return ``(prepared cursor, statement)`` to execute on ``conn``."""
+        entry = self._entries.get(statement)
+        if entry is not None:
+            self._entries.move_to_end(statement)
+            with self._stats_lock:
+                self._stats.hits += 1
+            return entry
+
+        entry = (conn.cursor(prepared=True), statement)
+        self._entries[statement] = entry
+        evicted = None
+        if len(self._entries) > self.max_size:
+            _, (evicted, _) = self._entries.popitem(last=False)
+        with self._stats_lock:
+            self._stats.misses += 1
+            if evicted is not None:
+                self._stats.evictions += 1
+        if evicted is not None:
+            self._close_quietly(evicted)
+        return entry
+
+    def clear(self) -> None:
+        """Close every cached cursor."""
+        entries = list(self._entries.values())
+        self._entries.clear()
+        for cursor, _ in entries:
+            self._close_quietly(cursor)
+
+    @staticmethod
+    def _close_quietly(cursor: Any) -> None:
+        try:
+            cursor.close()
+        except Exception:  # pylint: disable=broad-exception-caught
+            # the connection may already be gone
+            pass
@@ -0,0 +1,92 @@
+# -*- coding: UTF-8 -*-
+#
+#   Copyright WeeTech Developer
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+LRU cache of generated SQL keyed by query shape
+"""
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass
+class TemplateCacheStats:
+    """Hit, miss and eviction counts of a TemplateCache."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    size: int = 0
+
+
+class TemplateCache:
+    """Thread-safe LRU of compiled query templates.
+
+    A template is whatever ``build`` returns for a shape key, typically the
+    SQL text plus what is needed to bind parameters per call. A
+    ``max_size`` of 0 disables caching: every lookup builds.
+    """
+
+    def __init__(self, max_size: int = 512):
+        if max_size < 0:
+            raise ValueError("max_size can't be negative")
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self._stats = TemplateCacheStats()
+
+    def get(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        """Return the template for ``key``, building it on a miss."""
+        with self._lock:
+            template = self._entries.get(key)
+            if template is not None:
+                self._entries.move_to_end(key)
+                self._stats.hits += 1
+                return template
+            self._stats.misses += 1
+        template = build()
+        if self.max_size:
+            with self._lock:
+                self._entries[key] = template
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self._stats.evictions += 1
+        return template
+
+    def resize(self, max_size: int) -> None:
+        """Change the capacity, evicting the least recently used entries."""
+        if max_size < 0:
+            raise ValueError("max_size can't be negative")
+        with self._lock:
+            self.max_size = max_size
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+                self._stats.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every template and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._stats = TemplateCacheStats()
+
+    def stats(self) -> TemplateCacheStats:
+        """Return the counters and current size."""
+        with self._lock:
+            stats = TemplateCacheStats(**vars(self._stats))
+            stats.size = len(self._entries)
+        return stats
@@ -0,0 +1,73 @@
+# -*- coding: UTF-8 -*-
+"""test async mysql"""
+
+import asyncio
+import threading
+import pytest
+from common_util_py.db import AsyncMysql
+
+SAMPLE_CONFIG = {
+    "host": "test_host",
+    "username": "test_user",
+    "password": "test_pass",
+    "database": "test_db",
+}
+
+
+def test_async_crud(mock_mysql_connector):
+    """CRUD coroutines run the blocking calls off the event loop."""
+    mock_conn, mock_cursor, _ = mock_mysql_connector
+    mock_cursor.fetchall.return_value = [(1, "test")]
+    mock_cursor.rowcount = 1
+
+    async def scenario():
+        async with AsyncMysql(**SAMPLE_CONFIG, max_concurrency=2) as db:
+            rows = await db.read("SELECT * FROM test")
+            count = await db.update("UPDATE test SET name = %s", ("a",))
+            return rows, count, db.pool_stats()
+
+    rows, count, stats = asyncio.run(scenario())
+    assert rows == [(1, "test")]
+    assert count == 1
+    assert stats.in_use == 0
+    assert mock_conn.commit.called
+
+
+def test_async_transaction_rolls_back(mock_mysql_connector):
+    """An exception inside the async transaction rolls it back."""
+    mock_conn, _, _ = mock_mysql_connector
+
+    async def scenario():
+        async with AsyncMysql(**SAMPLE_CONFIG) as db:
+            async with db.transaction() as tx:
+                await tx.create("INSERT INTO test VALUES (1, 'a')")
+                raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        asyncio.run(scenario())
+    mock_conn.start_transaction.assert_called_once()
+    mock_conn.rollback.assert_called_once()
+
+
+def test_async_cancel_keeps_slot_until_worker_done(mock_mysql_connector):
+    """A cancelled call holds its concurrency slot until the thread returns."""
+    _, mock_cursor, _ = mock_mysql_connector
+    gate = threading.Event()
+    mock_cursor.fetchall.side_effect = lambda: gate.wait(5) and []
+
+    async def scenario():
+        async with AsyncMysql(**SAMPLE_CONFIG, max_concurrency=1) as db:
+            task = asyncio.create_task(db.read("SELECT SLEEP(1)"))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            locked = db._semaphore.locked()  # pylint: disable=protected-access
+            gate.set()
+            await asyncio.sleep(0.05)
+            return locked, db._semaphore.locked(), db.pool_stats()
+
+    locked_while_running, locked_after, stats = asyncio.run(scenario())
+    assert locked_while_running
+    assert not locked_after
+    assert stats.in_use == 0
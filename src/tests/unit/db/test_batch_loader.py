@@ -0,0 +1,124 @@
+# -*- coding: UTF-8 -*-
+"""test the batch loader"""
+
+import asyncio
+import threading
+
+import pytest
+
+from common_util_py.db import BatchLoader
+
+
+def _connect(mocker, table, queries, fail=False):
+    """connect() for a fake table of {"id": key, "name": ...} rows."""
+    conn = mocker.MagicMock()
+    cursor = conn.cursor.return_value
+    cursor.__enter__.return_value = cursor
+    cursor.rowcount = 0
+    found = []
+
+    def execute(query, params):
+        if fail:
+            raise RuntimeError("server gone")
+        queries.append((query, list(params[0])))
+        found[:] = [table[key] for key in params[0] if key in table]
+
+    cursor.execute.side_effect = execute
+    cursor.fetchall.side_effect = lambda: list(found)
+    return lambda: conn
+
+
+def test_concurrent_loads_share_one_query(mocker):
+    """Keys from many threads are deduplicated into a single IN query."""
+    table = {i: {"id": i, "name": f"n{i}"} for i in range(5)}
+    queries = []
+    loader = BatchLoader(_connect(mocker, table, queries), "users", "id", window=0.2)
+    results = {}
+    start = threading.Barrier(8)
+
+    def handler(n):
+        start.wait()
+        results[n] = loader.load(n % 4 if n < 7 else 99)
+
+    threads = [threading.Thread(target=handler, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    loader.close()
+
+    assert len(queries) == 1
+    assert queries[0][0] == "SELECT * FROM users WHERE id IN %s"
+    assert sorted(queries[0][1]) == [0, 1, 2, 3, 99]
+    assert results[5] == {"id": 1, "name": "n1"}
+    assert results[7] is None
+    stats = loader.stats()
+    assert (stats.requests, stats.deduplicated, stats.batches) == (8, 3, 1)
+
+
+def test_max_batch_size_aload_and_scope(mocker):
+    table = {i: {"id": i} for i in range(5)}
+    queries = []
+    loader = BatchLoader(
+        _connect(mocker, table, queries), "users", "id", window=60, max_batch_size=2
+    )
+
+    async def gather():
+        return await asyncio.gather(*(loader.aload(i) for i in range(4)))
+
+    assert asyncio.run(gather()) == [{"id": i} for i in range(4)]
+    assert [keys for _, keys in queries] == [[0, 1], [2, 3]]
+
+    scope = loader.scope()
+    loader.window = 0
+    assert scope.load_many([4, 4]) == [{"id": 4}, {"id": 4}]
+    assert scope.load(4) == {"id": 4}
+    assert len(queries) == 3
+    loader.close()
+    with pytest.raises(RuntimeError):
+        loader.load(1)
+
+
+def test_each_batch_ends_its_transaction(mocker):
+    """The connection isn't left in a transaction holding an old snapshot."""
+    conn = mocker.MagicMock()
+    cursor = conn.cursor.return_value
+    cursor.__enter__.return_value = cursor
+    cursor.rowcount = 0
+    cursor.fetchall.return_value = []
+    events = []
+    cursor.execute.side_effect = lambda *args: events.append("select")
+    conn.rollback.side_effect = lambda: events.append("rollback")
+
+    loader = BatchLoader(lambda: conn, "users", "id", window=0)
+    assert loader.load(1) is None
+    assert loader.load(2) is None
+    loader.close()
+
+    assert events == ["select", "rollback", "select", "rollback"]
+
+
+def test_errors_reach_every_waiter(mocker):
+    loader = BatchLoader(_connect(mocker, {}, [], fail=True), "users", "id")
+    futures = [loader.submit(1), loader.submit(2)]
+    for future in futures:
+        with pytest.raises(RuntimeError, match="server gone"):
+            future.result(5)
+    loader.close()
+    assert loader.stats().errors >= 1
+
+
+def test_missing_key_column_fails_the_batch(mocker):
+    """A key_column the rows don't have fails the loads, not the loader."""
+    table = {1: {"id": 1}}
+    queries = []
+    loader = BatchLoader(_connect(mocker, table, queries), "users", "ID", window=0)
+    with pytest.raises(ValueError, match="no 'ID' column"):
+        loader.load(1, timeout=5)
+
+    cancelled = loader.submit(2)
+    cancelled.cancel()
+    with pytest.raises(ValueError):
+        loader.load(1, timeout=5)
+    loader.close()
+    assert loader.stats().errors >= 2
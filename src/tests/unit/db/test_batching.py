@@ -0,0 +1,57 @@
+# -*- coding: UTF-8 -*-
+"""test adaptive batch sizing"""
+
+import pytest
+
+from common_util_py.db.batching import AdaptiveBatchSizer, sample_bytes
+
+
+def test_grows_and_shrinks_toward_target():
+    """Fast batches double the size, slow ones halve it."""
+    sizer = AdaptiveBatchSizer(target_latency=0.2, initial_size=100)
+    sizer.record(100, 0.01)
+    assert sizer.next_size() == 200
+
+    slow = AdaptiveBatchSizer(target_latency=0.2, initial_size=100)
+    slow.record(100, 2.0)
+    assert slow.next_size() == 50
+
+
+def test_converges_and_respects_bounds():
+    """At a steady per-row cost the size settles at target / cost."""
+    sizer = AdaptiveBatchSizer(target_latency=0.2, initial_size=10, max_size=5000)
+    for _ in range(20):
+        size = sizer.next_size()
+        sizer.record(size, size * 0.0001)
+    assert sizer.next_size() == 2000
+
+    capped = AdaptiveBatchSizer(initial_size=10, max_size=15)
+    capped.record(10, 0.0)
+    assert capped.next_size() == 15
+
+
+def test_back_off_and_byte_cap():
+    """Rejected batches halve the size; bytes per row cap it to a packet."""
+    sizer = AdaptiveBatchSizer(initial_size=1000)
+    sizer.back_off(1000)
+    assert sizer.next_size() == 500
+    sizer.record(500, 0.2, nbytes=500 * 100)
+    assert sizer.next_size(max_bytes=10_000) == 100
+
+    stats = sizer.stats()
+    assert stats.backoffs == 1
+    assert stats.recent_sizes == [500]
+    assert stats.bytes_per_row == 100
+
+
+def test_invalid_bounds():
+    """Sizes must be ordered."""
+    with pytest.raises(ValueError):
+        AdaptiveBatchSizer(initial_size=10, max_size=5)
+
+
+def test_sample_bytes():
+    """Payload size is extrapolated from a sample."""
+    rows = [("x" * 10,)] * 1000
+    assert sample_bytes(rows) == 1000 * sample_bytes(rows[:1])
+    assert sample_bytes([]) == 0
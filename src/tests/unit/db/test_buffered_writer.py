@@ -0,0 +1,94 @@
+# -*- coding: UTF-8 -*-
+"""test the buffered writer"""
+
+import threading
+
+import pytest
+
+from common_util_py.db import BufferedWriter
+
+
+def test_flushes_on_row_count(mocker):
+    """Reaching max_rows hands the buffer to batch_insert."""
+    db = mocker.MagicMock()
+    inserted = threading.Event()
+    db.batch_insert.side_effect = lambda *args, **kwargs: inserted.set()
+
+    writer = BufferedWriter(db, "t", ["a", "b"], max_rows=2, flush_interval=60)
+    writer.write((1, "x"))
+    writer.write((2, "y"))
+    assert inserted.wait(5)
+    writer.close()
+
+    db.batch_insert.assert_called_once_with("t", ["a", "b"], [(1, "x"), (2, "y")])
+    assert writer.stats().written == 2
+
+
+def test_flush_and_close_write_everything(mocker):
+    """flush() waits for buffered rows; close() writes the rest."""
+    db = mocker.MagicMock()
+    writer = BufferedWriter(
+        db, "t", ["a"], max_rows=100, flush_interval=60, batch_size="auto"
+    )
+    writer.write_many([(i,) for i in range(3)])
+    writer.flush()
+    assert db.batch_insert.call_args.args[2] == [(0,), (1,), (2,)]
+    assert db.batch_insert.call_args.kwargs == {"batch_size": "auto"}
+
+    writer.write((3,))
+    writer.close()
+    assert db.batch_insert.call_count == 2
+    with pytest.raises(RuntimeError):
+        writer.write((4,))
+
+
+def test_time_threshold(mocker):
+    """A lone row is written after flush_interval."""
+    db = mocker.MagicMock()
+    inserted = threading.Event()
+    db.batch_insert.side_effect = lambda *args, **kwargs: inserted.set()
+
+    writer = BufferedWriter(db, "t", ["a"], flush_interval=0.05)
+    writer.write((1,))
+    assert inserted.wait(5)
+    writer.close()
+
+
+def test_backpressure_and_errors(mocker):
+    """A full buffer blocks writers; failed batches go to on_error."""
+    db = mocker.MagicMock()
+    release = threading.Event()
+
+    def slow_insert(*args, **kwargs):
+        release.wait(5)
+        raise RuntimeError("boom")
+
+    db.batch_insert.side_effect = slow_insert
+    failed = []
+    writer = BufferedWriter(
+        db,
+        "t",
+        ["a"],
+        max_rows=2,
+        max_buffer_rows=2,
+        write_timeout=0.05,
+        on_error=lambda rows, error: failed.append(rows),
+    )
+    writer.write_many([(1,), (2,)])
+    with pytest.raises(TimeoutError):
+        writer.write((3,))
+    release.set()
+    writer.close()
+
+    assert failed == [[(1,), (2,)]]
+    stats = writer.stats()
+    assert stats.failed == 2
+    assert stats.blocked_writes == 1
+
+
+def test_row_width_checked(mocker):
+    """Rows must match the columns."""
+    writer = BufferedWriter(mocker.MagicMock(), "t", ["a", "b"])
+    with pytest.raises(ValueError):
+        writer.write((1,))
+    writer.close()
@@ -0,0 +1,57 @@
+# -*- coding: UTF-8 -*-
+"""test column-oriented result sets"""
+
+import math
+from array import array
+
+import pytest
+from mysql.connector.constants import FieldFlag, FieldType
+
+from common_util_py.db.columnar import ColumnBuilder, column_typecode
+
+
+def _column(name, field_type, flags=0):
+    return (name, field_type, None, None, None, None, 1, flags, 63)
+
+
+def test_column_typecode():
+    """Integer width and signedness come from the description."""
+    assert column_typecode(_column("a", FieldType.TINY)) == "b"
+    assert column_typecode(_column("a", FieldType.LONG, FieldFlag.UNSIGNED)) == "L"
+    assert column_typecode(_column("a", FieldType.FLOAT)) == "d"
+    assert column_typecode(_column("a", FieldType.NEWDECIMAL)) is None
+
+
+def test_null_and_unexpected_values_widen_the_column():
+    """NULL turns an int column to float with NaN, strings turn it to a list."""
+    builder = ColumnBuilder(
+        [_column("a", FieldType.LONG), _column("b", FieldType.SHORT)]
+    )
+    builder.add([(1, 1), (2, 2)])
+    builder.add([(None, 3), (4, "x")])
+    columns = builder.result()
+
+    assert columns["a"].typecode == "d"
+    assert columns["a"][:2] == array("d", [1.0, 2.0])
+    assert math.isnan(columns["a"][2])
+    assert columns["b"] == [1, 2, 3, "x"]
+
+
+def test_duplicate_names_rejected():
+    """Columns are keyed by name so duplicates need aliases."""
+    with pytest.raises(ValueError):
+        ColumnBuilder([_column("a", FieldType.LONG), _column("a", FieldType.LONG)])
+
+
+def test_numpy_result():
+    """NumPy arrays share the typed buffers; other columns are object arrays."""
+    np = pytest.importorskip("numpy")
+    builder = ColumnBuilder(
+        [_column("a", FieldType.LONGLONG), _column("b", FieldType.VAR_STRING)]
+    )
+    builder.add([(1, "x"), (2, "y")])
+    columns = builder.result(as_numpy=True)
+
+    assert columns["a"].dtype == np.int64
+    assert columns["a"].sum() == 3
+    assert columns["b"].dtype == object
@@ -0,0 +1,130 @@
+# -*- coding: UTF-8 -*-
+"""test the table export"""
+
+import csv
+import gzip
+import json
+import os
+
+import pytest
+
+from common_util_py.db import export
+from common_util_py.db.sql import DatabaseError
+
+TABLE = [(i, f"name {i}") for i in range(1, 101)]
+
+
+class FakeCursor:
+    """Serves MIN/MAX and key range selects from TABLE.
+
+    Like a connection opened with cursorclass=DictCursor, a cursor made
+    without a class returns dict rows.
+    """
+
+    def __init__(self, fail_on=None, cursor_class=None):
+        self.fail_on = fail_on
+        self.cursor_class = cursor_class
+        self.description = [("id", 3), ("name", 253)]
+        self.rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params):
+        if query.startswith("SELECT MIN"):
+            bounds = (TABLE[0][0], TABLE[-1][0])
+            if self.cursor_class is None:
+                bounds = dict(zip(("MIN(id)", "MAX(id)"), bounds))
+            self.rows = [bounds]
+            return
+        lower, upper = params[-2:]
+        if self.fail_on is not None and lower <= self.fail_on < upper:
+            raise RuntimeError("connection lost")
+        self.rows = [row for row in TABLE if lower <= row[0] < upper]
+
+    def fetchone(self):
+        return self.rows.pop(0)
+
+    def fetchmany(self, size):
+        rows, self.rows = self.rows[:size], self.rows[size:]
+        return rows
+
+
+def _connect(mocker, fail_on=None):
+    def connect():
+        conn = mocker.MagicMock()
+        conn.cursor.side_effect = lambda cls=None: FakeCursor(fail_on, cls)
+        return conn
+
+    return connect
+
+
+def test_export_jsonl_gzip(mocker, tmp_path):
+    """Every row lands in exactly one compact JSONL shard."""
+    result = export.export_table(
+        _connect(mocker), "users", "id", str(tmp_path), compress=True, workers=3
+    )
+
+    assert result.rows == 100
+    assert len(result.files) == 12
+    rows = []
+    for path in result.files:
+        assert path.endswith(".jsonl.gz")
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        assert all(", " not in line for line in lines)
+        rows.extend(json.loads(line) for line in lines)
+    assert rows == [{"id": i, "name": name} for i, name in TABLE]
+
+    with open(result.manifest, encoding="utf-8") as f:
+        manifest = json.load(f)
+    assert all(shard["done"] for shard in manifest["shards"])
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".part")]
+
+
+def test_export_csv_resumes_after_failure(mocker, tmp_path):
+    """A failed shard is redone on the next run; finished ones are kept."""
+    with pytest.raises(DatabaseError, match="run again to resume"):
+        export.export_table(
+            _connect(mocker, fail_on=50),
+            "users",
+            "id",
+            str(tmp_path),
+            fmt="csv",
+            workers=2,
+            shards=4,
+        )
+
+    result = export.export_table(
+        _connect(mocker), "users", "id", str(tmp_path), fmt="csv", workers=2, shards=4
+    )
+    assert (result.shards_written, result.shards_skipped) == (1, 3)
+    assert result.rows == 100
+    rows = []
+    for path in result.files:
+        with open(path, encoding="utf-8", newline="") as f:
+            reader = csv.reader(f)
+            assert next(reader) == ["id", "name"]
+            rows.extend(reader)
+    assert rows == [[str(i), name] for i, name in TABLE]
+
+    with pytest.raises(ValueError, match="other settings"):
+        export.export_table(_connect(mocker), "users", "id", str(tmp_path))
+
+
+def test_main(mocker, tmp_path):
+    fake = _connect(mocker)
+    connect = mocker.patch.object(
+        export.MySQLdb, "connect", side_effect=lambda **kwargs: fake()
+    )
+    argv = ["users", "id", "--output-dir", str(tmp_path), "--user", "u"]
+    assert export.main([*argv, "--database", "db", "--shards", "2"]) == 0
+    assert connect.call_args.kwargs["database"] == "db"
+    assert sorted(os.listdir(tmp_path)) == [
+        "manifest.json",
+        "users-00000.jsonl",
+        "users-00001.jsonl",
+    ]
@@ -0,0 +1,116 @@
+# -*- coding: UTF-8 -*-
+"""test statement instrumentation"""
+
+import pytest
+from mysql.connector import Error
+
+from common_util_py.db import Instrumentation, instrument, sql
+from common_util_py.db import mysql as cmysql
+from common_util_py.db.instrument import LatencyHistogram, normalize_statement
+
+SAMPLE_CONFIG = {
+    "host": "localhost",
+    "username": "test_user",
+    "password": "test_pass",
+    "database": "test_db",
+}
+
+
+def test_normalize_statement():
+    """Literals, placeholders and list arity collapse into one shape."""
+    assert normalize_statement(
+        "SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'x'"
+    ) == normalize_statement("SELECT *  FROM t WHERE id IN (1, 2) AND name = 'yy'")
+    assert (
+        normalize_statement("INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s)")
+        == "INSERT INTO t (a, b) VALUES (?+), ..."
+    )
+    assert normalize_statement("SELECT col1 FROM t2") == "SELECT col1 FROM t2"
+
+
+def test_normalize_long_statement_is_not_cached():
+    """Packed multi-row statements don't pile up in the cache."""
+    statement = "INSERT INTO t (a, b) VALUES " + ", ".join(["(%s, %s)"] * 5000)
+    before = instrument._normalize_cached.cache_info().currsize
+    assert normalize_statement(statement) == "INSERT INTO t (a, b) VALUES (?+), ..."
+    assert instrument._normalize_cached.cache_info().currsize == before
+
+
+def test_histogram_percentiles():
+    """Percentiles land within a bucket of the true value."""
+    histogram = LatencyHistogram()
+    for ms in range(1, 101):
+        histogram.record(ms / 1000)
+    assert histogram.count == 100
+    assert histogram.max == pytest.approx(0.1)
+    assert histogram.percentile(50) == pytest.approx(0.05, rel=0.1)
+    assert histogram.percentile(99) == pytest.approx(0.099, rel=0.1)
+    assert LatencyHistogram().percentile(50) == 0.0
+
+
+def test_mysql_hooks_and_stats(mock_mysql_connector):
+    """Every execute and commit is measured and grouped by shape."""
+    _, mock_cursor, _ = mock_mysql_connector
+    mock_cursor.rowcount = 1
+    mock_cursor.fetchall.return_value = [(1,), (2,)]
+
+    instrumentation = Instrumentation()
+    before, after = [], []
+    instrumentation.add_hook(
+        before=lambda kind, statement, params: before.append(kind),
+        after=after.append,
+    )
+    db = cmysql(**SAMPLE_CONFIG, instrumentation=instrumentation)
+    db.update("UPDATE t SET a = %s WHERE id = %s", ("x", 1))
+    db.update("UPDATE t SET a = %s WHERE id = %s", ("y", 2))
+    assert db.read("SELECT a FROM t") == [(1,), (2,)]
+
+    assert "connect" in before
+    assert [e.kind for e in after].count("commit") == 2
+    stats = {(s.kind, s.shape): s for s in instrumentation.stats()}
+    update = stats[("execute", "UPDATE t SET a = ? WHERE id = ?")]
+    assert update.count == 2
+    assert update.rows == 2
+    assert stats[("fetch", "SELECT a FROM t")].rows == 2
+
+    instrumentation.reset()
+    assert instrumentation.stats() == []
+
+
+def test_errors_are_counted_and_hook_failures_ignored(mock_mysql_connector):
+    """A failing statement is recorded as an error; broken hooks don't matter."""
+    _, mock_cursor, _ = mock_mysql_connector
+    mock_cursor.execute.side_effect = Error("boom")
+
+    instrumentation = Instrumentation()
+
+    def broken(event):
+        raise RuntimeError("hook bug")
+
+    instrumentation.add_hook(after=broken)
+    db = cmysql(**SAMPLE_CONFIG, instrumentation=instrumentation)
+    with pytest.raises(Exception):
+        db.read("SELECT a FROM t")
+
+    (execute,) = [s for s in instrumentation.stats() if s.kind == "execute"]
+    assert execute.errors == 1
+
+
+def test_sql_module_instrumentation(mocker):
+    """sql functions report through set_instrumentation."""
+    conn = mocker.MagicMock()
+    cursor = conn.cursor.return_value
+    cursor.__enter__.return_value = cursor
+    cursor.fetchall.return_value = [{"a": 1}]
+    cursor.rowcount = 1
+
+    instrumentation = Instrumentation()
+    sql.set_instrumentation(instrumentation)
+    try:
+        sql.select(conn, "t", field_names=["a"])
+        sql.update_table(conn, "UPDATE t SET a = 1")
+    finally:
+        sql.set_instrumentation(None)
+
+    kinds = sorted(s.kind for s in instrumentation.stats())
+    assert kinds == ["commit", "execute", "execute", "fetch"]
@@ -1,10 +1,14 @@
 # -*- coding: UTF-8 -*-
 """test mysql"""
 
+import math
+from array import array
 from unittest.mock import patch
 import pytest
 import mysql.connector
+from mysql.connector.constants import FieldType
 from common_util_py.db import mysql as cmysql
+from common_util_py.db import AdaptiveBatchSizer, BatchInsertError, GroupCommitError
 
 # Sample test data
 SAMPLE_CONFIG = {
@@ -276,3 +280,365 @@ def test_error_handling(mock_mysql_connector):
 
     with pytest.raises(Exception, match="Failed to read from MySQL: Test error"):
         db.read("SELECT * FROM non_existent")
+
+
+def test_read_iter_streams_chunks(mock_mysql_connector):
+    """read_iter fetches with fetchmany on an unbuffered cursor."""
+    mock_conn, mock_cursor, _ = mock_mysql_connector
+    mock_cursor.fetchmany.side_effect = [[(1,), (2,)], [(3,)], []]
+
+    db = cmysql(**SAMPLE_CONFIG)
+    rows = list(db.read_iter("SELECT id FROM test", chunk_size=2))
+
+    assert rows == [(1,), (2,), (3,)]
+    mock_conn.cursor.assert_called_with(buffered=False, dictionary=False)
+    mock_cursor.fetchmany.assert_called_with(2)
+    assert mock_cursor.close.called
+    assert not mock_conn.close.called
+
+
+def test_read_named_rows(mock_mysql_connector):
+    """named=True turns tuples into Row objects readable by column name."""
+    mock_conn, mock_cursor, _ = mock_mysql_connector
+    mock_cursor.rowcount = 2
+    mock_cursor.description = [("id", 3), ("name", 253)]
+    mock_cursor.fetchall.return_value = [(1, "a"), (2, "b")]
+    mock_cursor.fetchmany.side_effect = [[(1, "a")], []]
+
+    db = cmysql(**SAMPLE_CONFIG)
+    rows = db.read("SELECT id, name FROM test", named=True)
+    assert rows == [(1, "a"), (2, "b")]
+    assert [row.name for row in rows] == ["a", "b"]
+    assert rows[1]["id"] == 2
+
+    rows = list(db.read_iter("SELECT id, name FROM test", dictionary=True, named=True))
+    assert rows[0].id == 1
+    mock_conn.cursor.assert_called_with(buffered=False, dictionary=False)
+
+
+def test_read_iter_early_stop_drops_connection(mock_mysql_connector):
+    """Stopping early closes the connection instead of reusing it."""
+    mock_conn, mock_cursor, mock_connect = mock_mysql_connector
+    mock_cursor.fetchmany.side_effect = [[(1,), (2,)], [(3,)], []]
+
+    db = cmysql(**SAMPLE_CONFIG, max_connections=1)
+    rows = db.read_iter("SELECT id FROM test", chunk_size=2)
+    assert next(rows) == (1,)
+    rows.close()
+
+    assert mock_conn.close.called
+    assert db.pool_stats().size == 0
+
+    # the next call opens a fresh connection
+    mock_cursor.fetchall.return_value = []
+    db.read("SELECT 1")
+    assert mock_connect.call_count == 2
+
+
+def test_read_columns(mock_mysql_connector):
+    """read_columns fills one typed array per column chunk by chunk."""
+    mock_conn, mock_cursor, _ = mock_mysql_connector
+    mock_cursor.description = [
+        ("id", FieldType.LONGLONG, None, None, None, None, 0, 0, 63),
+        ("price", FieldType.DOUBLE, None, None, None, None, 1, 0, 63),
+        ("name", FieldType.VAR_STRING, None, None, None, None, 1, 0, 45),
+    ]
+    mock_cursor.fetchmany.side_effect = [
+        [(1, 9.5, "a"), (2, None, "b")],
+        [(3, 1.0, None)],
+        [],
+    ]
+
+    db = cmysql(**SAMPLE_CONFIG)
+    columns = db.read_columns("SELECT id, price, name FROM test", as_numpy=False)
+
+    assert columns["id"] == array("q", [1, 2, 3])
+    assert columns["price"][0] == 9.5
+    assert math.isnan(columns["price"][1])
+    assert columns["name"] == ["a", "b", None]
+    mock_conn.cursor.assert_called_with(buffered=False)
+
+
+def test_batch_insert_adaptive_backs_off(mock_mysql_connector):
+    """A lock wait timeout retries the rows in a smaller batch."""
+    mock_conn, mock_cursor, _ = mock_mysql_connector
+    mock_cursor.fetchone.return_value = (64 * 1024 * 1024,)
+    mock_cursor.rowcount = 1
+    sent = []
+
+    def executemany(statement, rows):
+        sent.append(len(rows))
+        if len(sent) == 1:
+            raise mysql.connector.Error(errno=1205, msg="Lock wait timeout")
+
+    mock_cursor.executemany.side_effect = executemany
+    sizer = AdaptiveBatchSizer(initial_size=8)
+
+    db = cmysql(**SAMPLE_CONFIG)
+    data = [(i, "x") for i in range(10)]
+    db.batch_insert("test", ["id", "name"], data, batch_size=sizer)
+
+    assert sent[:2] == [8, 4]
+    assert sum(sent[1:]) == 10
+    assert sizer.stats().backoffs == 1
+    assert mock_conn.commit.call_count == 1
+
+
+def test_batch_update_auto_batch_size(mock_mysql_connector):
+    """batch_size="auto" keeps one sizer per table and reports it."""
+    _, mock_cursor, _ = mock_mysql_connector
+    mock_cursor.fetchone.return_value = (64 * 1024 * 1024,)
+    mock_cursor.rowcount = 2
+
+    db = cmysql(**SAMPLE_CONFIG)
+    db.batch_update("test", ["name"], ["id"], [("a", 1), ("b", 2)], batch_size="auto")
+
+    stats = db.batch_size_stats()
+    assert list(stats) == ["update:test"]
+    assert stats["update:test"].rows == 2
+    with pytest.raises(ValueError):
+        db.batch_insert("test", ["id"], [(1,)], batch_size="auto", pack=True)
+
+
+def test_batch_size_typos_are_refused(mock_mysql_connector):
+    """Only ints, "auto" and an AdaptiveBatchSizer are accepted."""
+    _, mock_cursor, _ = mock_mysql_connector
+    mock_cursor.rowcount = 1
+
+    db = cmysql(**SAMPLE_CONFIG)
+    for batch_size in ("atuo", 100.0, None):
+        with pytest.raises(ValueError, match="batch_size"):
+            db.batch_insert("test", ["id"], [(1,)], batch_size=batch_size)
+        with pytest.raises(ValueError, match="batch_size"):
+            db.batch_update("test", ["name"], ["id"], [("a", 1)], batch_size=batch_size)
+    assert db.batch_size_stats() == {}
+
+
+def test_batch_insert_packed(mock_mysql_connector):
+    """pack=True sends multi-row VALUES statements cut by byte size."""
+    _, mock_cursor, _ = mock_mysql_connector
+    mock_cursor.rowcount = 2
+    mock_cursor.fetchone.return_value = (300,)
+
+    db = cmysql(**SAMPLE_CONFIG)
+    data = [(i, "x" * 40) for i in range(4)]
+    result = db.batch_insert(
+        "test", ["id", "name"], data, pack=True, on_duplicate_key_update=True
+    )
+
+    mock_cursor.execute.assert_any_call("SELECT @@max_allowed_packet")
+    inserts = mock_cursor.execute.call_args_list[1:]
+    assert len(inserts) == 2
+    assert result == 4
+    query, params = inserts[0].args
+    assert query == (
+        "INSERT INTO `test` (`id`, `name`) VALUES (%s, %s), (%s, %s)"
+        " ON DUPLICATE KEY UPDATE `id` = VALUES(`id`), `name` = VALUES(`name`)"
+    )
+    assert params == [0, "x" * 40, 1, "x" * 40]
+    assert not mock_cursor.executemany.called
+
+
+def test_bulk_load_spools_escaped_tsv(mock_mysql_connector):
+    """bulk_load writes escaped TSV and loads it every spool_rows rows."""
+    mock_conn, mock_cursor, _ = mock_mysql_connector
+    mock_cursor.rowcount = 2
+    mock_cursor.warning_count = 1
+    spooled = []
+
+    def capture(query, params):
+        with open(params[0], encoding="utf-8") as f:
+            spooled.append(f.read())
+
+    mock_cursor.execute.side_effect = capture
+
+    db = cmysql(**SAMPLE_CONFIG)
+    rows = iter([(1, "a\tb"), (2, None), (3, "c\\d\n")])
+    result = db.bulk_load("test", ["id", "name"], rows, spool_rows=2)
+
+    assert result.rows == 4
+    assert result.warnings == 2
+    assert spooled == ["1\ta\\tb\n2\t\\N\n", "3\tc\\\\d\\n\n"]
+    query = mock_cursor.execute.call_args.args[0]
+    assert query.startswith("LOAD DATA LOCAL INFILE %s INTO TABLE `test`")
+    assert query.endswith("(`id`, `name`)")
+    assert mock_conn.commit.call_count == 2
+
+
+def test_batch_update_case_strategy(mock_mysql_connector):
+    """strategy='case' sends one CASE WHEN update per batch."""
+    _, mock_cursor, _ = mock_mysql_connector
+    mock_cursor.rowcount = 2
+
+    db = cmysql(**SAMPLE_CONFIG)
+    data = [("new1", 1), ("stale", 2), ("new2", 2)]
+    result = db.batch_update("test", ["name"], ["id"], data, strategy="case")
+
+    assert result == 2
+    assert not mock_cursor.executemany.called
+    mock_cursor.execute.assert_called_once_with(
+        "UPDATE `test` SET `name` = CASE WHEN `id` = %s THEN %s "
+        "WHEN `id` = %s THEN %s ELSE `name` END WHERE `id` IN (%s, %s)",
+        [1, "new1", 2, "new2", 1, 2],
+    )
+
+
+def test_batch_update_join_strategy(mock_mysql_connector):
+    """strategy='join' stages rows in a temporary table and joins once."""
+    _, mock_cursor, _ = mock_mysql_connector
+    mock_cursor.rowcount = 2
+    mock_cursor.fetchone.return_value = (4 * 1024 * 1024,)
+
+    db = cmysql(**SAMPLE_CONFIG)
+    data = [("new1", 1), ("new2", 2)]
+    result = db.batch_update("test", ["name"], ["id"], data, strategy="join")
+
+    assert result == 2
+    statements = [c.args[0] for c in mock_cursor.execute.call_args_list]
+    assert statements == [
+        "DROP TEMPORARY TABLE IF EXISTS `_batch_update_test`",
+        "CREATE TEMPORARY TABLE `_batch_update_test` (INDEX (`id`)) "
+        "SELECT `name`, `id` FROM `test` LIMIT 0",
+        "SELECT @@max_allowed_packet",
+        "INSERT INTO `_batch_update_test` (`name`, `id`) VALUES (%s, %s), (%s, %s)",
+        "UPDATE `test` AS t JOIN `_batch_update_test` AS s ON t.`id` = s.`id` "
+        "SET t.`name` = s.`name`",
+        "DROP TEMPORARY TABLE IF EXISTS `_batch_update_test`",
+    ]
+
+
+def test_batch_update_join_keeps_the_update_error(mock_mysql_connector):
+    """A failing DROP of the staging table doesn't hide why the UPDATE failed."""
+    _, mock_cursor, _ = mock_mysql_connector
+    mock_cursor.rowcount = 2
+    mock_cursor.fetchone.return_value = (4 * 1024 * 1024,)
+    executed = []
+
+    def execute(statement, params=None):
+        if statement.startswith("UPDATE"):
+            raise mysql.connector.Error("Lock wait timeout exceeded")
+        if statement.startswith("DROP") and "CREATE" in executed:
+            raise mysql.connector.Error("Lost connection to MySQL server")
+        executed.append(statement.split()[0])
+
+    mock_cursor.execute.side_effect = execute
+
+    db = cmysql(**SAMPLE_CONFIG)
+    data = [("new1", 1), ("new2", 2)]
+    with pytest.raises(Exception, match="Lock wait timeout"):
+        db.batch_update("test", ["name"], ["id"], data, strategy="join")
+
+
+def test_statement_cache(mock_mysql_connector, mocker):
+    """Parameterized statements reuse cached prepared cursors."""
+    mock_conn, _, _ = mock_mysql_connector
+    mock_conn.cursor.side_effect = lambda **kwargs: mocker.MagicMock()
+
+    db = cmysql(**SAMPLE_CONFIG, statement_cache_size=1)
+    db.read("SELECT * FROM test WHERE id = %s", (1,))
+    db.read("SELECT * FROM test WHERE id = %s", (2,))
+    mock_conn.cursor.assert_called_once_with(prepared=True)
+
+    db.update("UPDATE test SET name = %s", ("a",))
+    stats = db.statement_cache_stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.size) == (1, 2, 1, 1)
+
+    # statements without parameters are not prepared
+    db.read("SELECT 1")
+    mock_conn.cursor.assert_called_with()
+
+    # reconnecting drops the cache of the old connection
+    mock_conn.is_connected.return_value = False
+    db.read("SELECT * FROM test WHERE id = %s", (1,))
+    assert db.statement_cache_stats().misses == 3
+
+
+def test_batch_insert_parallel_reports_failed_batches(mock_mysql_connector, mocker):
+    """parallelism=N commits batches independently and reports failures."""
+    _, _, mock_connect = mock_mysql_connector
+    connections = []
+
+    def connect(**_):
+        conn = mocker.MagicMock()
+        cursor = conn.cursor.return_value
+
+        def executemany(query, batch):
+            if batch[0][0] == 2:
+                raise mysql.connector.Error("Duplicate entry")
+            cursor.rowcount = len(batch)
+
+        cursor.executemany.side_effect = executemany
+        connections.append(conn)
+        return conn
+
+    mock_connect.side_effect = connect
+
+    db = cmysql(**SAMPLE_CONFIG)
+    data = [(i, f"name{i}") for i in range(5)]
+    with pytest.raises(BatchInsertError) as excinfo:
+        db.batch_insert("test", ["id", "name"], data, batch_size=2, parallelism=2)
+
+    assert excinfo.value.inserted == 3
+    [failed] = excinfo.value.failed_batches
+    assert failed.index == 1
+    assert failed.rows == [(2, "name2"), (3, "name3")]
+    assert 1 <= len(connections) <= 2
+    assert sum(conn.commit.call_count for conn in connections) == 2
+    assert all(conn.close.called for conn in connections)
+
+
+def test_group_commit_coalesces_commits(mock_mysql_connector):
+    """Writes inside group_commit() commit every N statements and at the end."""
+    mock_conn, mock_cursor, _ = mock_mysql_connector
+    mock_cursor.rowcount = 1
+
+    db = cmysql(**SAMPLE_CONFIG)
+    with db.group_commit(every=3) as group:
+        for i in range(7):
+            db.update("UPDATE test SET name = %s WHERE id = %s", ("a", i))
+        assert mock_conn.commit.call_count == 2
+    assert mock_conn.commit.call_count == 3
+    assert group.groups == 3
+    assert group.committed == 7
+
+    # outside the block every write commits again
+    db.delete("DELETE FROM test WHERE id = %s", (1,))
+    assert mock_conn.commit.call_count == 4
+
+
+def test_group_commit_errors_roll_back_the_group(mock_mysql_connector):
+    """A failure surfaces as GroupCommitError for the pending group only."""
+    mock_conn, mock_cursor, _ = mock_mysql_connector
+    mock_cursor.rowcount = 1
+
+    db = cmysql(**SAMPLE_CONFIG)
+    with pytest.raises(GroupCommitError) as excinfo:
+        with db.group_commit(every=2):
+            for i in range(3):
+                db.update("UPDATE test SET name = %s WHERE id = %s", ("a", i))
+            raise ValueError("bad row")
+    assert excinfo.value.statements == 1
+    assert excinfo.value.group == 1
+    assert mock_conn.rollback.called
+
+    mock_conn.commit.side_effect = mysql.connector.Error("gone")
+    with pytest.raises(GroupCommitError) as excinfo:
+        with db.group_commit(every=2):
+            db.update("UPDATE test SET name = %s WHERE id = %s", ("a", 1))
+            db.update("UPDATE test SET name = %s WHERE id = %s", ("a", 2))
+    assert excinfo.value.statements == 2
+
+
+def test_transaction_inside_group_commit(mock_mysql_connector):
+    """transaction() commits the pending group, then keeps its own semantics."""
+    mock_conn, mock_cursor, _ = mock_mysql_connector
+    mock_cursor.rowcount = 1
+
+    db = cmysql(**SAMPLE_CONFIG)
+    with db.group_commit(every=100) as group:
+        db.update("UPDATE test SET name = %s WHERE id = %s", ("a", 1))
+        with db.transaction():
+            assert group.pending == 0
+            db.update("UPDATE test SET name = %s WHERE id = %s", ("b", 2))
+        assert mock_conn.commit.call_count == 3
+        assert mock_conn.start_transaction.called
@@ -0,0 +1,99 @@
+# -*- coding: UTF-8 -*-
+"""test connection pool"""
+
+import threading
+import pytest
+from common_util_py.db import mysql as cmysql
+from common_util_py.db import ConnectionPool, PoolTimeoutError
+
+SAMPLE_CONFIG = {
+    "host": "test_host",
+    "username": "test_user",
+    "password": "test_pass",
+    "database": "test_db",
+}
+
+
+def test_pool_reuses_connections(mocker):
+    """Returned connections are handed out again instead of reconnecting."""
+    connect = mocker.MagicMock(side_effect=lambda: mocker.MagicMock())
+    pool = ConnectionPool(connect, max_size=2)
+
+    first = pool.acquire()
+    pool.release(first)
+    second = pool.acquire()
+
+    assert first is second
+    assert connect.call_count == 1
+    stats = pool.stats()
+    assert stats.in_use == 1
+    assert stats.idle == 0
+    assert stats.checkouts == 2
+
+
+def test_pool_timeout_when_exhausted(mocker):
+    """acquire raises PoolTimeoutError once max_size connections are out."""
+    pool = ConnectionPool(mocker.MagicMock, max_size=1, timeout=0.01)
+    pool.acquire()
+
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+    assert pool.stats().waits == 0
+
+
+def test_pool_waits_for_release(mocker):
+    """A waiting thread gets the connection released by another thread."""
+    pool = ConnectionPool(mocker.MagicMock, max_size=1, timeout=5)
+    conn = pool.acquire()
+
+    timer = threading.Timer(0.05, pool.release, args=(conn,))
+    timer.start()
+    assert pool.acquire() is conn
+    timer.join()
+
+    stats = pool.stats()
+    assert stats.waits == 1
+    assert stats.max_wait_time > 0
+
+
+def test_pool_discards_idle_and_dead_connections(mocker):
+    """Expired idle connections and failed pre-pings are replaced."""
+    connect = mocker.MagicMock(side_effect=lambda: mocker.MagicMock())
+    pool = ConnectionPool(connect, max_size=1, max_idle=0)
+    conn = pool.acquire()
+    pool.release(conn)
+    assert pool.acquire() is not conn
+    conn.close.assert_called_once()
+
+    pool = ConnectionPool(connect, max_size=1, pre_ping=True)
+    conn = pool.acquire()
+    conn.is_connected.return_value = False
+    pool.release(conn)
+    assert pool.acquire() is not conn
+    assert pool.stats().discarded == 1
+
+
+def test_mysql_pooled_mode(mock_mysql_connector):
+    """CRUD calls borrow from the pool and return the connection."""
+    mock_conn, mock_cursor, mock_connect = mock_mysql_connector
+    mock_cursor.rowcount = 1
+
+    db = cmysql(**SAMPLE_CONFIG, max_connections=2)
+    assert db.update("UPDATE test SET name = %s", ("a",)) == 1
+    assert db.delete("DELETE FROM test") == 1
+
+    mock_connect.assert_called_once_with(
+        host="test_host", user="test_user", password="test_pass", database="test_db"
+    )
+    assert db.conn is None
+    stats = db.pool_stats()
+    assert stats.in_use == 0
+    assert stats.idle == 1
+
+    with db.transaction():
+        db.update("UPDATE test SET name = 'b'")
+        assert db.pool_stats().in_use == 1
+    mock_conn.start_transaction.assert_called_once()
+
+    db.close()
+    mock_conn.close.assert_called_once()
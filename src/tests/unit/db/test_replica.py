@@ -0,0 +1,66 @@
+# -*- coding: UTF-8 -*-
+"""test read replica routing"""
+
+from common_util_py.db import mysql as cmysql
+
+SAMPLE_CONFIG = {
+    "host": "primary",
+    "username": "test_user",
+    "password": "test_pass",
+    "database": "test_db",
+}
+
+
+def _connect_by_host(mock_connect, mocker, lags=None):
+    """Make connect() return one mock connection per host."""
+    connections = {}
+
+    def connect(**params):
+        host = params["host"]
+        conn = mocker.MagicMock(name=host)
+        conn.cursor.return_value.fetchall.return_value = [(host,)]
+        lag = (lags or {}).get(host, 0)
+        conn.cursor.return_value.fetchone.return_value = {"Seconds_Behind_Source": lag}
+        connections.setdefault(host, []).append(conn)
+        return conn
+
+    mock_connect.side_effect = connect
+    return connections
+
+
+def test_reads_round_robin_writes_on_primary(mock_mysql_connector, mocker):
+    """Reads alternate between replicas, writes and transactions stay put."""
+    _, _, mock_connect = mock_mysql_connector
+    connections = _connect_by_host(mock_connect, mocker)
+
+    db = cmysql(**SAMPLE_CONFIG, replicas=[{"host": "r1"}, {"host": "r2"}])
+    hosts = [db.read("SELECT 1")[0][0] for _ in range(4)]
+    assert sorted(hosts) == ["r1", "r1", "r2", "r2"]
+
+    db.update("UPDATE test SET name = 'a'")
+    assert connections["primary"][0].commit.called
+
+    with db.transaction():
+        assert db.read("SELECT 1") == [("primary",)]
+
+    stats = {s.name: s for s in db.replica_stats()}
+    assert stats["r1:3306"].reads == 2
+    assert stats["r2:3306"].outstanding == 0
+
+
+def test_lagging_replica_is_skipped(mock_mysql_connector, mocker):
+    """Replicas behind max_replica_lag get no reads; none left means primary."""
+    _, _, mock_connect = mock_mysql_connector
+    _connect_by_host(mock_connect, mocker, lags={"r1": 30, "r2": None})
+
+    db = cmysql(
+        **SAMPLE_CONFIG,
+        replicas=[{"host": "r1"}, {"host": "r2"}],
+        max_replica_lag=5,
+        replica_strategy="least_outstanding",
+    )
+    assert db.read("SELECT 1") == [("primary",)]
+    stats = {s.name: s for s in db.replica_stats()}
+    assert not stats["r1:3306"].healthy
+    assert stats["r1:3306"].lag == 30
+    assert not stats["r2:3306"].healthy
@@ -0,0 +1,135 @@
+# -*- coding: UTF-8 -*-
+"""test result cache"""
+
+import threading
+from unittest.mock import patch
+
+from common_util_py.db import mysql as cmysql
+from common_util_py.db import ResultCache, sql
+from common_util_py.db.result_cache import statement_tables
+
+SAMPLE_CONFIG = {
+    "host": "test_host",
+    "username": "test_user",
+    "password": "test_pass",
+    "database": "test_db",
+}
+
+
+def test_statement_tables():
+    """Table names are found after FROM/JOIN/UPDATE/INTO."""
+    assert statement_tables(
+        "SELECT * FROM `db`.`Users` u JOIN orders o ON u.id = o.uid"
+    ) == {"users", "orders"}
+    assert statement_tables("INSERT INTO t1 (a) VALUES (%s)") == {"t1"}
+    assert statement_tables("SELECT 1") == set()
+
+
+def test_ttl_and_eviction():
+    """Entries expire after ttl and the LRU one is evicted when full."""
+    cache = ResultCache(ttl=10, max_entries=2)
+    for i in range(3):
+        key = cache.make_key("SELECT * FROM t WHERE id = %s", (i,))
+        cache.put(key, "SELECT * FROM t WHERE id = %s", [(i,)])
+
+    assert cache.get(cache.make_key("SELECT * FROM t WHERE id = %s", (0,))) is None
+    assert cache.get(cache.make_key("SELECT * FROM t WHERE id = %s", (2,))) == [(2,)]
+
+    with patch("time.monotonic", return_value=10**9):
+        assert cache.get(cache.make_key("SELECT * FROM t WHERE id = %s", (2,))) is None
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions) == (1, 2, 1)
+    assert stats.entries == 1
+
+
+def test_stale_read_is_not_stored():
+    """A read that raced an invalidation is not cached."""
+    cache = ResultCache()
+    key = cache.make_key("SELECT * FROM t")
+    generation = cache.generation()
+    cache.invalidate_tables(["t"])
+    cache.put(key, "SELECT * FROM t", [(1,)], generation)
+    assert cache.get(key) is None
+
+
+def test_mysql_read_cache_invalidated_by_writes(mock_mysql_connector):
+    """Mysql.read hits the cache until a write touches the table."""
+    _, mock_cursor, _ = mock_mysql_connector
+    mock_cursor.fetchall.return_value = [(1, "test")]
+    mock_cursor.rowcount = 1
+    cache = ResultCache()
+
+    db = cmysql(**SAMPLE_CONFIG, result_cache=cache)
+    assert db.read("SELECT * FROM test WHERE id = %s", (1,)) == [(1, "test")]
+    assert db.read("SELECT * FROM test WHERE id = %s", (1,)) == [(1, "test")]
+    assert mock_cursor.fetchall.call_count == 1
+
+    db.update("UPDATE test SET name = %s WHERE id = %s", ("a", 1))
+    db.read("SELECT * FROM test WHERE id = %s", (1,))
+    assert mock_cursor.fetchall.call_count == 2
+
+    db.batch_insert("test", ["id", "name"], [(2, "b")])
+    db.read("SELECT * FROM test WHERE id = %s", (1,))
+    assert mock_cursor.fetchall.call_count == 3
+    assert cache.stats().hit_ratio == 0.25
+
+
+def test_sql_select_cache(mocker):
+    """sql.select uses the cache and sql.update invalidates it."""
+    conn = mocker.MagicMock()
+    cursor = conn.cursor.return_value.__enter__.return_value
+    cursor.fetchall.return_value = [{"id": 1}]
+    cache = ResultCache()
+    condition = sql.Condition("AND", "id", "=", 1)
+
+    assert sql.select(conn, "test", [condition], cache=cache) == [{"id": 1}]
+    assert sql.select(conn, "test", [condition], cache=cache) == [{"id": 1}]
+    assert cursor.execute.call_count == 1
+
+    sql.update(conn, "test", {"name": "a"}, condition, cache=cache)
+    sql.select(conn, "test", [condition], cache=cache)
+    assert cursor.execute.call_count == 2
+
+
+def test_qualified_table_names_and_row_copies(mocker):
+    """shop.orders invalidates orders; changing a returned row is harmless."""
+    conn = mocker.MagicMock()
+    cursor = conn.cursor.return_value.__enter__.return_value
+    cursor.fetchall.side_effect = lambda: [{"id": 1, "state": "new"}]
+    cache = ResultCache()
+    condition = sql.Condition("AND", "id", "=", 1)
+
+    rows = sql.select(conn, "shop.orders", [condition], cache=cache)
+    rows[0]["state"] = "changed"
+    cached = sql.select(conn, "shop.orders", [condition], cache=cache)
+    assert cached == [{"id": 1, "state": "new"}]
+    cached[0]["state"] = "changed"
+    assert cursor.execute.call_count == 1
+
+    sql.update(conn, "shop.orders", {"state": "paid"}, condition, cache=cache)
+    assert cache.stats().invalidations == 1
+    sql.select(conn, "shop.orders", [condition], cache=cache)
+    assert cursor.execute.call_count == 2  # selects only, the cache missed
+
+
+def test_group_commit_invalidates_again_on_commit(mock_mysql_connector):
+    """Rows cached by another thread during a group are dropped at commit."""
+    _, mock_cursor, _ = mock_mysql_connector
+    mock_cursor.rowcount = 1
+    mock_cursor.fetchall.return_value = [(1, "old")]
+    statement = "SELECT name FROM test WHERE id = %s"
+    db = cmysql(**SAMPLE_CONFIG, result_cache=ResultCache())
+
+    def read_elsewhere():
+        # the update isn't committed yet, so this still reads the old row
+        assert db.read(statement, (1,)) == [(1, "old")]
+
+    with db.group_commit(every=100):
+        db.update("UPDATE test SET name = %s WHERE id = %s", ("new", 1))
+        reader = threading.Thread(target=read_elsewhere)
+        reader.start()
+        reader.join()
+
+    mock_cursor.fetchall.return_value = [(1, "new")]
+    assert db.read(statement, (1,)) == [(1, "new")]
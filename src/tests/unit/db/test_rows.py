@@ -0,0 +1,36 @@
+# -*- coding: UTF-8 -*-
+"""test rows"""
+
+import pickle
+import sys
+
+import pytest
+
+from common_util_py.db.rows import named_rows, row_type
+
+
+def test_row_access_by_name_index_and_attribute():
+    """Rows are tuples that also read like the dicts they replace."""
+    description = [("id", 3), ("COUNT(*)", 8), ("keys", 253)]
+    row = named_rows(description, [(1, 2, "k")])[0]
+
+    assert isinstance(row, tuple)
+    assert row == (1, 2, "k")
+    assert (row.id, row[0], row["id"]) == (1, 1, 1)
+    assert row["COUNT(*)"] == row._1 == 2
+    assert row.keys == "k"  # the column wins over the method
+    assert row.get("id") == 1 and row.get("missing", 0) == 0
+    assert row._asdict() == {"id": 1, "COUNT(*)": 2, "keys": "k"}
+    with pytest.raises(KeyError):
+        row["missing"]
+    assert pickle.loads(pickle.dumps(row)) == row
+
+
+def test_row_type_is_shared_and_compact():
+    names = ("id", "name", "price")
+    assert row_type(names) is row_type(names)
+    assert list(row_type(names)(1, "a", 2).keys()) == list(names)
+
+    row = row_type(names)(1, "a", 2)
+    assert not hasattr(row, "__dict__")
+    assert sys.getsizeof(row) < sys.getsizeof(dict(zip(names, row)))
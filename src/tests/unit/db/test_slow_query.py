@@ -0,0 +1,162 @@
+# -*- coding: UTF-8 -*-
+"""test the slow query log"""
+
+import json
+
+from common_util_py.db import Instrumentation, SlowQueryLog, sql
+from common_util_py.db import mysql as cmysql
+from common_util_py.db.instrument import StatementEvent
+
+SAMPLE_CONFIG = {
+    "host": "localhost",
+    "username": "test_user",
+    "password": "test_pass",
+    "database": "test_db",
+}
+
+
+def _event(statement, duration, params=(1,), kind="execute"):
+    return StatementEvent(
+        kind=kind,
+        source="mysql",
+        statement=statement,
+        params=params,
+        rows=3,
+        duration=duration,
+    )
+
+
+def test_only_slow_statements_are_logged(caplog):
+    """Fast statements and connects are ignored, slow ones logged redacted."""
+    slow_log = SlowQueryLog(threshold=0.5, redact_params=True)
+    slow_log(_event("SELECT * FROM t WHERE id = %s", 0.1))
+    slow_log(StatementEvent(kind="connect", source="mysql", duration=9.0))
+    slow_log(_event("SELECT * FROM t WHERE id = %s", 0.9, params=("secret",)))
+    slow_log.flush()
+    slow_log.close()
+
+    (slow,) = slow_log.recent()
+    assert slow.shape == "SELECT * FROM t WHERE id = ?"
+    assert slow.params == ("?",)
+    assert slow.rows == 3
+    assert slow.explain is None
+    assert "secret" not in caplog.text
+    assert "slow execute 0.900s" in caplog.text
+
+
+def test_sampled_explain_runs_on_own_connection(mocker):
+    """Sampled statements get their EXPLAIN FORMAT=JSON plan attached."""
+    conn = mocker.MagicMock()
+    conn.cursor.return_value.fetchone.return_value = ('{"query_block": {}}',)
+    slow_log = SlowQueryLog(threshold=0.1, explain_sample_rate=1.0)
+    slow_log.attach(Instrumentation(), connect=lambda: conn)
+
+    slow_log(_event("SELECT * FROM t WHERE id = %s", 0.2))
+    slow_log(_event("CREATE TABLE t2 (id INT)", 0.2, params=()))
+    slow_log.close()
+
+    explained, ddl = slow_log.recent()
+    assert explained.explain == {"query_block": {}}
+    assert ddl.explain is None
+    conn.cursor.return_value.execute.assert_called_once_with(
+        "EXPLAIN FORMAT=JSON SELECT * FROM t WHERE id = %s", (1,)
+    )
+    assert conn.close.called
+
+
+def test_explain_params_of_in_list_and_executemany(mocker):
+    """An IN list stays one parameter; executemany explains its first row."""
+    conn = mocker.MagicMock()
+    conn.cursor.return_value.fetchone.return_value = ('{"query_block": {}}',)
+    slow_log = SlowQueryLog(threshold=0.1, explain_sample_rate=1.0)
+    slow_log.attach(Instrumentation(), connect=lambda: conn)
+
+    slow_log(_event("SELECT * FROM t WHERE id IN %s", 0.2, params=[[1, 2, 3]]))
+    batch = _event("UPDATE t SET a = %s WHERE id = %s", 0.2, params=[(1, 2), (3, 4)])
+    batch.executemany = True
+    slow_log(batch)
+    slow_log.close()
+
+    calls = [c.args for c in conn.cursor.return_value.execute.call_args_list]
+    assert calls == [
+        ("EXPLAIN FORMAT=JSON SELECT * FROM t WHERE id IN %s", [[1, 2, 3]]),
+        ("EXPLAIN FORMAT=JSON UPDATE t SET a = %s WHERE id = %s", (1, 2)),
+    ]
+
+
+def test_slow_fetch_is_logged_without_explain(mocker):
+    """Fetch events have no params, so their statement isn't explained."""
+    conn = mocker.MagicMock()
+    slow_log = SlowQueryLog(threshold=0.1, explain_sample_rate=1.0)
+    slow_log.attach(Instrumentation(), connect=lambda: conn)
+
+    slow_log(
+        _event("SELECT * FROM t WHERE id = %s", 0.2, params=None, kind="fetch")
+    )
+    slow_log.close()
+
+    assert not conn.cursor.called
+    [slow] = slow_log.recent()
+    assert (slow.kind, slow.explain) == ("fetch", None)
+
+
+def test_executemany_events_are_flagged(mock_mysql_connector):
+    _, mock_cursor, _ = mock_mysql_connector
+    mock_cursor.rowcount = 2
+    events = []
+    instrumentation = Instrumentation()
+    instrumentation.add_hook(after=events.append)
+
+    db = cmysql(**SAMPLE_CONFIG, instrumentation=instrumentation)
+    db.batch_insert("t", ["a"], [(1,), (2,)])
+
+    flags = [e.executemany for e in events if e.kind == "execute"]
+    assert flags == [True]
+
+
+def test_full_queue_drops(mocker):
+    """Statements beyond max_pending are counted, not queued."""
+    slow_log = SlowQueryLog(threshold=0.0, max_pending=1)
+    mocker.patch.object(slow_log, "_start")
+    slow_log(_event("SELECT 1", 1.0))
+    slow_log(_event("SELECT 2", 1.0))
+    assert slow_log.dropped == 1
+
+
+def test_mysql_slow_query_log(mock_mysql_connector):
+    """Mysql creates instrumentation for the log and EXPLAINs via a connection."""
+    _, mock_cursor, mock_connect = mock_mysql_connector
+    mock_cursor.rowcount = 1
+    mock_cursor.fetchone.return_value = (json.dumps({"query_block": {}}),)
+
+    slow_log = SlowQueryLog(threshold=0.0, explain_sample_rate=1.0)
+    db = cmysql(**SAMPLE_CONFIG, slow_query_log=slow_log)
+    assert db.instrumentation is not None
+    db.read("SELECT * FROM t WHERE id = %s", (1,))
+    slow_log.close()
+
+    kinds = [slow.kind for slow in slow_log.recent()]
+    assert kinds == ["execute", "fetch"]
+    assert slow_log.recent()[0].explain == {"query_block": {}}
+    assert mock_connect.call_count == 2
+
+
+def test_sql_select_slow_query_log(mocker):
+    """sql.select reports through the module instrumentation."""
+    conn = mocker.MagicMock()
+    cursor = conn.cursor.return_value
+    cursor.__enter__.return_value = cursor
+    cursor.fetchall.return_value = []
+    cursor.rowcount = 0
+
+    instrumentation = Instrumentation()
+    slow_log = SlowQueryLog(threshold=0.0)
+    slow_log.attach(instrumentation)
+    sql.set_instrumentation(instrumentation)
+    try:
+        sql.select(conn, "t")
+    finally:
+        sql.set_instrumentation(None)
+    slow_log.close()
+
+    assert [slow.source for slow in slow_log.recent()] == ["sql", "sql"]
@@ -0,0 +1,441 @@
+# -*- coding: UTF-8 -*-
+"""test sql"""
+
+import threading
+
+import pytest
+
+from pymysql.cursors import SSCursor, SSDictCursor
+
+from common_util_py.db import sql
+
+
+def test_build_where_clause():
+    """Every condition is kept; the first one's operator is dropped."""
+    assert sql.build_where_clause([]) == ("", [])
+    assert sql.build_where_clause([sql.Condition("AND", "a", "=", 1)]) == (
+        " WHERE a = %s",
+        [1],
+    )
+    where, params = sql.build_where_clause(
+        [
+            sql.Condition("AND", "a", "=", 1),
+            sql.Condition("OR", "b", "IS NULL", None),
+            sql.Condition("AND", "c", ">", 2),
+        ]
+    )
+    assert where == " WHERE a = %s OR b IS NULL AND c > %s"
+    assert params == [1, 2]
+
+
+def test_insert_rows_multi_row(mocker):
+    """Rows are grouped by key set and packed into multi-row INSERTs."""
+    conn = mocker.MagicMock()
+    cursor = conn.cursor.return_value
+    cursor.rowcount = 2
+    rows = [
+        {"a": 1, "b": "x"},
+        {"b": "y", "a": 2},
+        {"a": 3},
+    ]
+
+    assert sql.insert_rows(conn, "t", rows, max_packet_bytes=1024) == 4
+
+    calls = cursor.execute.call_args_list
+    assert calls[0].args == (
+        "INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s)",
+        [1, "x", 2, "y"],
+    )
+    assert calls[1].args == ("INSERT INTO t (a) VALUES (%s)", [3])
+    assert not conn.commit.called
+
+
+def test_insert_rows_chunks_by_packet_and_commits(mocker):
+    """Statements stay under the packet budget; transaction=True commits."""
+    conn = mocker.MagicMock()
+    cursor = conn.cursor.return_value
+    cursor.rowcount = 1
+    cursor.fetchone.return_value = (200,)
+    rows = [{"a": i, "b": "v" * 40} for i in range(5)]
+
+    assert sql.insert_rows(conn, "t", rows, transaction=True) == 3
+
+    cursor.execute.assert_any_call("SELECT @@max_allowed_packet")
+    inserts = [
+        c for c in cursor.execute.call_args_list if c.args[0].startswith("INSERT")
+    ]
+    assert [len(c.args[1]) // 2 for c in inserts] == [2, 2, 1]
+    assert conn.begin.called
+    assert conn.commit.called
+    assert sql.insert_rows(conn, "t", []) == 0
+
+    # the packet size is asked once per connection
+    cursor.execute.reset_mock()
+    sql.insert_rows(conn, "t", rows[:1])
+    assert cursor.execute.call_count == 1
+
+
+def test_insert_rows_error_rolls_back_only_its_own_transaction(mocker):
+    """Without transaction=True the caller's uncommitted work is kept."""
+    conn = mocker.MagicMock()
+    cursor = conn.cursor.return_value
+    cursor.execute.side_effect = sql.MySQLdb.IntegrityError("duplicate")
+
+    with pytest.raises(sql.DatabaseError, match="duplicate"):
+        sql.insert_rows(conn, "t", [{"a": 1}], max_packet_bytes=1024)
+    assert not conn.rollback.called
+    assert cursor.close.called
+
+    with pytest.raises(sql.DatabaseError):
+        sql.insert_rows(conn, "t", [{"a": 1}], max_packet_bytes=1024, transaction=True)
+    conn.rollback.assert_called_once()
+
+
+def test_insert_rows_on_a_dict_cursor_connection(mocker):
+    """The packet size lookup doesn't depend on the default cursorclass."""
+    conn = mocker.MagicMock()
+    tuple_cursor = mocker.MagicMock()
+    tuple_cursor.fetchone.return_value = (4096,)
+    dict_cursor = mocker.MagicMock()
+    dict_cursor.rowcount = 1
+    dict_cursor.fetchone.return_value = {"@@max_allowed_packet": 4096}
+
+    def cursor_factory(cursor_class=None):
+        if cursor_class is sql.MySQLdb.cursors.Cursor:
+            return tuple_cursor
+        return dict_cursor
+
+    conn.cursor.side_effect = cursor_factory
+
+    assert sql.insert_rows(conn, "t", [{"a": 1}]) == 1
+    tuple_cursor.execute.assert_called_once_with("SELECT @@max_allowed_packet")
+    assert tuple_cursor.close.called
+    dict_cursor.execute.assert_called_once_with("INSERT INTO t (a) VALUES (%s)", [1])
+
+
+def _fake_table(mocker, rows, executed=None):
+    """A DictCursor connection answering keyset pages over ``rows`` by id."""
+    conn = mocker.MagicMock()
+
+    def cursor_factory(cursor_class=None):
+        cursor = mocker.MagicMock()
+        cursor.__enter__.return_value = cursor
+        result = []
+
+        def execute(query, params=None):
+            if executed is not None:
+                executed.append((query, list(params or ())))
+            params = list(params)
+            if query.startswith("SELECT MIN"):
+                ids = [row["id"] for row in rows]
+                bounds = (min(ids), max(ids))
+                if cursor_class is not sql.MySQLdb.cursors.Cursor:
+                    bounds = dict(zip(("MIN(id)", "MAX(id)"), bounds))
+                result[:] = [bounds]
+                return
+            # filter params come first, then lower and upper key bounds
+            limit = params.pop()
+            upper = params.pop() if "id < %s" in query else None
+            lower = params.pop() if "id >" in query else None
+            if "id >= %s" in query:
+                lower -= 1
+            matched = [
+                r
+                for r in rows
+                if (lower is None or r["id"] > lower)
+                and (upper is None or r["id"] < upper)
+            ]
+            result[:] = matched[:limit]
+
+        cursor.execute.side_effect = execute
+        cursor.fetchall.side_effect = lambda: list(result)
+        cursor.fetchone.side_effect = lambda: result[0]
+        cursor.rowcount = 0
+        return cursor
+
+    conn.cursor.side_effect = cursor_factory
+    return conn
+
+
+def test_scan_table_keyset_pages(mocker):
+    """Pages continue after the last key instead of using OFFSET."""
+    rows = [{"id": i, "name": str(i)} for i in range(1, 8)]
+    executed = []
+    conn = _fake_table(mocker, rows, executed)
+    condition = sql.Condition("AND", "name", "!=", "x")
+
+    chunks = list(
+        sql.scan_table(conn, "t", "id", chunk_size=3, conditions=[condition])
+    )
+
+    assert [len(chunk) for chunk in chunks] == [3, 3, 1]
+    assert executed[0] == (
+        "SELECT * FROM t WHERE (name != %s) ORDER BY id LIMIT %s",
+        ["x", 3],
+    )
+    assert executed[1] == (
+        "SELECT * FROM t WHERE (name != %s) AND id > %s ORDER BY id LIMIT %s",
+        ["x", 3, 3],
+    )
+    assert "OFFSET" not in " ".join(query for query, _ in executed)
+
+
+def test_scan_table_adds_key_to_fields(mocker):
+    """The key column is selected even when not asked for."""
+    executed = []
+    conn = _fake_table(mocker, [{"id": 1}], executed)
+    list(sql.scan_table(conn, "t", "id", field_names=["name"]))
+    assert executed[0][0].startswith("SELECT name, id FROM t")
+
+
+def test_scan_table_parallel(mocker):
+    """Ranges are scanned on their own connections and cover every row once."""
+    rows = [{"id": i} for i in range(1, 101)]
+    opened = []
+    lock = threading.Lock()
+
+    def connect():
+        conn = _fake_table(mocker, rows)
+        with lock:
+            opened.append(conn)
+        return conn
+
+    chunks = list(
+        sql.scan_table(
+            _fake_table(mocker, rows), "t", "id", chunk_size=7, workers=3,
+            connect=connect,
+        )
+    )
+
+    ids = sorted(row["id"] for chunk in chunks for row in chunk)
+    assert ids == list(range(1, 101))
+    assert len(opened) == 12
+    assert all(conn.close.called for conn in opened)
+
+
+def test_scan_table_parallel_early_close(mocker):
+    """Closing the scan early doesn't start the ranges still queued."""
+    rows = [{"id": i} for i in range(1, 101)]
+    opened = []
+
+    def connect():
+        opened.append(None)
+        return _fake_table(mocker, rows)
+
+    chunks = sql.scan_table(
+        _fake_table(mocker, rows), "t", "id", chunk_size=5, workers=2,
+        connect=connect,
+    )
+    assert len(next(chunks)) == 5
+    chunks.close()
+
+    # the two running workers plus at most one started while closing each
+    assert len(opened) <= 4
+
+
+def test_scan_table_parallel_needs_connect(mocker):
+    """Worker connections can't be shared, so connect is required."""
+    with pytest.raises(ValueError):
+        list(sql.scan_table(mocker.MagicMock(), "t", "id", workers=2))
+
+
+def test_select_and_update_reuse_templates(mocker):
+    """Same query shape builds its SQL once; values are bound per call."""
+    sql.set_template_cache_size(0)
+    sql.set_template_cache_size(16)
+    before = sql.template_cache_stats()
+    conn = mocker.MagicMock()
+    cursor = conn.cursor.return_value
+    cursor.rowcount = 1
+    cursor.fetchall.return_value = []
+    cursor.__enter__.return_value = cursor
+
+    for value in (1, 2):
+        sql.select(
+            conn,
+            "t",
+            [
+                sql.Condition("AND", "a", "=", value),
+                sql.Condition("AND", "b", "IN", [1, 2]),
+            ],
+            ["a", "b"],
+        )
+        sql.update(
+            conn,
+            "t",
+            {"b": value},
+            [
+                sql.Condition("AND", "a", "=", value),
+                sql.Condition("OR", "c", "IS NULL", None),
+            ],
+        )
+
+    calls = [c.args for c in cursor.execute.call_args_list]
+    assert calls[0] == ("SELECT a, b FROM t WHERE a = %s AND b IN %s", [1, [1, 2]])
+    assert calls[1] == ("UPDATE t SET b = %s WHERE a = %s OR c IS NULL", [1, 1])
+    assert calls[2] == ("SELECT a, b FROM t WHERE a = %s AND b IN %s", [2, [1, 2]])
+    assert calls[3] == ("UPDATE t SET b = %s WHERE a = %s OR c IS NULL", [2, 2])
+    stats = sql.template_cache_stats()
+    assert stats.hits - before.hits == 2
+    assert stats.misses - before.misses == 2
+    assert stats.size == 2
+
+    # a different shape is a different template
+    sql.select(conn, "t", [sql.Condition("AND", "a", ">", 1)], ["a", "b"])
+    assert sql.template_cache_stats().misses - before.misses == 3
+
+
+def _streaming_conn(mocker, rows):
+    conn = mocker.MagicMock()
+    cursor = conn.cursor.return_value
+    cursor.rowcount = -1
+    remaining = list(rows)
+
+    def fetchmany(size):
+        batch = remaining[:size]
+        del remaining[:size]
+        return batch
+
+    cursor.fetchmany.side_effect = fetchmany
+    return conn, cursor
+
+
+def test_select_iter_streams_rows(mocker):
+    """Rows come from an unbuffered dict cursor, closed when exhausted."""
+    rows = [{"id": i} for i in range(5)]
+    conn, cursor = _streaming_conn(mocker, rows)
+
+    result = sql.select_iter(conn, "t", [sql.Condition("AND", "id", ">", 0)], ["id"])
+    assert not cursor.execute.called  # lazy until iterated
+    assert list(result) == rows
+
+    conn.cursor.assert_called_once_with(SSDictCursor)
+    cursor.execute.assert_called_once_with("SELECT id FROM t WHERE id > %s", [0])
+    cursor.close.assert_called_once()
+
+
+def test_select_statement_iter_chunks_and_early_close(mocker):
+    """chunk_size yields lists; stopping early still closes the cursor."""
+    conn, cursor = _streaming_conn(mocker, [(i,) for i in range(5)])
+
+    chunks = sql.select_statement_iter(
+        conn, "SELECT id FROM t", chunk_size=2, dict_cursor=False
+    )
+    assert next(chunks) == [(0,), (1,)]
+    assert not cursor.close.called
+    chunks.close()
+
+    conn.cursor.assert_called_once_with(SSCursor)
+    cursor.execute.assert_called_once_with("SELECT id FROM t")
+    cursor.close.assert_called_once()
+
+    conn, cursor = _streaming_conn(mocker, [(i,) for i in range(5)])
+    chunks = sql.select_statement_iter(conn, "SELECT id FROM t", chunk_size=2)
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+
+    with pytest.raises(ValueError):
+        sql.select_statement_iter(conn, "SELECT 1", chunk_size=0)
+
+
+def test_select_splits_long_in_list(mocker):
+    """A long IN list runs as one statement per chunk of distinct values."""
+    conn = mocker.MagicMock()
+    cursor = conn.cursor.return_value
+    cursor.__enter__.return_value = cursor
+    cursor.rowcount = 1
+    cursor.fetchall.side_effect = lambda: [{"id": 0}]
+    ids = [1, 2, 3, 2, 4, 5]
+    conditions = [
+        sql.Condition("AND", "kind", "=", "a"),
+        sql.Condition("AND", "id", "IN", ids),
+    ]
+
+    rows = sql.select(conn, "t", conditions, ["id"], in_chunk_size=2)
+
+    assert rows == [{"id": 0}] * 3
+    calls = [c.args for c in cursor.execute.call_args_list]
+    assert calls == [
+        ("SELECT id FROM t WHERE kind = %s AND id IN %s", ["a", [1, 2]]),
+        ("SELECT id FROM t WHERE kind = %s AND id IN %s", ["a", [3, 4]]),
+        ("SELECT id FROM t WHERE kind = %s AND id IN %s", ["a", [5]]),
+    ]
+
+    # OR conditions can't be split, the list goes as is
+    cursor.execute.reset_mock()
+    conditions[1] = sql.Condition("OR", "id", "IN", ids)
+    sql.select(conn, "t", conditions, ["id"], in_chunk_size=2)
+    assert cursor.execute.call_args.args[1] == ["a", ids]
+
+
+def test_select_keeps_in_list_whole_by_default_and_for_aggregates(mocker):
+    """Chunking is opt-in and never splits an aggregate or DISTINCT."""
+    conn = mocker.MagicMock()
+    cursor = conn.cursor.return_value
+    cursor.__enter__.return_value = cursor
+    cursor.rowcount = 1
+    cursor.fetchall.return_value = [{"COUNT(*)": 2500}]
+    ids = list(range(2500))
+    conditions = [sql.Condition("AND", "id", "IN", ids)]
+
+    assert sql.select(conn, "t", conditions, ["COUNT(*)"]) == [{"COUNT(*)": 2500}]
+    rows = sql.select(
+        conn, "t", conditions, ["COUNT(*)"], in_chunk_size=sql.IN_CHUNK_SIZE
+    )
+    assert rows == [{"COUNT(*)": 2500}]
+    sql.select(conn, "t", conditions, ["DISTINCT kind"], in_chunk_size=1000)
+    sql.select(conn, "t", conditions, ["id"])
+    assert cursor.execute.call_count == 4
+    assert all(c.args[1] == [ids] for c in cursor.execute.call_args_list)
+
+
+def test_update_splits_long_in_list(mocker):
+    """Chunked UPDATEs add up their row counts and commit once."""
+    conn = mocker.MagicMock()
+    cursor = conn.cursor.return_value
+    cursor.rowcount = 2
+
+    affected = sql.update(
+        conn,
+        "t",
+        {"state": "done"},
+        sql.Condition("AND", "id", "IN", list(range(5))),
+        in_chunk_size=2,
+    )
+
+    assert affected == 6
+    assert [c.args[1] for c in cursor.execute.call_args_list] == [
+        ["done", [0, 1]],
+        ["done", [2, 3]],
+        ["done", [4]],
+    ]
+    conn.commit.assert_called_once()
+
+
+def test_select_named_rows(mocker):
+    """named=True reads tuples and returns Row objects."""
+    conn = mocker.MagicMock()
+    cursor = conn.cursor.return_value
+    cursor.__enter__.return_value = cursor
+    cursor.rowcount = 1
+    cursor.description = [("id", 3), ("name", 253)]
+    cursor.fetchall.return_value = [(1, "a")]
+
+    rows = sql.select(conn, "t", field_names=["id", "name"], named=True)
+
+    conn.cursor.assert_called_once_with(sql.MySQLdb.cursors.Cursor)
+    assert rows == [(1, "a")]
+    assert (rows[0].name, rows[0]["id"]) == ("a", 1)
+
+
+def test_select_statement_named_forces_tuple_cursor(mocker):
+    """named=True doesn't depend on the connection's default cursorclass."""
+    conn = mocker.MagicMock()
+    cursor = conn.cursor.return_value
+    cursor.rowcount = 1
+    cursor.description = [("id", 3), ("name", 253)]
+    cursor.fetchall.return_value = [(1, "a")]
+
+    rows = sql.select_statement(conn, "SELECT id, name FROM t", named=True)
+
+    conn.cursor.assert_called_once_with(sql.MySQLdb.cursors.Cursor)
+    assert rows[0].name == "a"
@@ -0,0 +1,45 @@
+# -*- coding: UTF-8 -*-
+"""test template_cache"""
+
+import pytest
+
+from common_util_py.db.template_cache import TemplateCache
+
+
+def test_hits_misses_and_lru_eviction():
+    """Least recently used templates are evicted past max_size."""
+    cache = TemplateCache(max_size=2)
+    builds = []
+
+    def build(key):
+        return lambda: builds.append(key) or f"sql-{key}"
+
+    assert cache.get("a", build("a")) == "sql-a"
+    assert cache.get("b", build("b")) == "sql-b"
+    assert cache.get("a", build("a")) == "sql-a"
+    cache.get("c", build("c"))  # evicts b, the least recently used
+    assert cache.get("a", build("a")) == "sql-a"
+    cache.get("b", build("b"))
+
+    assert builds == ["a", "b", "c", "b"]
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.size) == (2, 4, 2, 2)
+
+
+def test_zero_size_disables_and_resize():
+    cache = TemplateCache(max_size=0)
+    cache.get("a", lambda: "x")
+    cache.get("a", lambda: "x")
+    assert (cache.stats().hits, cache.stats().misses, cache.stats().size) == (0, 2, 0)
+
+    cache.resize(3)
+    for key in "abc":
+        cache.get(key, lambda: key)
+    cache.resize(1)
+    assert cache.stats().size == 1
+    assert cache.stats().evictions == 2
+
+    cache.clear()
+    assert cache.stats().size == 0
+    with pytest.raises(ValueError):
+        cache.resize(-1)